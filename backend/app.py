@@ -2,24 +2,27 @@
 
 import os
 from importlib import import_module
-from flask import Flask, render_template
+from flask import Flask, render_template, request
 import click
-from flask_login import LoginManager
+from flask_login import LoginManager, current_user
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 from flask_babel import Babel
 
 from backend.extensions import limiter
-from backend.config import Config
-from backend.models.database import db
+from backend.config import Config, opcoes_engine, uri_leitura
+from backend.models.database import db, configurar_pragmas_sqlite, configurar_engine_leitura
 from backend.models.user import User
 # Importações de todos os modelos para que o Flask-Migrate os reconheça
 from backend.models.aluno import Aluno
+from backend.models.cache_stamp import CacheStamp
 from backend.models.disciplina import Disciplina
 from backend.models.disciplina_turma import DisciplinaTurma
 from backend.models.historico import HistoricoAluno
 from backend.models.historico_disciplina import HistoricoDisciplina
+from backend.models.resumo_notas_aluno import ResumoNotasAluno
 from backend.models.horario import Horario
+from backend.models.horas_instrutor_semana import HorasInstrutorSemana
 from backend.models.image_asset import ImageAsset
 from backend.models.instrutor import Instrutor
 from backend.models.password_reset_token import PasswordResetToken
@@ -30,6 +33,8 @@ from backend.models.turma import Turma
 from backend.models.turma_cargo import TurmaCargo
 from backend.models.user_school import UserSchool
 from backend.services.asset_service import AssetService
+from backend.services.identity_service import IdentityService, current_identity
+from utils.static_utils import static_fingerprint
 # IMPORTAÇÃO DOS NOVOS MODELOS DE QUESTIONÁRIO
 from backend.models.questionario import Questionario
 from backend.models.pergunta import Pergunta
@@ -53,6 +58,15 @@ def create_app(config_class=Config):
 
     # Inicializa as extensões com a app
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            configurar_pragmas_sqlite(engine, app.config.get('SQLITE_PRAGMAS'))
+    # Relatórios e estatísticas leem de um engine separado (ver somente_leitura)
+    leitura = uri_leitura(app.config)
+    if leitura:
+        configurar_engine_leitura(
+            app, leitura, opcoes_engine(app.config, leitura), app.config.get('SQLITE_PRAGMAS_LEITURA')
+        )
     Migrate(app, db)
     CSRFProtect(app)
     limiter.init_app(app)
@@ -64,7 +78,8 @@ def create_app(config_class=Config):
 
     @login_manager.user_loader
     def load_user(user_id):
-        return db.session.get(User, int(user_id))
+        # Perfis e vínculos com escolas vêm na mesma consulta (ver IdentityService)
+        return IdentityService.load_user(user_id)
 
     # Um contexto é necessário para registrar blueprints e outras configurações
     with app.app_context():
@@ -111,6 +126,9 @@ def register_blueprints(app):
     ]:
         _register(module_path, blueprint_name)
 
+# Arquivos estáticos versionados e uploads (nomes únicos) podem ficar um ano em cache
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
 def register_handlers_and_processors(app):
     """Registra hooks, context processors e error handlers."""
     @app.context_processor
@@ -118,14 +136,40 @@ def register_handlers_and_processors(app):
         from backend.services.site_config_service import SiteConfigService
         if app.config.get("TESTING", False):
             SiteConfigService.init_default_configs()
-        configs = SiteConfigService.get_all_configs()
-        return dict(site_config={c.config_key: c.config_value for c in configs})
+        # O dicionário vem do cache versionado; só consulta o banco após uma alteração
+        return dict(site_config=SiteConfigService.get_config_map(), current_identity=current_identity)
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        # Acrescenta o hash do conteúdo às URLs estáticas (?v=...), permitindo cache imutável.
+        # Uploads já têm nomes únicos e não precisam de versão.
+        if endpoint != 'static' or 'v' in values:
+            return
+        filename = values.get('filename', '')
+        if filename.startswith('uploads/'):
+            return
+        fingerprint = static_fingerprint(app.static_folder, filename)
+        if fingerprint:
+            values['v'] = fingerprint
 
     @app.after_request
     def add_header(response):
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
+        if request.endpoint == 'static':
+            filename = (request.view_args or {}).get('filename', '')
+            versioned = request.args.get('v') and request.args.get('v') == static_fingerprint(app.static_folder, filename)
+            if filename.startswith('uploads/') or versioned:
+                response.cache_control.public = True
+                response.cache_control.max_age = STATIC_MAX_AGE
+                response.cache_control.immutable = True
+            else:
+                # Sem versão na URL: o navegador revalida com ETag/Last-Modified (304)
+                response.cache_control.no_cache = True
+            return response
+
+        if response.mimetype == 'text/html' and current_user.is_authenticated:
+            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+            response.headers["Pragma"] = "no-cache"
+            response.headers["Expires"] = "0"
         return response
 
     @app.errorhandler(404)
@@ -204,6 +248,14 @@ def register_cli_commands(app):
         
         clear_transactional_data()
     
+    @app.cli.command("relatorios-worker")
+    def relatorios_worker_command():
+        """Processa a fila de relatórios em PDF armazenada no Redis."""
+        from backend.services.relatorio_job_service import RelatorioJobService
+        with app.app_context():
+            print("Worker de relatórios iniciado. Pressione Ctrl+C para encerrar.")
+            RelatorioJobService.run_worker()
+
     # --- NOVO COMANDO PARA POPULAR O QUESTIONÁRIO ---
     @app.cli.command("seed-questionario")
     def seed_questionario_command():
@@ -1,14 +1,112 @@
 # backend/config.py
 
 import os
+from sqlalchemy.engine import make_url
+
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+
+def _sqlite_em_memoria(url):
+    return url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+
+
+def opcoes_engine(config, uri=None):
+    """
+    Opções do engine conforme o banco (por padrão, o principal): pool
+    dimensionado para o SQLite em arquivo e, para bancos servidores, também
+    reciclagem e ping das conexões. SQLite em memória fica com os padrões do
+    Flask-SQLAlchemy.
+    """
+    url = make_url(uri or config['SQLALCHEMY_DATABASE_URI'])
+    pool = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+    }
+    if url.get_backend_name() == 'sqlite':
+        if _sqlite_em_memoria(url):
+            return {}
+        return pool
+    return dict(pool, pool_recycle=config['DB_POOL_RECYCLE'], pool_pre_ping=True)
+
+
+def uri_leitura(config):
+    """
+    URI do banco só de leitura: SQLALCHEMY_READ_URI (uma réplica) ou, para o
+    SQLite em arquivo, o mesmo arquivo aberto com mode=ro. None quando não há
+    como separar as leituras (SQLite em memória sem réplica configurada).
+    """
+    if config.get('SQLALCHEMY_READ_URI'):
+        return config['SQLALCHEMY_READ_URI']
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite' or _sqlite_em_memoria(url):
+        return None
+    if url.query.get('uri'):
+        return str(url.update_query_dict({'mode': 'ro'}))
+    return str(url.set(database=f'file:{url.database}', query={'mode': 'ro', 'uri': 'true'}))
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'd2a1b9c8e7f6a5b4c3d2e1f0a9b8c7d6e5f4a3b2c1d0'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'escola.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # PRAGMAs aplicados a cada conexão SQLite (ver backend/models/database.py).
+    # WAL deixa as leituras seguirem durante uma escrita e, com busy_timeout, os
+    # escritores concorrentes esperam a vez em vez de falhar com "database is locked".
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # seguro com WAL; só o último commit pode se perder numa queda de energia
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # ms
+        # Desligado por padrão: nem todas as exclusões removem ou bloqueiam os registros
+        # dependentes, e o SQLite nunca conferiu as chaves estrangeiras deste banco
+        'foreign_keys': os.environ.get('SQLITE_FOREIGN_KEYS', 'OFF'),
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,  # negativo = KiB, ~64 MB por conexão
+    }
+    # No banco de leitura o journal_mode é do arquivo (definido pelo principal) e nada é gravado
+    SQLITE_PRAGMAS_LEITURA = dict(
+        {nome: valor for nome, valor in SQLITE_PRAGMAS.items() if nome != 'journal_mode'},
+        query_only='ON',
+    )
+    # Relatórios e estatísticas (funções com @somente_leitura) leem deste banco; sem réplica
+    # configurada, um SQLite em arquivo é reaberto em modo só leitura (ver uri_leitura)
+    SQLALCHEMY_READ_URI = os.environ.get('DATABASE_READ_URL')
+    # Pool de conexões (ver opcoes_engine); SQLALCHEMY_ENGINE_OPTIONS explícito prevalece
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = 30
+    # O MySQL do PythonAnywhere encerra conexões ociosas após 300 s
+    DB_POOL_RECYCLE = 280
     BABEL_DEFAULT_LOCALE = 'pt_BR'
 
+    # Redis compartilhado entre os workers (carimbos de versão do cache).
+    # Sem ele, os carimbos ficam na tabela cache_stamps do banco principal.
+    REDIS_URL = os.environ.get('REDIS_URL')
+    CACHE_MAX_ENTRIES = 1024
+    # Validade máxima da matriz de horários em cache (cobre renomeações de disciplina/instrutor)
+    HORARIO_CACHE_TTL = 600
+    # Contadores do dashboard: curto, pois alterações em cascata (ex: exclusão de escola) não invalidam
+    DASHBOARD_CACHE_TTL = 60
+    # Itens por página nas listagens de alunos, instrutores e atribuições (paginação keyset)
+    LISTAGEM_POR_PAGINA = 50
+
+    # Geração de relatórios em PDF (fila de jobs; ver RelatorioJobService)
+    WEASYPRINT_API_URL = os.environ.get('WEASYPRINT_API_URL', 'http://weasyprint:5001/pdf')
+    WEASYPRINT_TIMEOUT = 30
+    REPORT_JOB_WORKERS = 2
+    REPORT_JOB_MAX_ATTEMPTS = 3
+    REPORT_JOB_RETRY_BACKOFF = 2  # segundos, dobrando a cada tentativa
+    REPORT_JOB_RETENTION = 3600  # segundos em que o PDF fica disponível para download
+    # Job em processamento há mais tempo que isto é considerado abandonado (worker caiu) e volta
+    # à fila; precisa ser maior que a duração máxima de um job (tentativas x timeout + backoff)
+    REPORT_JOB_STALE_AFTER = 600
+    # Sem REDIS_URL a fila de relatórios fica na memória de cada processo: um job criado em um
+    # worker web não é visto pelos outros (status/download dão 404) e some quando o processo
+    # reinicia. Por isso, fora de TESTING/DEBUG, ela só é usada se ligada aqui explicitamente,
+    # o que só é seguro com um único processo web.
+    REPORT_JOB_MEMORY_STORE = os.environ.get('REPORT_JOB_MEMORY_STORE', '').lower() in ('1', 'true', 'sim')
+
     @staticmethod
     def init_app(app):
         """
@@ -16,4 +114,17 @@ class Config:
         Isso evita erros durante a importação em ambientes de teste.
         """
         if not app.config.get("SECRET_KEY") and not app.testing:
-            raise ValueError("No SECRET_KEY set for Flask application. Set the SECRET_KEY environment variable.")
\ No newline at end of file
+            raise ValueError("No SECRET_KEY set for Flask application. Set the SECRET_KEY environment variable.")
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', opcoes_engine(app.config))
+        if not app.config.get('REDIS_URL') and not (app.testing or app.debug):
+            if app.config.get('REPORT_JOB_MEMORY_STORE'):
+                app.logger.warning(
+                    "REDIS_URL não configurado: a fila de relatórios em PDF fica na memória deste processo. "
+                    "Use um único processo web ou configure o Redis e o comando 'flask relatorios-worker'."
+                )
+            else:
+                app.logger.warning(
+                    "REDIS_URL não configurado: a geração de relatórios em PDF fica desativada. "
+                    "Configure o Redis (e 'flask relatorios-worker') ou, com um único processo web, "
+                    "REPORT_JOB_MEMORY_STORE=1."
+                )
\ No newline at end of file
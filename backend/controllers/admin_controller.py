@@ -5,6 +5,7 @@ from backend.models.school import School
 from backend.models.user import User
 from utils.decorators import admin_or_programmer_required
 from ..services.user_service import UserService
+from ..services.identity_service import current_identity
 
 admin_escola_bp = Blueprint('admin_escola', __name__, url_prefix='/admin-escola')
 
@@ -20,8 +21,8 @@ def pre_cadastro():
         # --- LÓGICA DE VINCULAÇÃO AUTOMÁTICA ---
         # Se o usuário logado for um admin de escola, usa a escola dele.
         if current_user.role == 'admin_escola':
-            if current_user.user_schools:
-                school_id = current_user.user_schools[0].school_id
+            if current_identity.school_id:
+                school_id = current_identity.school_id
             else:
                 flash('Você não está associado a nenhuma escola para realizar o pré-cadastro.', 'danger')
                 return redirect(url_for('main.dashboard'))
@@ -35,7 +36,10 @@ def pre_cadastro():
         matriculas = [m.strip() for m in matriculas_raw.replace(',', ' ').replace(';', ' ').split() if m.strip()]
         
         # Passa o school_id para o serviço de pré-cadastro em lote
-        success, new_users_count, existing_users_count = UserService.batch_pre_register_users(matriculas, role, school_id)
+        success, relatorio = UserService.batch_pre_register_users(matriculas, role, school_id)
+        resumo = UserService.resumir_relatorio(relatorio)
+        new_users_count = resumo['criado']
+        existing_users_count = resumo['vinculado'] + resumo['existente']
         
         if success:
             if new_users_count > 0:
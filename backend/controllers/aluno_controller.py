@@ -1,6 +1,6 @@
 # backend/controllers/aluno_controller.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app
 from flask_login import login_required, current_user
 from sqlalchemy import select
 from flask_wtf import FlaskForm
@@ -83,15 +83,22 @@ class EditAlunoForm(FlaskForm):
 def listar_alunos():
     delete_form = DeleteForm()
     turma_filtrada = request.args.get('turma', None)
+    busca = request.args.get('q', '').strip()
+    ordem = request.args.get('ordem', 'nome')
     
     school_id = _ensure_school_id_for_current_user()
     if not school_id:
         flash('Nenhuma escola associada ou selecionada.', 'danger')
         return redirect(url_for('main.dashboard'))
 
-    alunos = AlunoService.get_all_alunos(current_user, turma_filtrada)
+    alunos = AlunoService.listar_alunos(
+        current_user, turma_filtrada, busca=busca, ordem=ordem,
+        cursor=request.args.get('cursor'),
+        por_pagina=current_app.config.get('LISTAGEM_POR_PAGINA', 50)
+    )
     turmas = db.session.scalars(select(Turma).where(Turma.school_id==school_id).order_by(Turma.nome)).all()
-    return render_template('listar_alunos.html', alunos=alunos, turmas=turmas, turma_filtrada=turma_filtrada, delete_form=delete_form)
+    return render_template('listar_alunos.html', alunos=alunos, turmas=turmas, turma_filtrada=turma_filtrada,
+                           busca=busca, ordem=ordem, delete_form=delete_form)
 
 @aluno_bp.route('/editar/<int:aluno_id>', methods=['GET', 'POST'])
 @login_required
@@ -11,10 +11,10 @@ from ..models.user import User
 from ..models.user_school import UserSchool
 from ..models.instrutor import Instrutor
 from ..models.aluno import Aluno
-from ..models.disciplina import Disciplina
-from ..models.historico_disciplina import HistoricoDisciplina
 from utils.validators import validate_email, validate_password_strength
 from ..services.password_reset_service import PasswordResetService
+from ..services.dashboard_service import DashboardService
+from ..services.matricula_service import MatriculaService
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -95,15 +95,10 @@ def register():
             new_aluno_profile = Aluno(user_id=user.id, opm=opm)
             db.session.add(new_aluno_profile)
             db.session.flush()
-
-            user_school_link = db.session.scalar(select(UserSchool).where(UserSchool.user_id == user.id))
-            if user_school_link:
-                school_id = user_school_link.school_id
-                disciplinas_da_escola = db.session.scalars(select(Disciplina).where(Disciplina.school_id == school_id)).all()
-                for disciplina in disciplinas_da_escola:
-                    nova_matricula = HistoricoDisciplina(aluno_id=new_aluno_profile.id, disciplina_id=disciplina.id)
-                    db.session.add(nova_matricula)
+            # Matricula nas disciplinas da escola à qual o pré-cadastro vinculou o usuário
+            MatriculaService.matricular_pendentes(aluno_ids=[new_aluno_profile.id])
         
+        DashboardService.invalidar_estatisticas()
         db.session.commit()
 
         flash('Sua conta foi ativada com sucesso! Agora você pode fazer o login.', 'success')
@@ -63,8 +63,7 @@ def update_config():
 @programmer_required
 def preview():
     """Preview das configurações"""
-    configs = SiteConfigService.get_all_configs()
-    config_dict = {config.config_key: config.config_value for config in configs}
+    config_dict = SiteConfigService.get_config_map()
     
     return render_template('customizer/preview.html', configs=config_dict)
 
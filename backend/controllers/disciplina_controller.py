@@ -39,7 +39,7 @@ def listar_disciplinas():
     session['ultimo_ciclo_disciplina'] = ciclo_selecionado_id
     
     # --- LÓGICA DO FILTRO DE TURMA ADICIONADA ---
-    turma_selecionada_nome = request.args.get('turma', None)
+    turma_selecionada_id = request.args.get('turma', None, type=int)
     turmas_disponiveis = db.session.scalars(select(Turma).where(Turma.school_id == school_id).order_by(Turma.nome)).all()
 
     query = select(Disciplina).where(
@@ -49,14 +49,11 @@ def listar_disciplinas():
 
     disciplinas = db.session.scalars(query).all()
     
-    disciplinas_com_progresso = []
-    for d in disciplinas:
-        # Passa a turma selecionada para o cálculo de progresso
-        progresso = DisciplinaService.get_dados_progresso(d, turma_selecionada_nome)
-        disciplinas_com_progresso.append({
-            'disciplina': d,
-            'progresso': progresso
-        })
+    # Progresso de todas as disciplinas em uma única consulta, filtrado pela turma selecionada
+    progresso, _ = DisciplinaService.get_progresso_em_lote(disciplinas, turma_selecionada_id)
+    disciplinas_com_progresso = [
+        {'disciplina': d, 'progresso': progresso[d.id]} for d in disciplinas
+    ]
 
     delete_form = DeleteForm()
     ciclos_disponiveis = db.session.scalars(select(Ciclo).order_by(Ciclo.id)).all()
@@ -67,7 +64,7 @@ def listar_disciplinas():
                            ciclo_selecionado=ciclo_selecionado_id,
                            ciclos=ciclos_disponiveis,
                            turmas=turmas_disponiveis, # Passa as turmas para o template
-                           turma_selecionada=turma_selecionada_nome) # Passa a turma selecionada
+                           turma_selecionada=next((t for t in turmas_disponiveis if t.id == turma_selecionada_id), None)) # Passa a turma selecionada
 
 @disciplina_bp.route('/adicionar', methods=['GET', 'POST'])
 @login_required
@@ -158,4 +155,30 @@ def api_disciplinas_por_ciclo(ciclo_id):
     )
     disciplinas = db.session.scalars(disciplinas_query).all()
     
-    return jsonify([{'id': d.id, 'materia': d.materia} for d in disciplinas])
\ No newline at end of file
+    return jsonify([{'id': d.id, 'materia': d.materia} for d in disciplinas])
+
+@disciplina_bp.route('/api/progresso/<int:ciclo_id>')
+@login_required
+@can_view_management_pages_required
+def api_progresso_por_ciclo(ciclo_id):
+    """Matriz de progresso disciplinas x turmas do ciclo, calculada em uma única consulta."""
+    school_id = UserService.get_current_school_id()
+    if not school_id:
+        return jsonify({'error': 'Escola não encontrada na sessão'}), 404
+
+    disciplinas = db.session.scalars(
+        select(Disciplina)
+        .where(Disciplina.school_id == school_id, Disciplina.ciclo_id == ciclo_id)
+        .order_by(Disciplina.materia)
+    ).all()
+    turmas = db.session.execute(select(Turma.id, Turma.nome).where(Turma.school_id == school_id).order_by(Turma.nome)).all()
+
+    progresso, matriz = DisciplinaService.get_progresso_em_lote(disciplinas, turma_ids=[t.id for t in turmas])
+
+    return jsonify({
+        'turmas': [{'id': t.id, 'nome': t.nome} for t in turmas],
+        'disciplinas': [
+            {'id': d.id, 'materia': d.materia, 'total': progresso[d.id], 'por_turma': matriz[d.id]}
+            for d in disciplinas
+        ]
+    })
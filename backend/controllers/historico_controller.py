@@ -1,18 +1,21 @@
 # backend/controllers/historico_controller.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from flask_wtf import FlaskForm
-from sqlalchemy import select
+from sqlalchemy import select, exists, or_
 from wtforms import StringField, TextAreaField, DateTimeLocalField, SubmitField, SelectField
 from wtforms.validators import DataRequired
 
 from ..models.database import db
 from ..models.historico_disciplina import HistoricoDisciplina
 from ..models.disciplina import Disciplina
+from ..models.disciplina_turma import DisciplinaTurma
 from ..models.turma import Turma
 from ..services.historico_service import HistoricoService
+from ..services.desempenho_service import DesempenhoService
 from ..services.aluno_service import AlunoService
+from ..services.identity_service import current_identity
 from utils.decorators import admin_or_programmer_required, aluno_profile_required, can_view_management_pages_required
 
 historico_bp = Blueprint('historico', __name__, url_prefix='/historico')
@@ -67,31 +70,21 @@ def historico_funcional():
 @login_required
 @aluno_profile_required
 def minhas_notas():
-    aluno_id = current_user.aluno_profile.id
+    aluno_id = current_identity.aluno_id
     aluno = AlunoService.get_aluno_by_id(aluno_id)
     if not aluno:
         flash("Aluno não encontrado.", 'danger')
         return redirect(url_for('main.dashboard'))
 
-    # Lógica de verificação e matrícula automática
-    if aluno.turma and aluno.turma.school:
-        school_id = aluno.turma.school.id
-        disciplinas_da_escola = db.session.scalars(select(Disciplina).where(Disciplina.school_id == school_id)).all()
-        matriculas_existentes = db.session.scalars(select(HistoricoDisciplina.disciplina_id).where(HistoricoDisciplina.aluno_id == aluno_id)).all()
-        for disciplina in disciplinas_da_escola:
-            if disciplina.id not in matriculas_existentes:
-                nova_matricula = HistoricoDisciplina(aluno_id=aluno.id, disciplina_id=disciplina.id)
-                db.session.add(nova_matricula)
-        db.session.commit()
-
     historico_disciplinas = HistoricoService.get_historico_disciplinas_for_aluno(aluno_id)
-    notas_finais = [h.nota for h in historico_disciplinas if h.nota is not None]
-    media_final_curso = sum(notas_finais) / len(notas_finais) if notas_finais else 0.0
+    resumo = HistoricoService.get_resumo_aluno(aluno_id)
+    media_final_curso = resumo.media_final if resumo and resumo.media_final is not None else 0.0
 
     return render_template('historico_aluno.html',
                            aluno=aluno,
                            historico_disciplinas=historico_disciplinas,
                            media_final_curso=media_final_curso,
+                           resumo=resumo,
                            is_own_profile=True)
 
 # --- NOVA ROTA PARA VISUALIZAÇÃO POR ADMINS ---
@@ -110,16 +103,120 @@ def ver_historico_aluno(aluno_id):
         return redirect(url_for('aluno.listar_alunos'))
 
     historico_disciplinas = HistoricoService.get_historico_disciplinas_for_aluno(aluno_id)
-    notas_finais = [h.nota for h in historico_disciplinas if h.nota is not None]
-    media_final_curso = sum(notas_finais) / len(notas_finais) if notas_finais else 0.0
+    resumo = HistoricoService.get_resumo_aluno(aluno_id)
+    media_final_curso = resumo.media_final if resumo and resumo.media_final is not None else 0.0
 
     return render_template('historico_aluno.html',
                            aluno=aluno,
                            historico_disciplinas=historico_disciplinas,
                            media_final_curso=media_final_curso,
+                           resumo=resumo,
                            is_own_profile=False) # Flag para o template saber que não é o perfil próprio
 
 
+# --- DESEMPENHO DA TURMA (ESTATÍSTICAS E CLASSIFICAÇÃO) ---
+PAPEIS_DESEMPENHO = ['super_admin', 'programador', 'admin_escola', 'instrutor']
+
+def _turma_acessivel(turma_id):
+    """Turma, se o usuário pode ver o desempenho e lançar notas dela (admins globais veem todas)."""
+    if current_identity.role not in PAPEIS_DESEMPENHO:
+        return None
+    turma = db.session.get(Turma, turma_id)
+    if not turma:
+        return None
+    if current_identity.role not in ['super_admin', 'programador'] and turma.school_id not in current_identity.school_ids:
+        return None
+    return turma
+
+def _pode_lancar_notas(turma, disciplina_id):
+    """
+    Quem pode gravar notas na planilha: admins com acesso à turma e os
+    instrutores vinculados à disciplina nessa turma (DisciplinaTurma).
+    Os demais instrutores da escola só consultam.
+    """
+    if current_identity.role in ['super_admin', 'programador', 'admin_escola']:
+        return True
+    instrutor_id = current_identity.instrutor_id
+    if current_identity.role != 'instrutor' or instrutor_id is None:
+        return False
+    return db.session.scalar(select(exists().where(
+        DisciplinaTurma.turma_id == turma.id,
+        DisciplinaTurma.disciplina_id == disciplina_id,
+        or_(DisciplinaTurma.instrutor_id_1 == instrutor_id, DisciplinaTurma.instrutor_id_2 == instrutor_id),
+    )))
+
+def _dados_desempenho(turma):
+    disciplina_id = request.args.get('disciplina_id', type=int)
+    return {
+        'estatisticas': DesempenhoService.get_estatisticas_turma(turma.id),
+        'classificacao': DesempenhoService.get_classificacao_turma(turma.id, disciplina_id),
+        'disciplina_id': disciplina_id,
+    }
+
+@historico_bp.route('/turma/<int:turma_id>/desempenho')
+@login_required
+def desempenho_turma(turma_id):
+    turma = _turma_acessivel(turma_id)
+    if not turma:
+        flash("Turma não encontrada ou acesso negado.", 'danger')
+        return redirect(url_for('main.dashboard'))
+    return render_template('desempenho_turma.html', turma=turma, **_dados_desempenho(turma))
+
+@historico_bp.route('/api/turma/<int:turma_id>/desempenho')
+@login_required
+def api_desempenho_turma(turma_id):
+    turma = _turma_acessivel(turma_id)
+    if not turma:
+        return jsonify({'success': False, 'message': 'Turma não encontrada ou acesso negado.'}), 404
+    return jsonify({'success': True, 'turma': {'id': turma.id, 'nome': turma.nome}, **_dados_desempenho(turma)})
+
+
+@historico_bp.route('/turma/<int:turma_id>/disciplina/<int:disciplina_id>/notas', methods=['GET', 'POST'])
+@login_required
+def planilha_notas(turma_id, disciplina_id):
+    """Planilha de notas da turma na disciplina: todas as avaliações em um único envio."""
+    turma = _turma_acessivel(turma_id)
+    disciplina = db.session.get(Disciplina, disciplina_id)
+    if not turma or not disciplina or disciplina.school_id != turma.school_id:
+        if request.is_json:
+            return jsonify({'success': False, 'message': 'Turma ou disciplina não encontrada.'}), 404
+        flash("Turma ou disciplina não encontrada.", 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    is_admin = current_identity.role in ['super_admin', 'programador', 'admin_escola']
+    pode_lancar = _pode_lancar_notas(turma, disciplina_id)
+    erros = []
+    if request.method == 'POST':
+        if not pode_lancar:
+            if request.is_json:
+                return jsonify({'success': False, 'message': 'Você não tem permissão para lançar estas notas.'}), 403
+            flash("Você não tem permissão para lançar estas notas.", 'danger')
+            return redirect(url_for('historico.planilha_notas', turma_id=turma_id, disciplina_id=disciplina_id))
+        if request.is_json:
+            linhas = (request.get_json(silent=True) or {}).get('notas', [])
+        else:
+            linhas = [
+                {
+                    'historico_id': historico_id,
+                    'nota_p1': request.form.get(f'nota_p1-{historico_id}'),
+                    'nota_p2': request.form.get(f'nota_p2-{historico_id}'),
+                    'nota_rec': request.form.get(f'nota_rec-{historico_id}'),
+                }
+                for historico_id in request.form.getlist('historico_id')
+            ]
+        success, message, erros = HistoricoService.lancar_notas_turma(turma_id, disciplina_id, linhas, from_admin=is_admin)
+        if request.is_json:
+            return jsonify({'success': success, 'message': message, 'erros': erros}), 200 if success else 400
+        flash(message, 'success' if success else 'danger')
+        if success:
+            return redirect(url_for('historico.planilha_notas', turma_id=turma_id, disciplina_id=disciplina_id))
+
+    registros = HistoricoService.get_planilha_notas(turma_id, disciplina_id)
+    return render_template('planilha_notas.html', turma=turma, disciplina=disciplina, registros=registros,
+                           erros={erro['historico_id']: erro['mensagem'] for erro in erros},
+                           is_admin=is_admin, pode_lancar=pode_lancar, valores=request.form)
+
+
 @historico_bp.route('/avaliar/<int:historico_id>', methods=['POST'])
 @login_required
 def avaliar_aluno_disciplina(historico_id):
@@ -128,7 +225,7 @@ def avaliar_aluno_disciplina(historico_id):
         flash("Registro de avaliação não encontrado.", 'danger')
         return redirect(url_for('main.dashboard'))
 
-    is_own_profile = hasattr(current_user, 'aluno_profile') and current_user.aluno_profile.id == registro.aluno_id
+    is_own_profile = current_identity.aluno_id is not None and current_identity.aluno_id == registro.aluno_id
     is_admin = getattr(current_user, 'role', None) in ['super_admin', 'programador', 'admin_escola']
 
     if not (is_own_profile or is_admin):
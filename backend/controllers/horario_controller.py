@@ -19,6 +19,7 @@ from ..models.ciclo import Ciclo
 from utils.decorators import admin_or_programmer_required, can_schedule_classes_required
 from ..services.horario_service import HorarioService
 from ..services.user_service import UserService
+from ..services.identity_service import current_identity
 
 horario_bp = Blueprint('horario', __name__, url_prefix='/horario')
 
@@ -35,10 +36,9 @@ def index():
             flash("Você não está matriculado em nenhuma turma. Contate a administração.", 'warning')
             return redirect(url_for('main.dashboard'))
         
-        turma_do_aluno = current_user.aluno_profile.turma
-        school_id = turma_do_aluno.school_id
-        turma_selecionada_nome = turma_do_aluno.nome
-        todas_as_turmas = [turma_do_aluno]
+        turma_selecionada = current_user.aluno_profile.turma
+        school_id = turma_selecionada.school_id
+        todas_as_turmas = [turma_selecionada]
     else:
         school_id = UserService.get_current_school_id()
         if not school_id:
@@ -46,13 +46,13 @@ def index():
             return redirect(url_for('main.dashboard'))
         
         todas_as_turmas = db.session.scalars(select(Turma).where(Turma.school_id == school_id).order_by(Turma.nome)).all()
-        turma_selecionada_nome = request.args.get('pelotao', session.get('ultima_turma_visualizada'))
-        
-        if not turma_selecionada_nome and todas_as_turmas:
-            turma_selecionada_nome = todas_as_turmas[0].nome
-        elif turma_selecionada_nome and turma_selecionada_nome not in [t.nome for t in todas_as_turmas]:
-             flash("Turma selecionada inválida.", "danger")
-             turma_selecionada_nome = todas_as_turmas[0].nome if todas_as_turmas else None
+        turma_selecionada_id = request.args.get('turma_id', session.get('ultima_turma_visualizada'), type=int)
+        turma_selecionada = next((t for t in todas_as_turmas if t.id == turma_selecionada_id), None)
+
+        if turma_selecionada is None and turma_selecionada_id and todas_as_turmas:
+            flash("Turma selecionada inválida.", "danger")
+        if turma_selecionada is None and todas_as_turmas:
+            turma_selecionada = todas_as_turmas[0]
 
     ciclo_selecionado_id = request.args.get('ciclo', session.get('ultimo_ciclo_horario', 1), type=int)
     session['ultimo_ciclo_horario'] = ciclo_selecionado_id
@@ -68,9 +68,9 @@ def index():
     
     horario_matrix = None
     datas_semana = {}
-    if turma_selecionada_nome and semana_selecionada:
-        session['ultima_turma_visualizada'] = turma_selecionada_nome
-        horario_matrix = HorarioService.construir_matriz_horario(turma_selecionada_nome, semana_selecionada.id, current_user)
+    if turma_selecionada and semana_selecionada:
+        session['ultima_turma_visualizada'] = turma_selecionada.id
+        horario_matrix = HorarioService.construir_matriz_horario(turma_selecionada.id, semana_selecionada.id, current_user)
         datas_semana = HorarioService.get_datas_da_semana(semana_selecionada)
 
     can_schedule_in_this_turma = False
@@ -78,31 +78,27 @@ def index():
 
     if current_user.role in ['programador', 'admin_escola', 'super_admin']:
         can_schedule_in_this_turma = True
-    elif current_user.role == 'instrutor' and current_user.instrutor_profile:
-        instrutor_id = current_user.instrutor_profile.id
+    elif current_identity.role == 'instrutor' and current_identity.instrutor_id:
+        instrutor_id = current_identity.instrutor_id
         
         # --- LÓGICA ALTERADA PARA ENCONTRAR TODAS AS TURMAS VINCULADAS ---
-        pelotao_names = db.session.scalars(
-            select(DisciplinaTurma.pelotao).where(
-                or_(
-                    DisciplinaTurma.instrutor_id_1 == instrutor_id,
-                    DisciplinaTurma.instrutor_id_2 == instrutor_id
-                )
-            ).distinct()
+        turma_ids_vinculadas = select(DisciplinaTurma.turma_id).where(
+            or_(
+                DisciplinaTurma.instrutor_id_1 == instrutor_id,
+                DisciplinaTurma.instrutor_id_2 == instrutor_id
+            )
+        )
+        instrutor_turmas_vinculadas = db.session.scalars(
+            select(Turma).where(Turma.id.in_(turma_ids_vinculadas)).order_by(Turma.nome)
         ).all()
         
-        if pelotao_names:
-            instrutor_turmas_vinculadas = db.session.scalars(
-                select(Turma).where(Turma.nome.in_(pelotao_names)).order_by(Turma.nome)
-            ).all()
-        
         # Verifica se o instrutor tem vínculo com a turma atualmente selecionada
-        if turma_selecionada_nome in pelotao_names:
+        if turma_selecionada is not None and turma_selecionada in instrutor_turmas_vinculadas:
             can_schedule_in_this_turma = True
 
     return render_template('quadro_horario.html',
                            horario_matrix=horario_matrix,
-                           pelotao_selecionado=turma_selecionada_nome,
+                           turma_selecionada=turma_selecionada,
                            semana_selecionada=semana_selecionada,
                            todas_as_turmas=todas_as_turmas,
                            todas_as_semanas=todas_as_semanas,
@@ -113,16 +109,16 @@ def index():
                            instrutor_turmas_vinculadas=instrutor_turmas_vinculadas) # Passa a nova variável
 
 
-@horario_bp.route('/editar/<pelotao>/<int:semana_id>/<int:ciclo_id>')
+@horario_bp.route('/editar/<int:turma_id>/<int:semana_id>/<int:ciclo_id>')
 @login_required
 @can_schedule_classes_required
-def editar_horario_grid(pelotao, semana_id, ciclo_id):
+def editar_horario_grid(turma_id, semana_id, ciclo_id):
     semana = db.session.get(Semana, semana_id)
     if not semana:
         flash("Semana não encontrada.", "danger")
         return redirect(url_for('horario.index'))
 
-    context_data = HorarioService.get_edit_grid_context(pelotao, semana_id, ciclo_id, current_user)
+    context_data = HorarioService.get_edit_grid_context(turma_id, semana_id, ciclo_id, current_user)
     
     if not context_data.get('success'):
         flash(context_data.get('message', 'Erro ao carregar dados para edição.'), 'danger')
@@ -160,6 +156,22 @@ def remover_aula():
     else:
         return jsonify({'success': False, 'message': message}), 403
 
+@horario_bp.route('/lote', methods=['POST'])
+@login_required
+def aplicar_lote():
+    """Várias operações de aula (criar/atualizar/mover/remover) em uma única transação."""
+    data = request.get_json(silent=True) or {}
+    success, message, status_code, dados = HorarioService.aplicar_lote(
+        data.get('turma_id'), data.get('semana_id'), data.get('operacoes'), current_user
+    )
+    # Células dos dias alterados já renderizadas para o editor substituir na grade
+    for celula in dados.get('celulas', []):
+        celula['html'] = render_template('partials/_horario_slot_edit.html', aula=celula['aula'],
+                                         dia=celula['dia'], periodo=celula['periodo'])
+        if celula['aula'] != 'SKIP':
+            celula['aula'] = celula['aula'].to_dict()
+    return jsonify({'success': success, 'message': message, **dados}), status_code
+
 @horario_bp.route('/aprovar', methods=['GET', 'POST'])
 @login_required
 @admin_or_programmer_required
@@ -173,4 +185,5 @@ def aprovar_horarios():
         return redirect(url_for('horario.aprovar_horarios'))
         
     aulas_pendentes = HorarioService.get_aulas_pendentes()
-    return render_template('aprovar_horarios.html', aulas_pendentes=aulas_pendentes, form=form)
+    conflitos = HorarioService.get_conflitos_pendentes(aulas_pendentes)
+    return render_template('aprovar_horarios.html', aulas_pendentes=aulas_pendentes, conflitos=conflitos, form=form)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional as TypingOptional
 
-from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from flask import Blueprint, current_app, flash, redirect, render_template, request, session, url_for
 from flask_login import current_user, login_required
 from flask_wtf import FlaskForm
 from sqlalchemy import select
@@ -137,9 +137,15 @@ def _populate_instrutor_form(form: InstrutorBaseForm, instrutor: Instrutor) -> N
 @login_required
 @can_view_management_pages_required
 def listar_instrutores():
-    instrutores = InstrutorService.get_all_instrutores()
+    busca = request.args.get('q', '').strip()
+    ordem = request.args.get('ordem', 'nome')
+    instrutores = InstrutorService.listar_instrutores(
+        busca=busca, ordem=ordem, cursor=request.args.get('cursor'),
+        por_pagina=current_app.config.get('LISTAGEM_POR_PAGINA', 50)
+    )
     delete_form = DeleteForm()
-    return render_template('listar_instrutores.html', instrutores=instrutores, form=delete_form)
+    return render_template('listar_instrutores.html', instrutores=instrutores, form=delete_form,
+                           busca=busca, ordem=ordem)
 
 
 @instrutor_bp.route('/cadastrar', methods=['GET', 'POST'])
@@ -1,5 +1,6 @@
 # backend/controllers/main_controller.py
 
+import csv
 from flask import Blueprint, render_template, redirect, url_for, request, flash, session
 from flask_login import login_required, current_user
 from ..models.user import User
@@ -8,6 +9,7 @@ from ..models.database import db
 from ..services.dashboard_service import DashboardService
 from utils.decorators import admin_or_programmer_required
 from ..services.user_service import UserService
+from ..services.identity_service import current_identity
 
 main_bp = Blueprint('main', __name__)
 
@@ -38,8 +40,8 @@ def dashboard():
     school_id_to_load = None
     if current_user.role in ['super_admin', 'programador']:
         school_id_to_load = session.get('view_as_school_id')
-    elif hasattr(current_user, 'schools') and current_user.schools:
-        school_id_to_load = current_user.schools[0].id
+    elif current_identity.school_id:
+        school_id_to_load = current_identity.school_id
     
     dashboard_data = DashboardService.get_dashboard_data(school_id=school_id_to_load)
     
@@ -73,21 +75,35 @@ def pre_cadastro():
             form_data['role'] = role_arg
 
         matriculas_raw = form_data.get('matriculas', '').strip() 
-        if '/' in matriculas_raw or ' ' in matriculas_raw or ',' in matriculas_raw or ';' in matriculas_raw:
-            partes = [p.strip() for p in matriculas_raw.replace(',', ' ').replace(';', ' ').split() if p.strip()]
-            matriculas = [p for p in partes if p.isdigit()]
-
+        arquivo_csv = request.files.get('arquivo_csv')
+        em_lote = bool(arquivo_csv and arquivo_csv.filename) or any(sep in matriculas_raw for sep in ('/', ' ', ',', ';', '\n'))
+        if em_lote:
             if not form_data.get('role'):
                 flash('Função não informada para pré-cadastro em lote.', 'danger')
                 return redirect(url_for('main.pre_cadastro', role=role_arg) if role_arg else url_for('main.pre_cadastro'))
 
-            # CORREÇÃO: Passar o school_id para a função
-            success, novos, existentes = UserService.batch_pre_register_users(matriculas, form_data['role'], school_id)
+            if arquivo_csv and arquivo_csv.filename:
+                # O CSV é lido em streaming, linha a linha
+                matriculas = UserService.ler_matriculas_csv(arquivo_csv.stream)
+            else:
+                matriculas = [p.strip() for p in matriculas_raw.replace(',', ' ').replace(';', ' ').replace('/', ' ').split() if p.strip()]
+
+            try:
+                success, relatorio = UserService.batch_pre_register_users(matriculas, form_data['role'], school_id)
+            except (UnicodeDecodeError, csv.Error):
+                flash('Não foi possível ler o arquivo. Envie um CSV codificado em UTF-8.', 'danger')
+                return redirect(url_for('main.pre_cadastro', role=role_arg) if role_arg else url_for('main.pre_cadastro'))
+
+            resumo = UserService.resumir_relatorio(relatorio)
             if success:
-                flash(f'Pré-cadastro realizado: {novos} novo(s), {existentes} já existente(s).', 'success')
+                existentes = resumo['vinculado'] + resumo['existente']
+                flash(f"Pré-cadastro realizado: {resumo['criado']} novo(s), {existentes} já existente(s).", 'success')
+                if resumo['invalido'] or resumo['duplicado']:
+                    flash(f"{resumo['invalido']} matrícula(s) inválida(s) e {resumo['duplicado']} repetida(s) foram ignoradas.", 'warning')
             else:
                 flash('Falha ao pré-cadastrar usuários em lote.', 'danger')
-            return redirect(url_for('main.pre_cadastro', role=role_arg) if role_arg else url_for('main.pre_cadastro'))
+            schools = db.session.query(School).order_by(School.nome).all()
+            return render_template('pre_cadastro.html', role_predefinido=role_arg, schools=schools, relatorio=relatorio)
         else:
             form_data['matricula'] = matriculas_raw
             # CORREÇÃO: Passar o school_id para a função
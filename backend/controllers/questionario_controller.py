@@ -2,7 +2,7 @@
 
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required
-from sqlalchemy import select, func, distinct
+from sqlalchemy import select, distinct
 
 from ..models.database import db
 from ..models.questionario import Questionario
@@ -10,6 +10,7 @@ from ..models.pergunta import Pergunta
 from ..models.opcao_resposta import OpcaoResposta
 from ..models.resposta import Resposta
 from ..models.user import User
+from ..services.questionario_service import QuestionarioService
 
 questionario_bp = Blueprint('questionario', __name__, url_prefix='/questionario')
 
@@ -60,7 +61,7 @@ def novo_questionario():
                     opcao = OpcaoResposta(texto=opt_texto, pergunta_id=pergunta.id)
                     db.session.add(opcao)
                 if data.get('outro'):
-                    opcao_outro = OpcaoResposta(texto='Outro', pergunta_id=pergunta.id)
+                    opcao_outro = OpcaoResposta(texto='Outro', pergunta_id=pergunta.id, aceita_texto_livre=True)
                     db.session.add(opcao_outro)
 
         db.session.commit()
@@ -78,19 +79,12 @@ def ver_questionarios():
 @questionario_bp.route('/resultado/<int:questionario_id>')
 @login_required
 def resultado_questionario(questionario_id):
-    questionario = db.session.get(Questionario, questionario_id)
+    questionario = QuestionarioService.get_questionario_completo(questionario_id)
     if not questionario:
         flash('Questionário não encontrado.', 'danger')
         return redirect(url_for('questionario.ver_questionarios'))
         
-    dados_graficos = {}
-    for pergunta in questionario.perguntas:
-        labels = [opcao.texto for opcao in pergunta.opcoes]
-        dados = []
-        for opcao in pergunta.opcoes:
-            count = db.session.query(func.count(Resposta.id)).filter_by(pergunta_id=pergunta.id, opcao_resposta_id=opcao.id).scalar()
-            dados.append(count)
-        dados_graficos[pergunta.id] = {'labels': labels, 'dados': dados}
+    dados_graficos = QuestionarioService.get_dados_graficos(questionario)
 
     return render_template(
         'questionario/resultado.html', 
@@ -109,39 +103,19 @@ def realizar_questionario():
             flash('Por favor, selecione um questionário e um usuário.', 'danger')
             return redirect(url_for('questionario.realizar_questionario'))
 
-        questionario = db.session.get(Questionario, int(questionario_id))
-        
-        for pergunta in questionario.perguntas:
-            if pergunta.tipo == 'multipla':
-                respostas_ids = request.form.getlist(f'pergunta_{pergunta.id}')
-                for resposta_id in respostas_ids:
-                    opcao_selecionada = db.session.get(OpcaoResposta, int(resposta_id))
-                    texto_livre = None
-                    if opcao_selecionada and opcao_selecionada.texto in ['Outro', 'Outra área', 'Outro motivo', 'Outra forma', 'Quais']:
-                        texto_livre = request.form.get(f'outro_{pergunta.id}')
-
-                    nova_resposta = Resposta(
-                        questionario_id=questionario.id, pergunta_id=pergunta.id,
-                        user_id=int(user_id), opcao_resposta_id=int(resposta_id),
-                        texto_livre=texto_livre
-                    )
-                    db.session.add(nova_resposta)
-            else: 
-                resposta_id = request.form.get(f'pergunta_{pergunta.id}')
-                if resposta_id:
-                    opcao_selecionada = db.session.get(OpcaoResposta, int(resposta_id))
-                    texto_livre = None
-                    if opcao_selecionada and opcao_selecionada.texto == 'Outro':
-                        texto_livre = request.form.get(f'outro_{pergunta.id}')
-
-                    nova_resposta = Resposta(
-                        questionario_id=questionario.id, pergunta_id=pergunta.id,
-                        user_id=int(user_id), opcao_resposta_id=int(resposta_id),
-                        texto_livre=texto_livre
-                    )
-                    db.session.add(nova_resposta)
-        
-        db.session.commit()
+        questionario = QuestionarioService.get_questionario_completo(int(questionario_id))
+        if not questionario:
+            flash('Questionário não encontrado.', 'danger')
+            return redirect(url_for('questionario.realizar_questionario'))
+
+        try:
+            QuestionarioService.registrar_respostas(questionario, int(user_id), request.form)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro ao salvar as respostas: {e}', 'danger')
+            return redirect(url_for('questionario.realizar_questionario'))
+
         flash('Questionário respondido com sucesso!', 'success')
         return redirect(url_for('questionario.index'))
 
@@ -162,13 +136,13 @@ def realizar_questionario():
 @questionario_bp.route('/api/get-perguntas/<int:questionario_id>')
 @login_required
 def get_perguntas(questionario_id):
-    questionario = db.session.get(Questionario, questionario_id)
+    questionario = QuestionarioService.get_questionario_completo(questionario_id)
     if not questionario:
         return jsonify({'error': 'Questionário não encontrado'}), 404
         
     perguntas_list = []
     for p in questionario.perguntas:
-        opcoes_list = [{'id': o.id, 'texto': o.texto} for o in p.opcoes]
+        opcoes_list = [{'id': o.id, 'texto': o.texto, 'aceita_texto_livre': o.aceita_texto_livre} for o in p.opcoes]
         perguntas_list.append({'id': p.id, 'texto': p.texto, 'tipo': p.tipo, 'opcoes': opcoes_list})
         
     return jsonify(perguntas_list)
@@ -215,7 +189,7 @@ def ver_participantes(questionario_id):
 @questionario_bp.route('/editar-respostas/<int:questionario_id>/<int:user_id>', methods=['GET', 'POST'])
 @login_required
 def editar_respostas(questionario_id, user_id):
-    questionario = db.session.get(Questionario, questionario_id)
+    questionario = QuestionarioService.get_questionario_completo(questionario_id)
     participante = db.session.get(User, user_id)
     
     if not questionario or not participante:
@@ -223,39 +197,14 @@ def editar_respostas(questionario_id, user_id):
         return redirect(url_for('questionario.ver_questionarios'))
 
     if request.method == 'POST':
-        db.session.query(Resposta).filter_by(questionario_id=questionario_id, user_id=user_id).delete()
+        try:
+            QuestionarioService.atualizar_respostas(questionario, user_id, request.form)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro ao atualizar as respostas: {e}', 'danger')
+            return redirect(url_for('questionario.editar_respostas', questionario_id=questionario_id, user_id=user_id))
 
-        for pergunta in questionario.perguntas:
-            if pergunta.tipo == 'multipla':
-                respostas_ids = request.form.getlist(f'pergunta_{pergunta.id}')
-                for resposta_id in respostas_ids:
-                    opcao_selecionada = db.session.get(OpcaoResposta, int(resposta_id))
-                    texto_livre = None
-                    if opcao_selecionada and opcao_selecionada.texto in ['Outro', 'Outra área', 'Outro motivo', 'Outra forma', 'Quais']:
-                        texto_livre = request.form.get(f'outro_{pergunta.id}')
-
-                    nova_resposta = Resposta(
-                        questionario_id=questionario.id, pergunta_id=pergunta.id,
-                        user_id=user_id, opcao_resposta_id=int(resposta_id),
-                        texto_livre=texto_livre
-                    )
-                    db.session.add(nova_resposta)
-            else:
-                resposta_id = request.form.get(f'pergunta_{pergunta.id}')
-                if resposta_id:
-                    opcao_selecionada = db.session.get(OpcaoResposta, int(resposta_id))
-                    texto_livre = None
-                    if opcao_selecionada and opcao_selecionada.texto == 'Outro':
-                        texto_livre = request.form.get(f'outro_{pergunta.id}')
-
-                    nova_resposta = Resposta(
-                        questionario_id=questionario.id, pergunta_id=pergunta.id,
-                        user_id=user_id, opcao_resposta_id=int(resposta_id),
-                        texto_livre=texto_livre
-                    )
-                    db.session.add(nova_resposta)
-        
-        db.session.commit()
         flash(f'Respostas de {participante.nome_completo} atualizadas com sucesso!', 'success')
         return redirect(url_for('questionario.ver_participantes', questionario_id=questionario_id))
 
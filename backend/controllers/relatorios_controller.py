@@ -1,14 +1,14 @@
 # backend/controllers/relatorios_controller.py
 
-from flask import Blueprint, render_template, request, flash, Response, redirect, url_for
-from flask_login import login_required
+from flask import Blueprint, render_template, request, flash, Response, redirect, url_for, jsonify, abort
+from flask_login import login_required, current_user
 from datetime import datetime
 import locale
-import requests
 
 from ..services.relatorio_service import RelatorioService
 from ..services.instrutor_service import InstrutorService
 from ..services.site_config_service import SiteConfigService
+from ..services.relatorio_job_service import RelatorioJobService, STATUS_CONCLUIDO
 from utils.decorators import admin_or_programmer_required
 
 # Configura o locale para Português do Brasil para traduzir o mês
@@ -22,27 +22,6 @@ except locale.Error:
 
 relatorios_bp = Blueprint('relatorios', __name__, url_prefix='/relatorios')
 
-# URL da API do WeasyPrint (container Docker)
-WEASYPRINT_API_URL = "http://weasyprint:5001/pdf" # Usar o nome do serviço do docker-compose
-
-def gerar_pdf_com_api(html_content):
-    """Função para gerar PDF usando a API do WeasyPrint em um container Docker."""
-    try:
-        response = requests.post(
-            WEASYPRINT_API_URL,
-            json={'html': html_content},
-            headers={'Content-Type': 'application/json'},
-            timeout=30  # Timeout de 30 segundos
-        )
-        response.raise_for_status()  # Lança um erro para códigos de status HTTP 4xx/5xx
-        return response.content
-    except requests.exceptions.RequestException as e:
-        # Captura erros de conexão, timeout, etc.
-        raise Exception(f"Serviço de geração de PDF indisponível ou com erro: {e}")
-    except Exception as e:
-        raise Exception(f"Erro inesperado ao gerar PDF: {e}")
-
-
 @relatorios_bp.route('/')
 @login_required
 @admin_or_programmer_required
@@ -110,20 +89,56 @@ def gerar_relatorio_horas_aula():
             return rendered_html
 
         if action == 'download':
+            # 6. Enfileira a conversão em PDF; a página de acompanhamento baixa o arquivo quando pronto
             try:
-                # 6. Chama a API para converter o HTML em PDF
-                pdf_content = gerar_pdf_com_api(rendered_html)
-                
-                return Response(
-                    pdf_content,
-                    mimetype='application/pdf',
-                    headers={'Content-Disposition': 'attachment; filename=relatorio_horas_aula.pdf'}
-                )
+                job_id = RelatorioJobService.submit(rendered_html, current_user.id, 'relatorio_horas_aula.pdf')
             except Exception as e:
                 flash(f'Erro ao gerar PDF: {str(e)}', 'danger')
                 return redirect(url_for('relatorios.gerar_relatorio_horas_aula', tipo=report_type))
+            return redirect(url_for('relatorios.acompanhar_job', job_id=job_id))
 
     # Se for GET, apenas exibe o formulário
     return render_template('relatorios/horas_aula_form.html', 
                            tipo_relatorio=tipo_relatorio_titulo, 
-                           todos_instrutores=todos_instrutores)
\ No newline at end of file
+                           todos_instrutores=todos_instrutores)
+
+
+@relatorios_bp.route('/jobs/<job_id>')
+@login_required
+@admin_or_programmer_required
+def acompanhar_job(job_id):
+    """Página que acompanha a geração do PDF e inicia o download ao concluir."""
+    job = RelatorioJobService.get_job(job_id, current_user.id)
+    if not job:
+        abort(404)
+    return render_template('relatorios/job_status.html', job_id=job_id)
+
+
+@relatorios_bp.route('/jobs/<job_id>/status')
+@login_required
+@admin_or_programmer_required
+def status_job(job_id):
+    job = RelatorioJobService.get_job(job_id, current_user.id)
+    if not job:
+        return jsonify({'error': 'Relatório não encontrado ou expirado.'}), 404
+    return jsonify({
+        'status': job['status'],
+        'tentativas': int(job.get('attempts', 0)),
+        'erro': job.get('error'),
+        'download_url': url_for('relatorios.download_job', job_id=job_id) if job['status'] == STATUS_CONCLUIDO else None
+    })
+
+
+@relatorios_bp.route('/jobs/<job_id>/download')
+@login_required
+@admin_or_programmer_required
+def download_job(job_id):
+    job, pdf_content = RelatorioJobService.get_result(job_id, current_user.id)
+    if not job or pdf_content is None:
+        flash('Relatório não disponível. Ele pode ainda estar em processamento ou ter expirado.', 'warning')
+        return redirect(url_for('relatorios.index'))
+    return Response(
+        pdf_content,
+        mimetype='application/pdf',
+        headers={'Content-Disposition': f"attachment; filename={job.get('filename', 'relatorio.pdf')}"}
+    )
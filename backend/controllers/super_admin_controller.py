@@ -1,6 +1,6 @@
 # backend/controllers/super_admin_controller.py
 
-from flask import Blueprint, render_template, request, flash, redirect, url_for, session
+from flask import Blueprint, render_template, request, flash, redirect, url_for, session, current_app
 from flask_login import login_required
 import secrets
 import string
@@ -11,6 +11,7 @@ from ..models.user import User
 from ..models.user_school import UserSchool
 from ..services.school_service import SchoolService
 from ..services.user_service import UserService
+from ..services.dashboard_service import DashboardService
 from sqlalchemy import not_
 
 super_admin_bp = Blueprint('super_admin', __name__, url_prefix='/super-admin')
@@ -77,15 +78,15 @@ def manage_assignments():
         
         return redirect(url_for('super_admin.manage_assignments'))
 
-    all_manageable_users_query = db.select(User).filter(
-        User.role.notin_(['programador', 'super_admin'])
-    ).order_by(User.nome_completo)
-    all_manageable_users = db.session.scalars(all_manageable_users_query).all()
+    escola_filtrada = request.args.get('escola', type=int)
+    busca = request.args.get('q', '').strip()
 
-    assignments = db.session.scalars(db.select(UserSchool).join(User).join(School)).all()
-    assigned_user_ids = {a.user_id for a in assignments}
-
-    unassigned_users = [user for user in all_manageable_users if user.id not in assigned_user_ids]
+    all_manageable_users = UserService.get_usuarios_gerenciaveis()
+    assignments = UserService.listar_atribuicoes(
+        school_id=escola_filtrada, busca=busca, cursor=request.args.get('cursor'),
+        por_pagina=current_app.config.get('LISTAGEM_POR_PAGINA', 50)
+    )
+    unassigned_users = UserService.get_usuarios_sem_escola()
     
     schools = db.session.scalars(db.select(School).order_by(School.nome)).all()
 
@@ -94,7 +95,9 @@ def manage_assignments():
         users=all_manageable_users, 
         schools=schools, 
         assignments=assignments,
-        unassigned_users=unassigned_users
+        unassigned_users=unassigned_users,
+        escola_filtrada=escola_filtrada,
+        busca=busca
     )
 
 @super_admin_bp.route('/create-administrator', methods=['POST'])
@@ -140,6 +143,7 @@ def create_administrator():
         role='admin_escola'
     )
     db.session.add(user_school)
+    DashboardService.invalidar_estatisticas()
     
     try:
         db.session.commit()
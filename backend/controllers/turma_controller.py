@@ -41,8 +41,12 @@ class DeleteForm(FlaskForm):
 @can_view_management_pages_required
 def listar_turmas():
     delete_form = DeleteForm()
-    turmas = db.session.scalars(select(Turma).order_by(Turma.nome)).all()
-    return render_template('listar_turmas.html', turmas=turmas, delete_form=delete_form)
+    # Sem escola em contexto (super admin sem "ver como"), lista as turmas de todas as escolas
+    turmas_com_contagem = TurmaService.listar_turmas_com_contagem(UserService.get_current_school_id())
+    turmas = [turma for turma, _ in turmas_com_contagem]
+    alunos_por_turma = {turma.id: total for turma, total in turmas_com_contagem}
+    return render_template('listar_turmas.html', turmas=turmas, alunos_por_turma=alunos_por_turma,
+                           delete_form=delete_form)
 
 @turma_bp.route('/<int:turma_id>')
 @login_required
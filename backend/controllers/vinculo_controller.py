@@ -33,7 +33,7 @@ class DeleteForm(FlaskForm):
 @login_required
 @admin_or_programmer_required
 def gerenciar_vinculos():
-    turma_filtrada = request.args.get('turma', '')
+    turma_filtrada_id = request.args.get('turma', type=int)
     disciplina_filtrada_id = request.args.get('disciplina_id', type=int)
     
     school_id = UserService.get_current_school_id()
@@ -41,7 +41,7 @@ def gerenciar_vinculos():
         flash("Nenhuma escola associada ou selecionada.", "warning")
         return redirect(url_for('main.dashboard'))
 
-    vinculos = VinculoService.get_all_vinculos(turma_filtrada, disciplina_filtrada_id)
+    vinculos = VinculoService.get_all_vinculos(turma_filtrada_id, disciplina_filtrada_id)
     turmas = db.session.scalars(select(Turma).where(Turma.school_id == school_id).order_by(Turma.nome)).all()
     disciplinas = db.session.scalars(select(Disciplina).where(Disciplina.school_id == school_id).order_by(Disciplina.materia)).all()
     delete_form = DeleteForm()
@@ -50,7 +50,7 @@ def gerenciar_vinculos():
                            vinculos=vinculos, 
                            turmas=turmas, 
                            disciplinas=disciplinas,
-                           turma_filtrada=turma_filtrada,
+                           turma_filtrada_id=turma_filtrada_id,
                            disciplina_filtrada_id=disciplina_filtrada_id,
                            delete_form=delete_form)
 
@@ -117,9 +117,7 @@ def editar_vinculo(vinculo_id):
         flash(message, 'success' if success else 'danger')
         return redirect(url_for('vinculo.gerenciar_vinculos'))
     
-    turma_atual = db.session.scalar(select(Turma).where(Turma.nome == vinculo.pelotao))
-    if turma_atual:
-        form.turma_id.data = turma_atual.id
+    form.turma_id.data = vinculo.turma_id
     form.instrutor_id.data = vinculo.instrutor_id_1
     form.disciplina_id.data = vinculo.disciplina_id
 
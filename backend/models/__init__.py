@@ -5,6 +5,7 @@ from .database import db
 
 # Importa todos os modelos para garantir que sejam registrados no SQLAlchemy
 from .user import User
+from .cache_stamp import CacheStamp
 from .school import School
 from .user_school import UserSchool
 from .aluno import Aluno
@@ -15,9 +16,11 @@ from .ciclo import Ciclo
 from .disciplina import Disciplina
 from .disciplina_turma import DisciplinaTurma
 from .horario import Horario
+from .horas_instrutor_semana import HorasInstrutorSemana
 from .semana import Semana
 from .historico import HistoricoAluno
 from .historico_disciplina import HistoricoDisciplina
+from .resumo_notas_aluno import ResumoNotasAluno
 from .password_reset_token import PasswordResetToken
 from .site_config import SiteConfig
 from .image_asset import ImageAsset
@@ -32,6 +35,7 @@ from .resposta import Resposta
 __all__ = [
     'db',
     'User',
+    'CacheStamp',
     'School',
     'UserSchool',
     'Aluno',
@@ -42,9 +46,11 @@ __all__ = [
     'Disciplina',
     'DisciplinaTurma',
     'Horario',
+    'HorasInstrutorSemana',
     'Semana',
     'HistoricoAluno',
     'HistoricoDisciplina',
+    'ResumoNotasAluno',
     'PasswordResetToken',
     'SiteConfig',
     'ImageAsset',
@@ -9,6 +9,7 @@ if t.TYPE_CHECKING:
     from .user import User
     from .historico import HistoricoAluno
     from .historico_disciplina import HistoricoDisciplina
+    from .resumo_notas_aluno import ResumoNotasAluno
     from .turma import Turma
 
 class Aluno(db.Model):
@@ -35,6 +36,7 @@ class Aluno(db.Model):
 
     historico: Mapped[list["HistoricoAluno"]] = relationship(back_populates="aluno", cascade="all, delete-orphan")
     historico_disciplinas: Mapped[list["HistoricoDisciplina"]] = relationship(back_populates="aluno", cascade="all, delete-orphan")
+    resumo_notas: Mapped[t.Optional["ResumoNotasAluno"]] = relationship(back_populates="aluno", cascade="all, delete-orphan")
 
     def __init__(self, user_id: int, opm: str, 
                  id_aluno: t.Optional[str] = None, num_aluno: t.Optional[str] = None,
@@ -0,0 +1,18 @@
+# backend/models/cache_stamp.py
+from __future__ import annotations
+from .database import db
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class CacheStamp(db.Model):
+    """
+    Carimbo de versão do cache (ver CacheService) compartilhado entre os
+    workers quando não há REDIS_URL: cada linha é um stamp e sua versão atual.
+    """
+    __tablename__ = 'cache_stamps'
+
+    chave: Mapped[str] = mapped_column(db.String(100), primary_key=True)
+    versao: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheStamp chave={self.chave} versao={self.versao}>"
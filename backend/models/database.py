@@ -1,3 +1,98 @@
+import functools
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+# Chave em app.extensions do engine só de leitura (ver configurar_engine_leitura)
+EXTENSAO_LEITURA = 'engine_leitura'
+
+_usar_leitura = ContextVar('usar_leitura', default=False)
+
+
+class SessaoRoteada(Session):
+    """
+    Sessão que, dentro de somente_leitura, envia as consultas ao engine de
+    leitura. Flushes (escritas) continuam sempre no banco principal, e sem o
+    engine configurado tudo vai para o principal.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _usar_leitura.get() and not self._flushing:
+            engine = engine_leitura()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
+
+
+@contextmanager
+def leitura_replica():
+    """Bloco cujas consultas vão para o banco só de leitura."""
+    token = _usar_leitura.set(True)
+    try:
+        yield
+    finally:
+        _usar_leitura.reset(token)
+
+
+def somente_leitura(func):
+    """
+    Decorador para consultas de relatório e estatística: as leituras feitas
+    pela função vão para o engine de leitura, sem disputar o banco com as escritas.
+    Os dados podem estar um pouco atrás do principal quando ele é uma réplica.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with leitura_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def configurar_pragmas_sqlite(engine, pragmas):
+    """
+    Aplica os PRAGMAs (ver Config.SQLITE_PRAGMAS) em cada nova conexão de um
+    engine SQLite. Engines de outros bancos não são alterados.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in pragmas.items():
+                cursor.execute(f'PRAGMA {nome}={valor}')
+        finally:
+            cursor.close()
+
+
+def engine_leitura():
+    """Engine só de leitura da app atual, ou None quando não configurado."""
+    return current_app.extensions.get(EXTENSAO_LEITURA)
+
 
-db = SQLAlchemy()
\ No newline at end of file
+def configurar_engine_leitura(app, uri, opcoes, pragmas=None):
+    """
+    Cria o engine só de leitura da app (ver uri_leitura em backend/config.py).
+    Fica fora de SQLALCHEMY_BINDS porque nenhum modelo pertence a ele: só as
+    consultas feitas dentro de somente_leitura o usam.
+    """
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        # Caminho relativo à pasta instance, como o Flask-SQLAlchemy faz com o principal
+        caminho = url.database[len('file:'):] if url.database.startswith('file:') else url.database
+        if not os.path.isabs(caminho):
+            caminho = os.path.join(app.instance_path, caminho)
+            url = url.set(database=f'file:{caminho}' if url.database.startswith('file:') else caminho)
+    engine = create_engine(url, **opcoes)
+    configurar_pragmas_sqlite(engine, pragmas)
+    app.extensions[EXTENSAO_LEITURA] = engine
+    return engine
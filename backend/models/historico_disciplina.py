@@ -27,6 +27,12 @@ class HistoricoDisciplina(db.Model):
     aluno_id: Mapped[int] = mapped_column(db.ForeignKey('alunos.id'))
     aluno: Mapped["Aluno"] = relationship(back_populates="historico_disciplinas")
 
+    __table_args__ = (
+        # Um aluno é matriculado uma única vez em cada disciplina (ver MatriculaService)
+        db.UniqueConstraint('aluno_id', 'disciplina_id', name='uq_historico_disciplinas_aluno_disciplina'),
+        db.Index('ix_historico_disciplinas_disciplina', 'disciplina_id'),
+    )
+
     def __init__(self, aluno_id: int, disciplina_id: int, 
                  nota: t.Optional[float] = None, data_conclusao: t.Optional[datetime] = None, 
                  status: str = 'cursando', **kw: t.Any) -> None:
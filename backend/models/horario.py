@@ -2,19 +2,52 @@ from __future__ import annotations
 import typing as t
 from .database import db
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.types import TypeDecorator
 
 if t.TYPE_CHECKING:
     from .disciplina import Disciplina
     from .instrutor import Instrutor
     from .semana import Semana
+    from .turma import Turma
+
+# Valores possíveis de dia_semana e status, na ordem dos códigos gravados no banco
+DIAS_SEMANA = ('segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado', 'domingo')
+STATUS_HORARIO = ('pendente', 'confirmado')
+
+
+class CodigoCompacto(TypeDecorator):
+    """
+    Grava um valor de uma lista fixa como o seu índice em um SmallInteger.
+    No Python (e nas comparações das consultas) o valor continua sendo o texto.
+    """
+
+    impl = db.SmallInteger
+    cache_ok = True
+
+    def __init__(self, valores):
+        super().__init__()
+        self.valores = tuple(valores)
+        self._codigos = {valor: codigo for codigo, valor in enumerate(self.valores)}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return self._codigos[value]
+        except KeyError:
+            raise ValueError(f"Valor inválido: {value!r}. Use um de: {', '.join(self.valores)}.") from None
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.valores[value]
+
 
 class Horario(db.Model):
     __tablename__ = 'horarios'
 
     id: Mapped[int] = mapped_column(primary_key=True)
     
-    pelotao: Mapped[str] = mapped_column(db.String(50), nullable=False)
-    dia_semana: Mapped[str] = mapped_column(db.String(20), nullable=False)
+    turma_id: Mapped[int] = mapped_column(db.ForeignKey('turmas.id'), nullable=False)
+    dia_semana: Mapped[str] = mapped_column(CodigoCompacto(DIAS_SEMANA), nullable=False)
     periodo: Mapped[int] = mapped_column(nullable=False)
     duracao: Mapped[int] = mapped_column(default=1)
 
@@ -27,13 +60,26 @@ class Horario(db.Model):
     disciplina_id: Mapped[int] = mapped_column(db.ForeignKey('disciplinas.id'), nullable=False)
     instrutor_id: Mapped[int] = mapped_column(db.ForeignKey('instrutores.id'), nullable=False)
 
-    status: Mapped[str] = mapped_column(db.String(20), default='pendente', nullable=False)
+    status: Mapped[str] = mapped_column(CodigoCompacto(STATUS_HORARIO), default='pendente', nullable=False)
 
     # Relacionamentos
+    turma: Mapped["Turma"] = relationship()
     semana: Mapped["Semana"] = relationship()
     disciplina: Mapped["Disciplina"] = relationship()
     instrutor: Mapped["Instrutor"] = relationship()
 
+    __table_args__ = (
+        # Quadro semanal (construir_matriz_horario) e conflito de slot (save_aula). A duração
+        # no fim cobre a ocupação da turma na semana sem ler a linha da tabela
+        db.Index('ix_horarios_turma_semana', 'turma_id', 'semana_id', 'dia_semana', 'periodo', 'duracao'),
+        # Horas agendadas por disciplina/turma e progresso
+        db.Index('ix_horarios_disciplina_turma', 'disciplina_id', 'turma_id'),
+        # Aulas pendentes de aprovação
+        db.Index('ix_horarios_status', 'status'),
+        # Relatórios de horas-aula por instrutor
+        db.Index('ix_horarios_instrutor_semana', 'instrutor_id', 'semana_id'),
+    )
+
     def __init__(self, **kwargs):
         """
         Construtor flexível que aceita qualquer combinação de parâmetros
@@ -41,4 +87,4 @@ class Horario(db.Model):
         super().__init__(**kwargs)
 
     def __repr__(self):
-        return f"<Horario id={self.id} pelotao='{self.pelotao}' semana_id={self.semana_id}>"
\ No newline at end of file
+        return f"<Horario id={self.id} turma_id={self.turma_id} semana_id={self.semana_id}>"
\ No newline at end of file
@@ -0,0 +1,29 @@
+# backend/models/horas_instrutor_semana.py
+from __future__ import annotations
+from .database import db
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class HorasInstrutorSemana(db.Model):
+    """
+    Livro de horas-aula confirmadas por instrutor, disciplina e semana, base
+    dos relatórios de pagamento. Mantido por RelatorioService.atualizar_horas
+    na mesma transação que confirma, altera ou remove as aulas.
+    """
+    __tablename__ = 'horas_instrutor_semanas'
+
+    # Chave começando pela semana: o relatório de um período busca as semanas pelas datas
+    # (ix_semanas_datas) e, para cada uma, as linhas do livro pelo prefixo da chave
+    semana_id: Mapped[int] = mapped_column(db.ForeignKey('semanas.id', ondelete='CASCADE'), primary_key=True)
+    instrutor_id: Mapped[int] = mapped_column(db.ForeignKey('instrutores.id', ondelete='CASCADE'), primary_key=True)
+    disciplina_id: Mapped[int] = mapped_column(db.ForeignKey('disciplinas.id', ondelete='CASCADE'), primary_key=True)
+    horas: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    __table_args__ = (
+        # Total acumulado por instrutor/disciplina (horas pagas anteriormente)
+        db.Index('ix_horas_instrutor_semanas_instrutor', 'instrutor_id', 'disciplina_id', 'semana_id', 'horas'),
+    )
+
+    def __repr__(self):
+        return (f"<HorasInstrutorSemana semana_id={self.semana_id} instrutor_id={self.instrutor_id} "
+                f"disciplina_id={self.disciplina_id} horas={self.horas}>")
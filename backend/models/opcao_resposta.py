@@ -11,12 +11,14 @@ class OpcaoResposta(db.Model):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     texto: Mapped[str] = mapped_column(db.String(200), nullable=False)
+    # Indica se a opção abre um campo de texto livre (ex: "Outro", "Quais")
+    aceita_texto_livre: Mapped[bool] = mapped_column(default=False, server_default='0')
     
     pergunta_id: Mapped[int] = mapped_column(db.ForeignKey('perguntas.id'), nullable=False)
     pergunta: Mapped[Pergunta] = relationship(back_populates="opcoes")
 
-    def __init__(self, texto: str, pergunta_id: int, **kw: t.Any) -> None:
-        super().__init__(texto=texto, pergunta_id=pergunta_id, **kw)
+    def __init__(self, texto: str, pergunta_id: int, aceita_texto_livre: bool = False, **kw: t.Any) -> None:
+        super().__init__(texto=texto, pergunta_id=pergunta_id, aceita_texto_livre=aceita_texto_livre, **kw)
 
     def __repr__(self):
         return f"<OpcaoResposta id={self.id} texto='{self.texto}'>"
\ No newline at end of file
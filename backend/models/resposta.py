@@ -15,6 +15,13 @@ class Resposta(db.Model):
     
     user_id: Mapped[int] = mapped_column(db.ForeignKey('users.id'), nullable=False)
 
+    __table_args__ = (
+        # Respostas de um participante (editar_respostas, participantes)
+        db.Index('ix_respostas_questionario_user', 'questionario_id', 'user_id'),
+        # Contagem agrupada dos resultados
+        db.Index('ix_respostas_questionario_pergunta_opcao', 'questionario_id', 'pergunta_id', 'opcao_resposta_id'),
+    )
+
     def __init__(self, questionario_id: int, pergunta_id: int, user_id: int, 
                  opcao_resposta_id: t.Optional[int] = None, texto_livre: t.Optional[str] = None, **kw: t.Any) -> None:
         super().__init__(questionario_id=questionario_id, pergunta_id=pergunta_id, user_id=user_id,
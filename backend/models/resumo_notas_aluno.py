@@ -0,0 +1,35 @@
+# backend/models/resumo_notas_aluno.py
+from __future__ import annotations
+import typing as t
+from datetime import datetime
+from .database import db
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+if t.TYPE_CHECKING:
+    from .aluno import Aluno
+
+class ResumoNotasAluno(db.Model):
+    """
+    Resumo materializado das notas de um aluno (média do curso, disciplinas
+    avaliadas e situação). Mantido por HistoricoService.atualizar_resumos na
+    mesma transação que altera as notas ou as matrículas.
+    """
+    __tablename__ = 'resumo_notas_alunos'
+
+    aluno_id: Mapped[int] = mapped_column(db.ForeignKey('alunos.id', ondelete='CASCADE'), primary_key=True)
+    aluno: Mapped["Aluno"] = relationship(back_populates="resumo_notas")
+
+    media_final: Mapped[t.Optional[float]] = mapped_column(db.Float)
+    disciplinas_avaliadas: Mapped[int] = mapped_column(default=0)
+    disciplinas_total: Mapped[int] = mapped_column(default=0)
+    status: Mapped[str] = mapped_column(db.String(20), default='cursando')
+    atualizado_em: Mapped[t.Optional[datetime]] = mapped_column()
+
+    __table_args__ = (
+        # Listagens e rankings ordenam por média dentro do conjunto de alunos
+        db.Index('ix_resumo_notas_alunos_media', 'media_final'),
+    )
+
+    def __repr__(self):
+        return (f"<ResumoNotasAluno aluno_id={self.aluno_id} media={self.media_final} "
+                f"avaliadas={self.disciplinas_avaliadas}/{self.disciplinas_total} status='{self.status}'>")
@@ -29,6 +29,12 @@ class Semana(db.Model):
     mostrar_domingo: Mapped[bool] = mapped_column(default=False, server_default='0')
     periodos_domingo: Mapped[int] = mapped_column(default=0, server_default='0')
 
+    __table_args__ = (
+        # Semana atual do ciclo e semanas de um período (relatórios)
+        db.Index('ix_semanas_ciclo_datas', 'ciclo_id', 'data_inicio', 'data_fim'),
+        db.Index('ix_semanas_datas', 'data_inicio', 'data_fim'),
+    )
+
     def __init__(self, nome: str, data_inicio: date, data_fim: date, ciclo_id: int, **kw: t.Any) -> None:
         super().__init__(nome=nome, data_inicio=data_inicio, data_fim=data_fim, ciclo_id=ciclo_id, **kw)
 
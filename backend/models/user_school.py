@@ -25,6 +25,8 @@ class UserSchool(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'school_id', name='uq_user_school'),
+        # Busca por user_id já usa uq_user_school; este cobre as listagens por escola
+        db.Index('ix_user_schools_school_role', 'school_id', 'role'),
     )
 
     def __repr__(self) -> str:
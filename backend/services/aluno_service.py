@@ -12,7 +12,11 @@ from ..models.turma import Turma
 from ..models.disciplina import Disciplina
 from ..models.historico_disciplina import HistoricoDisciplina
 from ..models.user_school import UserSchool # Importar UserSchool
-from sqlalchemy import select
+from .dashboard_service import DashboardService
+from .pagination import PaginaKeyset, paginar_keyset
+from .matricula_service import MatriculaService
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timezone
 from utils.image_utils import allowed_file
@@ -68,23 +72,9 @@ class AlunoService:
                 foto_perfil=foto_filename if foto_filename else 'default.png'
             )
             db.session.add(novo_aluno)
-            db.session.commit()
-
-            if turma_id:
-                turma = db.session.get(Turma, turma_id)
-                if turma and turma.school:
-                    disciplinas_da_escola = turma.school.disciplinas
-                    for disciplina in disciplinas_da_escola:
-                        matricula_existente = db.session.execute(
-                            select(HistoricoDisciplina).where(
-                                HistoricoDisciplina.aluno_id == novo_aluno.id,
-                                HistoricoDisciplina.disciplina_id == disciplina.id
-                            )
-                        ).scalar_one_or_none()
-                        if not matricula_existente:
-                            nova_matricula = HistoricoDisciplina(aluno_id=novo_aluno.id, disciplina_id=disciplina.id)
-                            db.session.add(nova_matricula)
-
+            db.session.flush()
+            MatriculaService.matricular_pendentes(aluno_ids=[novo_aluno.id])
+            DashboardService.invalidar_estatisticas()
             db.session.commit()
             return True, "Perfil de aluno cadastrado e matriculado nas disciplinas da escola!"
         except IntegrityError:
@@ -95,26 +85,50 @@ class AlunoService:
             current_app.logger.error(f"Erro inesperado ao cadastrar aluno: {e}")
             return False, f"Erro ao cadastrar aluno: {str(e)}"
 
-    # --- FUNÇÃO CORRIGIDA ---
     @staticmethod
-    def get_all_alunos(user, nome_turma=None):
-        stmt = select(Aluno).join(User)
+    def listar_alunos(user, nome_turma=None, busca=None, ordem='nome', cursor=None, por_pagina=50):
+        """
+        Lista paginada (keyset) dos alunos visíveis para o usuário, com filtro
+        por turma e busca por nome/matrícula feitos no banco.
+        """
+        stmt = (
+            select(Aluno)
+            .join(User, Aluno.user_id == User.id)
+            .outerjoin(Turma, Aluno.turma_id == Turma.id)
+            .options(selectinload(Aluno.user), selectinload(Aluno.turma))
+        )
 
         # Filtra por escola, se o utilizador não for admin global
         if user.role not in ['super_admin', 'programador']:
             user_school_ids = [us.school_id for us in user.user_schools]
             if not user_school_ids:
-                return []
-            stmt = stmt.join(UserSchool, User.id == UserSchool.user_id).where(UserSchool.school_id.in_(user_school_ids))
-        
-        # Filtra por turma, se especificado
+                return PaginaKeyset([], None, por_pagina)
+            # EXISTS evita linhas duplicadas quando o aluno tem mais de um vínculo
+            stmt = stmt.where(
+                select(UserSchool.id)
+                .where(UserSchool.user_id == User.id, UserSchool.school_id.in_(user_school_ids))
+                .exists()
+            )
+
         if nome_turma:
-            stmt = stmt.join(Turma).where(Turma.nome == nome_turma)
+            stmt = stmt.where(Turma.nome == nome_turma)
+
+        if busca:
+            termo = f"%{busca.strip()}%"
+            stmt = stmt.where(or_(
+                User.nome_completo.ilike(termo),
+                User.nome_de_guerra.ilike(termo),
+                User.matricula.ilike(termo),
+            ))
 
-        stmt = stmt.order_by(User.nome_completo)
+        nome = func.coalesce(User.nome_completo, '')
+        chaves = {
+            'nome': [nome, Aluno.id],
+            'matricula': [User.matricula, Aluno.id],
+            'turma': [func.coalesce(Turma.nome, ''), nome, Aluno.id],
+        }.get(ordem) or [nome, Aluno.id]
 
-        return db.session.scalars(stmt).all()
-    # --- FIM DA CORREÇÃO ---
+        return paginar_keyset(stmt, chaves, cursor=cursor, por_pagina=por_pagina)
 
     @staticmethod
     def get_aluno_by_id(aluno_id: int):
@@ -174,8 +188,12 @@ class AlunoService:
                 aluno.user.nome_completo = nome_completo
                 aluno.user.matricula = matricula_nova
             aluno.opm = opm
+            turma_alterada = aluno.turma_id != nova_turma_id
             aluno.turma_id = nova_turma_id
             aluno.funcao_atual = nova_funcao_atual
+            if turma_alterada:
+                # A nova turma pode ser de outra escola, com outras disciplinas
+                MatriculaService.matricular_pendentes(aluno_ids=[aluno.id])
 
             if foto_perfil and hasattr(foto_perfil, 'filename') and foto_perfil.filename != '':
                 foto_filename = _save_profile_picture(foto_perfil)
@@ -203,10 +221,12 @@ class AlunoService:
             user_a_deletar = aluno.user
             if user_a_deletar:
                 db.session.delete(user_a_deletar)
+                DashboardService.invalidar_estatisticas()
                 db.session.commit()
                 return True, "Aluno e todos os seus registos foram excluídos com sucesso!"
             else:
                 db.session.delete(aluno)
+                DashboardService.invalidar_estatisticas()
                 db.session.commit()
                 return True, "Perfil de aluno órfão removido com sucesso."
 
@@ -0,0 +1,208 @@
+# backend/services/cache_service.py
+
+import threading
+import time
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..models.cache_stamp import CacheStamp
+from ..models.database import db
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis é opcional em desenvolvimento
+    redis = None
+
+
+class CacheService:
+    """
+    Cache em memória do processo com invalidação por carimbo de versão.
+
+    Cada entrada fica associada a um "stamp" (ex: 'site_config'). Quando um
+    serviço altera os dados de origem, ele incrementa o stamp; todas as
+    entradas gravadas com a versão anterior passam a ser ignoradas. O stamp é
+    compartilhado entre os workers pelo Redis (REDIS_URL) ou, sem ele, pela
+    tabela cache_stamps, lida uma vez por requisição.
+    """
+
+    _lock = threading.Lock()
+    _redis_clients = {}
+
+    # --- ESTADO POR APLICAÇÃO ---
+
+    @staticmethod
+    def _state():
+        return current_app.extensions.setdefault('cache_service', {
+            'entries': {},
+        })
+
+    @staticmethod
+    def _redis():
+        url = current_app.config.get('REDIS_URL')
+        if not url or redis is None:
+            return None
+        client = CacheService._redis_clients.get(url)
+        if client is None:
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            CacheService._redis_clients[url] = client
+        return client
+
+    # --- CARIMBOS DE VERSÃO ---
+
+    @staticmethod
+    def get_version(stamp_key: str):
+        """
+        Retorna a versão atual do stamp, ou None se ela não puder ser lida. A
+        versão lida fica guardada no contexto da app (um por requisição).
+        """
+        request_versions = g.setdefault('_cache_versions', {}) if has_app_context() else {}
+        if stamp_key in request_versions:
+            return request_versions[stamp_key]
+
+        client = CacheService._redis()
+        if client is not None:
+            try:
+                raw = client.get(f"cache_stamp:{stamp_key}")
+                version = int(raw) if raw is not None else 0
+            except redis.RedisError as e:
+                current_app.logger.warning(f"Cache: falha ao ler o stamp '{stamp_key}' no Redis: {e}")
+                return None
+        else:
+            try:
+                # Sempre no banco principal: uma réplica atrasada devolveria um stamp antigo
+                version = db.session.execute(
+                    select(CacheStamp.versao).where(CacheStamp.chave == stamp_key),
+                    bind_arguments={'bind': db.engine},
+                ).scalar() or 0
+            except SQLAlchemyError as e:
+                current_app.logger.warning(f"Cache: falha ao ler o stamp '{stamp_key}' no banco: {e}")
+                return None
+
+        request_versions[stamp_key] = version
+        return version
+
+    @staticmethod
+    def bump_version(stamp_key: str):
+        """Incrementa o stamp imediatamente, invalidando as entradas associadas."""
+        client = CacheService._redis()
+        if client is not None:
+            try:
+                client.incr(f"cache_stamp:{stamp_key}")
+            except redis.RedisError as e:
+                current_app.logger.warning(f"Cache: falha ao incrementar o stamp '{stamp_key}' no Redis: {e}")
+        else:
+            try:
+                CacheService._incrementar_no_banco(stamp_key)
+            except SQLAlchemyError as e:
+                current_app.logger.warning(f"Cache: falha ao incrementar o stamp '{stamp_key}' no banco: {e}")
+
+        if has_app_context():
+            g.setdefault('_cache_versions', {}).pop(stamp_key, None)
+
+    @staticmethod
+    def _incrementar_no_banco(stamp_key: str):
+        """Cria o stamp com versão 1 ou soma 1 à versão, num único comando quando o banco permite."""
+        # Conexão própria: roda depois do commit da sessão (ver _bump_pending_stamps)
+        with db.engine.begin() as conn:
+            dialeto = conn.dialect.name
+            if dialeto in ('postgresql', 'sqlite'):
+                if dialeto == 'postgresql':
+                    from sqlalchemy.dialects.postgresql import insert as insert_dialeto
+                else:
+                    from sqlalchemy.dialects.sqlite import insert as insert_dialeto
+                comando = insert_dialeto(CacheStamp).values(chave=stamp_key, versao=1)
+                conn.execute(comando.on_conflict_do_update(
+                    index_elements=[CacheStamp.chave], set_={'versao': CacheStamp.versao + 1},
+                ))
+                return
+            if dialeto in ('mysql', 'mariadb'):
+                from sqlalchemy.dialects.mysql import insert as mysql_insert
+                comando = mysql_insert(CacheStamp).values(chave=stamp_key, versao=1)
+                conn.execute(comando.on_duplicate_key_update(versao=CacheStamp.versao + 1))
+                return
+            incrementar = (
+                update(CacheStamp)
+                .where(CacheStamp.chave == stamp_key)
+                .values(versao=CacheStamp.versao + 1)
+            )
+            if not conn.execute(incrementar).rowcount:
+                conn.execute(insert(CacheStamp).values(chave=stamp_key, versao=1))
+
+    @staticmethod
+    def invalidate_on_commit(*stamp_keys: str):
+        """
+        Agenda o incremento dos stamps para depois do próximo commit da sessão.
+        Incrementar antes do commit permitiria que outro worker recarregasse
+        os dados antigos e os gravasse com a versão nova.
+        """
+        pending = db.session.info.setdefault('pending_cache_stamps', set())
+        pending.update(stamp_keys)
+
+    # --- ENTRADAS ---
+
+    @staticmethod
+    def get(key, stamp_key: str):
+        version = CacheService.get_version(stamp_key)
+        if version is None:
+            return None
+        entry = CacheService._state()['entries'].get(key)
+        if entry is None:
+            return None
+        entry_version, expires_at, value = entry
+        if entry_version != version or (expires_at is not None and expires_at < time.monotonic()):
+            return None
+        return value
+
+    @staticmethod
+    def set(key, value, stamp_key: str, version=None, ttl=None):
+        if version is None:
+            version = CacheService.get_version(stamp_key)
+            if version is None:
+                return
+        max_entries = current_app.config.get('CACHE_MAX_ENTRIES', 1024)
+        entries = CacheService._state()['entries']
+        expires_at = time.monotonic() + ttl if ttl else None
+        with CacheService._lock:
+            entries.pop(key, None)
+            while len(entries) >= max_entries:
+                entries.pop(next(iter(entries)))
+            entries[key] = (version, expires_at, value)
+
+    @staticmethod
+    def get_or_set(key, loader, stamp_key: str, ttl=None):
+        """
+        Retorna o valor em cache ou executa `loader` e armazena o resultado.
+        A versão é lida antes de carregar os dados, de modo que uma invalidação
+        concorrente nunca deixa um valor antigo marcado como atual.
+        """
+        value = CacheService.get(key, stamp_key)
+        if value is not None:
+            return value
+
+        version = CacheService.get_version(stamp_key)
+        value = loader()
+        if version is not None:
+            CacheService.set(key, value, stamp_key, version=version, ttl=ttl)
+        return value
+
+    @staticmethod
+    def clear():
+        state = CacheService._state()
+        with CacheService._lock:
+            state['entries'].clear()
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_pending_stamps(session):
+    pending = session.info.pop('pending_cache_stamps', None)
+    if pending and has_app_context():
+        for stamp_key in pending:
+            CacheService.bump_version(stamp_key)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_stamps(session):
+    session.info.pop('pending_cache_stamps', None)
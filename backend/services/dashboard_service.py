@@ -1,8 +1,9 @@
 # backend/services/dashboard_service.py
 
 from datetime import date
+from flask import current_app
 from sqlalchemy import select, func
-from ..models.database import db
+from ..models.database import db, somente_leitura
 from ..models.user import User
 from ..models.aluno import Aluno
 from ..models.instrutor import Instrutor
@@ -11,42 +12,65 @@ from ..models.user_school import UserSchool
 from ..models.horario import Horario
 from ..models.semana import Semana
 from ..models.turma import Turma
+from .cache_service import CacheService
 from sqlalchemy.orm import joinedload
 
+# Invalidado pelos serviços que criam/excluem usuários, alunos, instrutores, disciplinas e aulas
+DASHBOARD_STAMP = 'dashboard'
+
+
 class DashboardService:
     @staticmethod
-    def get_dashboard_data(school_id=None):
+    def invalidar_estatisticas():
+        """Agenda a invalidação dos contadores do dashboard para o próximo commit."""
+        CacheService.invalidate_on_commit(DASHBOARD_STAMP)
+
+    @staticmethod
+    @somente_leitura
+    def _contar_estatisticas(school_id=None):
         """
-        Busca os dados estatísticos principais para o dashboard.
+        Calcula todos os contadores do dashboard em uma única consulta,
+        com uma subconsulta escalar por agregado.
         """
-        # ... (lógica de contagem de usuários, alunos, etc., permanece a mesma) ...
-        query_filters = [UserSchool.school_id == school_id] if school_id else []
+        total_users = select(func.count(User.id)).join(UserSchool)
+        total_alunos = select(func.count(Aluno.id)).join(User, Aluno.user_id == User.id).join(UserSchool)
+        total_instrutores = select(func.count(Instrutor.id)).join(User, Instrutor.user_id == User.id).join(UserSchool)
+        total_disciplinas = select(func.count(Disciplina.id))
+        aulas_pendentes = select(func.count(Horario.id)).where(Horario.status == 'pendente')
 
-        total_users_query = select(func.count(User.id)).join(UserSchool)
-        if query_filters:
-            total_users_query = total_users_query.where(*query_filters)
-        total_users = db.session.scalar(total_users_query)
+        if school_id:
+            total_users = total_users.where(UserSchool.school_id == school_id)
+            total_alunos = total_alunos.where(UserSchool.school_id == school_id)
+            total_instrutores = total_instrutores.where(UserSchool.school_id == school_id)
+            total_disciplinas = total_disciplinas.where(Disciplina.school_id == school_id)
+            aulas_pendentes = aulas_pendentes.join(Turma, Turma.id == Horario.turma_id).where(Turma.school_id == school_id)
 
-        total_alunos_query = select(func.count(Aluno.id)).join(User, Aluno.user_id == User.id).join(UserSchool)
-        if query_filters:
-            total_alunos_query = total_alunos_query.where(*query_filters)
-        total_alunos = db.session.scalar(total_alunos_query)
+        row = db.session.execute(select(
+            total_users.scalar_subquery().label('total_users'),
+            total_alunos.scalar_subquery().label('total_alunos'),
+            total_instrutores.scalar_subquery().label('total_instrutores'),
+            total_disciplinas.scalar_subquery().label('total_disciplinas'),
+            aulas_pendentes.scalar_subquery().label('aulas_pendentes'),
+        )).one()
+        return dict(row._mapping)
 
-        total_instrutores_query = select(func.count(Instrutor.id)).join(User, Instrutor.user_id == User.id).join(UserSchool)
-        if query_filters:
-            total_instrutores_query = total_instrutores_query.where(*query_filters)
-        total_instrutores = db.session.scalar(total_instrutores_query)
-        
-        disciplinas_query = select(func.count(Disciplina.id))
-        if school_id:
-            disciplinas_query = disciplinas_query.where(Disciplina.school_id == school_id)
-        total_disciplinas = db.session.scalar(disciplinas_query)
+    @staticmethod
+    def get_estatisticas(school_id=None):
+        """Contadores do dashboard por escola, mantidos em cache por um curto período."""
+        return CacheService.get_or_set(
+            f"dashboard:{school_id or 'todas'}",
+            lambda: DashboardService._contar_estatisticas(school_id),
+            stamp_key=DASHBOARD_STAMP,
+            ttl=current_app.config.get('DASHBOARD_CACHE_TTL', 60),
+        )
 
-        pendentes_query = select(func.count(Horario.id)).where(Horario.status == 'pendente')
-        if school_id:
-            turmas_da_escola = select(Turma.nome).where(Turma.school_id == school_id)
-            pendentes_query = pendentes_query.where(Horario.pelotao.in_(turmas_da_escola))
-        aulas_pendentes = db.session.scalar(pendentes_query)
+    @staticmethod
+    @somente_leitura
+    def get_dashboard_data(school_id=None):
+        """
+        Busca os dados estatísticos principais para o dashboard.
+        """
+        dados = dict(DashboardService.get_estatisticas(school_id))
 
         today = date.today()
         proximas_aulas_query = (
@@ -54,6 +78,7 @@ class DashboardService:
             .join(Semana)
             .where(Semana.data_fim >= today, Horario.status == 'confirmado')
             .options(
+                joinedload(Horario.turma),
                 joinedload(Horario.disciplina),
                 joinedload(Horario.instrutor).joinedload(Instrutor.user),
                 joinedload(Horario.semana)
@@ -62,8 +87,11 @@ class DashboardService:
             .limit(5)
         )
         if school_id:
-            turmas_da_escola = select(Turma.nome).where(Turma.school_id == school_id)
-            proximas_aulas_query = proximas_aulas_query.where(Horario.pelotao.in_(turmas_da_escola))
+            proximas_aulas_query = (
+                proximas_aulas_query
+                .join(Turma, Turma.id == Horario.turma_id)
+                .where(Turma.school_id == school_id)
+            )
             
         proximas_aulas = db.session.scalars(proximas_aulas_query).all()
         
@@ -80,12 +108,6 @@ class DashboardService:
         
         usuarios_recentes = db.session.scalars(recent_activity_query).all()
 
-        return {
-            'total_users': total_users,
-            'total_alunos': total_alunos,
-            'total_instrutores': total_instrutores,
-            'total_disciplinas': total_disciplinas,
-            'aulas_pendentes': aulas_pendentes,
-            'proximas_aulas': proximas_aulas,
-            'usuarios_recentes': usuarios_recentes,
-        }
\ No newline at end of file
+        dados['proximas_aulas'] = proximas_aulas
+        dados['usuarios_recentes'] = usuarios_recentes
+        return dados
@@ -0,0 +1,153 @@
+# backend/services/desempenho_service.py
+
+import math
+
+from sqlalchemy import select, func, case, and_
+
+from ..models.database import db, somente_leitura
+from ..models.aluno import Aluno
+from ..models.user import User
+from ..models.disciplina import Disciplina
+from ..models.historico_disciplina import HistoricoDisciplina
+from ..models.resumo_notas_aluno import ResumoNotasAluno
+from .historico_service import MEDIA_APROVACAO
+
+# Faixas de nota da distribuição: [0, 1), [1, 2), ..., [9, 10]
+FAIXAS_NOTA = 10
+
+
+def _nulos_por_ultimo(coluna, descendente=False):
+    """Ordenação com as notas nulas no fim em qualquer banco (sem NULLS LAST)."""
+    return (case((coluna.is_(None), 1), else_=0), coluna.desc() if descendente else coluna.asc())
+
+
+class DesempenhoService:
+    """
+    Estatísticas de notas de uma turma e classificação dos alunos.
+
+    Tudo é calculado no banco: uma consulta agregada por disciplina (com a
+    mediana obtida por ROW_NUMBER) e uma consulta com RANK() para a
+    classificação, sem carregar as notas uma a uma no Python.
+    """
+
+    @staticmethod
+    @somente_leitura
+    def get_estatisticas_turma(turma_id, disciplina_id=None):
+        """
+        Distribuição, média, mediana, desvio padrão, mínimo, máximo e contagem
+        de recuperação das notas de cada disciplina da turma, em uma consulta.
+        """
+        h = HistoricoDisciplina
+        linhas = (
+            select(
+                h.disciplina_id,
+                h.nota,
+                h.nota_p1,
+                h.nota_p2,
+                h.nota_rec,
+                func.row_number().over(
+                    partition_by=h.disciplina_id, order_by=_nulos_por_ultimo(h.nota)
+                ).label('ordem'),
+                func.count(h.nota).over(partition_by=h.disciplina_id).label('avaliados'),
+            )
+            .join(Aluno, Aluno.id == h.aluno_id)
+            .where(Aluno.turma_id == turma_id)
+        )
+        if disciplina_id is not None:
+            linhas = linhas.where(h.disciplina_id == disciplina_id)
+        notas = linhas.subquery('notas')
+        nota = notas.c.nota
+
+        # Uma (n ímpar) ou duas (n par) notas do meio da ordenação
+        meio = and_(notas.c.ordem >= (notas.c.avaliados + 1) // 2, notas.c.ordem <= (notas.c.avaliados + 2) // 2)
+        mpd = (notas.c.nota_p1 + notas.c.nota_p2) / 2
+        faixas = []
+        for i in range(FAIXAS_NOTA):
+            limite = nota <= i + 1 if i == FAIXAS_NOTA - 1 else nota < i + 1
+            faixas.append(func.sum(case((and_(nota >= i, limite), 1), else_=0)).label(f'faixa_{i}'))
+
+        stmt = (
+            select(
+                Disciplina.id.label('disciplina_id'),
+                Disciplina.materia,
+                func.count().label('matriculados'),
+                func.count(nota).label('avaliados'),
+                func.avg(nota).label('media'),
+                func.avg(case((meio, nota))).label('mediana'),
+                func.avg(nota * nota).label('media_quadrados'),
+                func.min(nota).label('minima'),
+                func.max(nota).label('maxima'),
+                func.sum(case((mpd < MEDIA_APROVACAO, 1), else_=0)).label('abaixo_da_media'),
+                func.count(notas.c.nota_rec).label('com_recuperacao'),
+                *faixas,
+            )
+            .join(Disciplina, Disciplina.id == notas.c.disciplina_id)
+            .group_by(Disciplina.id, Disciplina.materia)
+            .order_by(Disciplina.materia)
+        )
+
+        estatisticas = []
+        for row in db.session.execute(stmt):
+            dados = row._mapping
+            desvio = None
+            if dados['media'] is not None:
+                # Desvio padrão populacional: sqrt(E[x²] - E[x]²)
+                desvio = math.sqrt(max(dados['media_quadrados'] - dados['media'] ** 2, 0.0))
+            estatisticas.append({
+                'disciplina_id': dados['disciplina_id'],
+                'materia': dados['materia'],
+                'matriculados': dados['matriculados'],
+                'avaliados': dados['avaliados'],
+                'media': dados['media'],
+                'mediana': dados['mediana'],
+                'desvio_padrao': desvio,
+                'minima': dados['minima'],
+                'maxima': dados['maxima'],
+                'abaixo_da_media': dados['abaixo_da_media'] or 0,
+                'com_recuperacao': dados['com_recuperacao'],
+                'distribuicao': [dados[f'faixa_{i}'] or 0 for i in range(FAIXAS_NOTA)],
+            })
+        return estatisticas
+
+    @staticmethod
+    @somente_leitura
+    def get_classificacao_turma(turma_id, disciplina_id=None):
+        """
+        Classificação dos alunos da turma pela média do curso (resumo de notas)
+        ou pela nota final de uma disciplina. Empates dividem a posição (RANK) e
+        alunos sem nota ficam no fim, sem posição.
+        """
+        if disciplina_id is None:
+            media = ResumoNotasAluno.media_final
+            status = ResumoNotasAluno.status
+            stmt = select(Aluno.id, User.nome_completo, User.matricula, media, status).outerjoin(
+                ResumoNotasAluno, ResumoNotasAluno.aluno_id == Aluno.id
+            )
+        else:
+            media = HistoricoDisciplina.nota
+            status = HistoricoDisciplina.status
+            stmt = select(Aluno.id, User.nome_completo, User.matricula, media, status).outerjoin(
+                HistoricoDisciplina,
+                and_(HistoricoDisciplina.aluno_id == Aluno.id, HistoricoDisciplina.disciplina_id == disciplina_id),
+            )
+
+        ordem = _nulos_por_ultimo(media, descendente=True)
+        posicao = case((media.is_(None), None), else_=func.rank().over(order_by=ordem))
+        stmt = (
+            stmt.add_columns(posicao)
+            .join(User, User.id == Aluno.user_id)
+            .where(Aluno.turma_id == turma_id)
+            .order_by(*ordem, User.nome_completo, Aluno.id)
+        )
+
+        return [
+            {
+                'posicao': pos,
+                'aluno_id': aluno_id,
+                'nome': nome,
+                'matricula': matricula,
+                'media': nota,
+                'status': situacao,
+            }
+            for aluno_id, nome, matricula, nota, situacao, pos in db.session.execute(stmt)
+        ]
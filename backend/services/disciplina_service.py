@@ -1,7 +1,8 @@
 # backend/services/disciplina_service.py
 
 from collections import defaultdict
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import IntegrityError
 from flask import current_app
 from datetime import date
@@ -15,6 +16,9 @@ from ..models.turma import Turma
 from ..models.ciclo import Ciclo
 from ..models.horario import Horario
 from ..models.semana import Semana
+from .dashboard_service import DashboardService
+from .matricula_service import MatriculaService
+from .historico_service import HistoricoService
 
 class DisciplinaService:
     @staticmethod
@@ -40,14 +44,9 @@ class DisciplinaService:
             db.session.add(nova_disciplina)
             db.session.flush()
 
-            alunos_da_escola = db.session.scalars(
-                select(Aluno).join(Turma).where(Turma.school_id == school_id)
-            ).all()
-
-            for aluno in alunos_da_escola:
-                matricula = HistoricoDisciplina(aluno_id=aluno.id, disciplina_id=nova_disciplina.id)
-                db.session.add(matricula)
+            MatriculaService.matricular_pendentes(disciplina_ids=[nova_disciplina.id])
 
+            DashboardService.invalidar_estatisticas()
             db.session.commit()
             return True, 'Disciplina criada e associada aos alunos da escola com sucesso!'
         except (ValueError, TypeError):
@@ -87,9 +86,21 @@ class DisciplinaService:
             return False, 'Disciplina não encontrada.'
 
         try:
+            # Aulas agendadas alimentam o relatório de horas-aula: não são apagadas junto
+            horarios_count = db.session.scalar(
+                select(func.count(Horario.id)).where(Horario.disciplina_id == disciplina_id)
+            )
+            if horarios_count > 0:
+                return False, f'Não é possível excluir esta disciplina, pois existem {horarios_count} aulas agendadas com ela.'
+
+            aluno_ids = db.session.scalars(
+                select(HistoricoDisciplina.aluno_id).where(HistoricoDisciplina.disciplina_id == disciplina_id)
+            ).all()
             db.session.query(HistoricoDisciplina).filter_by(disciplina_id=disciplina_id).delete()
             db.session.query(DisciplinaTurma).filter_by(disciplina_id=disciplina_id).delete()
             db.session.delete(disciplina)
+            HistoricoService.atualizar_resumos(aluno_ids)
+            DashboardService.invalidar_estatisticas()
             db.session.commit()
             return True, 'Disciplina e todos os seus registros associados foram excluídos com sucesso!'
         except Exception as e:
@@ -105,53 +116,98 @@ class DisciplinaService:
         """
         disciplinas_query = (
             select(Disciplina)
+            .options(joinedload(Disciplina.ciclo))
             .where(Disciplina.school_id == school_id)
             .order_by(Disciplina.ciclo_id, Disciplina.materia)
         )
         disciplinas = db.session.scalars(disciplinas_query).all()
+        progresso, _ = DisciplinaService.get_progresso_em_lote(disciplinas)
         
         disciplinas_agrupadas = defaultdict(list)
         for disciplina in disciplinas:
-            progresso = DisciplinaService.get_dados_progresso(disciplina)
-            item = {'disciplina': disciplina, 'progresso': progresso}
+            item = {'disciplina': disciplina, 'progresso': progresso[disciplina.id]}
             if disciplina.ciclo:
                 disciplinas_agrupadas[disciplina.ciclo.nome].append(item)
             
         return dict(sorted(disciplinas_agrupadas.items()))
 
-    # --- FUNÇÃO MODIFICADA PARA ACEITAR FILTRO DE PELOTÃO ---
     @staticmethod
-    def get_dados_progresso(disciplina, pelotao_nome=None):
+    def _montar_progresso(concluido, programado, carga_horaria):
+        percentual = 0
+        if carga_horaria > 0:
+            percentual = round((concluido / carga_horaria) * 100)
+        return {
+            'agendado': concluido,
+            'programado': programado,
+            'previsto': carga_horaria,
+            'percentual': min(percentual, 100)
+        }
+
+    @staticmethod
+    def get_progresso_em_lote(disciplinas, turma_id=None, turma_ids=None):
         """
-        Calcula as horas agendadas, previstas e o percentual de conclusão de uma disciplina,
-        opcionalmente filtrando por um pelotão específico.
+        Calcula o progresso de várias disciplinas com uma única consulta agrupada
+        por disciplina e turma.
+
+        Retorna (progresso, matriz):
+        - progresso: {disciplina_id: {'agendado', 'programado', 'previsto', 'percentual'}},
+          somando todas as turmas ou apenas `turma_id`, se informado;
+        - matriz: {disciplina_id: {turma_id: dados}} para cada id em `turma_ids`
+          (vazia se `turma_ids` não for informado).
+
+        'agendado' são as horas confirmadas de semanas já encerradas e
+        'programado' inclui também as semanas atuais e futuras.
         """
-        
-        # A consulta agora junta com a tabela de semanas para filtrar pela data
+        disciplinas = list(disciplinas)
+        turma_ids = list(turma_ids or [])
+        if not disciplinas:
+            return {}, {}
+
         query = (
-            select(func.sum(Horario.duracao))
+            select(
+                Horario.disciplina_id,
+                Horario.turma_id,
+                func.sum(case((Semana.data_fim < date.today(), Horario.duracao), else_=0)),
+                func.sum(Horario.duracao)
+            )
             .join(Semana)
             .where(
-                Horario.disciplina_id == disciplina.id,
-                Horario.status == 'confirmado',
-                Semana.data_fim < date.today() # Apenas aulas de semanas que já terminaram
+                Horario.disciplina_id.in_([d.id for d in disciplinas]),
+                Horario.status == 'confirmado'
             )
+            .group_by(Horario.disciplina_id, Horario.turma_id)
         )
-        
-        # Adiciona o filtro de pelotão se ele for fornecido
-        if pelotao_nome:
-            query = query.where(Horario.pelotao == pelotao_nome)
-
-        total_concluido = db.session.scalar(query) or 0
-        
-        carga_horaria = disciplina.carga_horaria_prevista
-        
-        percentual = 0
-        if carga_horaria > 0:
-            percentual = round((total_concluido / carga_horaria) * 100)
-            
-        return {
-            'agendado': total_concluido,
-            'previsto': carga_horaria,
-            'percentual': min(percentual, 100)
-        }
\ No newline at end of file
+        if turma_id:
+            query = query.where(Horario.turma_id == turma_id)
+
+        totais = defaultdict(lambda: [0, 0])
+        por_turma = {}
+        for disciplina_id, id_turma, concluido, programado in db.session.execute(query):
+            concluido, programado = concluido or 0, programado or 0
+            totais[disciplina_id][0] += concluido
+            totais[disciplina_id][1] += programado
+            por_turma[(disciplina_id, id_turma)] = (concluido, programado)
+
+        progresso = {}
+        matriz = {}
+        for disciplina in disciplinas:
+            carga = disciplina.carga_horaria_prevista
+            concluido, programado = totais.get(disciplina.id, (0, 0))
+            progresso[disciplina.id] = DisciplinaService._montar_progresso(concluido, programado, carga)
+            if turma_ids:
+                matriz[disciplina.id] = {
+                    id_turma: DisciplinaService._montar_progresso(*por_turma.get((disciplina.id, id_turma), (0, 0)), carga)
+                    for id_turma in turma_ids
+                }
+        return progresso, matriz
+
+    # --- FUNÇÃO MODIFICADA PARA ACEITAR FILTRO DE TURMA ---
+    @staticmethod
+    def get_dados_progresso(disciplina, turma_id=None):
+        """
+        Calcula as horas agendadas, previstas e o percentual de conclusão de uma disciplina,
+        opcionalmente filtrando por uma turma específica.
+        Para listas de disciplinas, prefira get_progresso_em_lote.
+        """
+        progresso, _ = DisciplinaService.get_progresso_em_lote([disciplina], turma_id)
+        return progresso[disciplina.id]
@@ -6,9 +6,16 @@ from ..models.aluno import Aluno
 from ..models.disciplina import Disciplina
 from ..models.historico_disciplina import HistoricoDisciplina
 from ..models.historico import HistoricoAluno
-from sqlalchemy import select, and_
+from ..models.resumo_notas_aluno import ResumoNotasAluno
+from ..models.user import User
+from sqlalchemy import select, and_, case, delete, func, insert, literal, update
+from sqlalchemy.orm import contains_eager
 from flask import current_app
 
+# Média mínima da disciplina antes da recuperação e do curso para aprovação
+MEDIA_APROVACAO = 7.0
+NOTA_MAXIMA = 10.0
+
 class HistoricoService:
 
     # --- MÉTODOS EXISTENTES (DISCIPLINAS E NOTAS) ---
@@ -19,6 +26,70 @@ class HistoricoService:
         stmt = select(HistoricoDisciplina).where(HistoricoDisciplina.aluno_id == aluno_id).order_by(HistoricoDisciplina.id)
         return db.session.scalars(stmt).all()
 
+    @staticmethod
+    def get_resumo_aluno(aluno_id: int):
+        """Resumo materializado das notas do aluno (média, disciplinas avaliadas e situação)."""
+        return db.session.get(ResumoNotasAluno, aluno_id)
+
+    @staticmethod
+    def get_resumos(aluno_ids):
+        """Resumos de vários alunos de uma vez, indexados pelo id do aluno."""
+        if not aluno_ids:
+            return {}
+        stmt = select(ResumoNotasAluno).where(ResumoNotasAluno.aluno_id.in_(aluno_ids))
+        return {resumo.aluno_id: resumo for resumo in db.session.scalars(stmt)}
+
+    @staticmethod
+    def atualizar_resumos(aluno_ids):
+        """
+        Recalcula no banco o resumo de notas dos alunos indicados (lista de ids
+        ou subconsulta). A agregação é feita em SQL e regrava os resumos com um
+        DELETE + INSERT ... SELECT. Não faz commit: entra na transação de quem
+        alterou as notas ou as matrículas.
+        """
+        if isinstance(aluno_ids, (list, tuple, set)) and not aluno_ids:
+            return
+
+        media = func.avg(HistoricoDisciplina.nota)
+        avaliadas = func.count(HistoricoDisciplina.nota)
+        total = func.count(HistoricoDisciplina.id)
+        status = case(
+            (avaliadas < total, 'cursando'),
+            (media >= MEDIA_APROVACAO, 'aprovado'),
+            else_='reprovado',
+        )
+        agregados = (
+            select(
+                HistoricoDisciplina.aluno_id, media, avaliadas, total, status,
+                literal(datetime.utcnow(), db.DateTime),
+            )
+            .where(HistoricoDisciplina.aluno_id.in_(aluno_ids))
+            .group_by(HistoricoDisciplina.aluno_id)
+        )
+
+        db.session.flush()
+        tabela = ResumoNotasAluno.__table__
+        db.session.execute(delete(tabela).where(tabela.c.aluno_id.in_(aluno_ids)))
+        db.session.execute(insert(tabela).from_select(
+            ['aluno_id', 'media_final', 'disciplinas_avaliadas', 'disciplinas_total', 'status', 'atualizado_em'],
+            agregados,
+        ))
+
+    @staticmethod
+    def calcular_media_disciplina(nota_p1, nota_p2, nota_rec=None, considerar_rec=False):
+        """
+        Média final da disciplina: MPD (média das provas) ou, se a MPD ficar
+        abaixo da média e a recuperação for considerada, MFD. Sem as duas
+        provas a média fica nula.
+        """
+        if nota_p1 is None or nota_p2 is None:
+            return None
+        mpd = (nota_p1 + nota_p2) / 2
+        # A recuperação só é considerada se a média for inferior a 7 e a nota de rec. existir
+        if considerar_rec and mpd < MEDIA_APROVACAO and nota_rec is not None:
+            return round((nota_p1 + nota_p2 + nota_rec) / 3, 3)
+        return round(mpd, 3)
+
     @staticmethod
     def get_historico_atividades_for_aluno(aluno_id: int):
         """Busca todos os registros de atividades (ex: mudanças de perfil) para um aluno específico."""
@@ -46,19 +117,11 @@ class HistoricoService:
 
             registro.nota_p1 = nota_p1
             registro.nota_p2 = nota_p2
+            registro.nota = HistoricoService.calcular_media_disciplina(
+                nota_p1, nota_p2, nota_rec, considerar_rec=from_admin
+            )
 
-            # Lógica de cálculo da média final
-            if nota_p1 is not None and nota_p2 is not None:
-                mpd = (nota_p1 + nota_p2) / 2
-                # A recuperação só é considerada se a média for inferior a 7 e a nota de rec. existir
-                if from_admin and mpd < 7.0 and nota_rec is not None:
-                    mfd = (nota_p1 + nota_p2 + nota_rec) / 3
-                    registro.nota = round(mfd, 3)
-                else:
-                    registro.nota = round(mpd, 3)
-            else:
-                registro.nota = None # Se faltar uma das notas, a média fica nula
-
+            HistoricoService.atualizar_resumos([registro.aluno_id])
             db.session.commit()
             return True, "Avaliação salva com sucesso.", registro.aluno_id
         except (ValueError, TypeError):
@@ -69,6 +132,117 @@ class HistoricoService:
             current_app.logger.error(f"Erro ao salvar avaliação: {e}")
             return False, "Ocorreu um erro ao salvar a avaliação.", registro.aluno_id
 
+    # --- LANÇAMENTO DE NOTAS EM LOTE (PLANILHA DA TURMA) ---
+
+    @staticmethod
+    def get_planilha_notas(turma_id: int, disciplina_id: int):
+        """Matrículas da turma na disciplina, com aluno e usuário, ordenadas pelo nome."""
+        stmt = (
+            select(HistoricoDisciplina)
+            .join(HistoricoDisciplina.aluno)
+            .join(Aluno.user)
+            .where(Aluno.turma_id == turma_id, HistoricoDisciplina.disciplina_id == disciplina_id)
+            .options(contains_eager(HistoricoDisciplina.aluno).contains_eager(Aluno.user))
+            .order_by(User.nome_completo, Aluno.id)
+        )
+        return db.session.scalars(stmt).all()
+
+    @staticmethod
+    def _ler_nota(valor):
+        """Converte o valor digitado (aceita vírgula decimal) em nota; vazio vira None."""
+        if valor is None or str(valor).strip() == '':
+            return None
+        nota = float(str(valor).strip().replace(',', '.'))
+        if not 0 <= nota <= NOTA_MAXIMA:
+            raise ValueError
+        return nota
+
+    @staticmethod
+    def lancar_notas_turma(turma_id: int, disciplina_id: int, linhas, from_admin: bool = False):
+        """
+        Lança as notas de uma turma inteira em uma disciplina.
+
+        `linhas` é uma lista de dicts com historico_id, nota_p1, nota_p2 e
+        nota_rec (esta só vale para admins, como em avaliar_aluno). Todas as
+        linhas são validadas antes de gravar; se alguma tiver erro nada é
+        gravado. Caso contrário as médias são calculadas com as regras de
+        MPD/MFD e tudo é salvo em uma única transação. Quem pode lançar é
+        conferido por quem chama (ver _pode_lancar_notas no historico_controller).
+
+        Retorna (sucesso, mensagem, erros), com um erro por linha inválida:
+        {'linha', 'historico_id', 'mensagem'}.
+        """
+        linhas = list(linhas or [])
+        if not linhas:
+            return False, "Nenhuma nota enviada.", []
+
+        ids = set()
+        for linha in linhas:
+            try:
+                ids.add(int(linha.get('historico_id')))
+            except (TypeError, ValueError):
+                pass
+        registros = {
+            registro.id: registro
+            for registro in db.session.scalars(
+                select(HistoricoDisciplina)
+                .join(Aluno, Aluno.id == HistoricoDisciplina.aluno_id)
+                .where(
+                    HistoricoDisciplina.id.in_(ids),
+                    HistoricoDisciplina.disciplina_id == disciplina_id,
+                    Aluno.turma_id == turma_id,
+                )
+            )
+        }
+
+        erros, alteracoes, vistos = [], [], set()
+        for numero, linha in enumerate(linhas, start=1):
+            historico_id = linha.get('historico_id')
+            try:
+                registro = registros.get(int(historico_id))
+            except (TypeError, ValueError):
+                registro = None
+            if registro is None:
+                erros.append({'linha': numero, 'historico_id': historico_id,
+                              'mensagem': "Matrícula não encontrada nesta turma e disciplina."})
+                continue
+            if registro.id in vistos:
+                erros.append({'linha': numero, 'historico_id': registro.id,
+                              'mensagem': "Matrícula repetida na planilha."})
+                continue
+            vistos.add(registro.id)
+
+            try:
+                nota_p1 = HistoricoService._ler_nota(linha.get('nota_p1'))
+                nota_p2 = HistoricoService._ler_nota(linha.get('nota_p2'))
+                nota_rec = HistoricoService._ler_nota(linha.get('nota_rec')) if from_admin else registro.nota_rec
+            except ValueError:
+                erros.append({'linha': numero, 'historico_id': registro.id,
+                              'mensagem': f"As notas devem ser números entre 0 e {NOTA_MAXIMA:g}."})
+                continue
+
+            alteracoes.append({
+                'id': registro.id,
+                'nota_p1': nota_p1,
+                'nota_p2': nota_p2,
+                'nota_rec': nota_rec,
+                'nota': HistoricoService.calcular_media_disciplina(nota_p1, nota_p2, nota_rec, considerar_rec=from_admin),
+            })
+
+        if erros:
+            return False, f"Nenhuma nota foi salva: {len(erros)} linha(s) com erro.", erros
+
+        try:
+            # UPDATE em lote pela chave primária (executemany)
+            db.session.execute(update(HistoricoDisciplina), alteracoes)
+            HistoricoService.atualizar_resumos(list({registros[a['id']].aluno_id for a in alteracoes}))
+            db.session.commit()
+            return True, f"{len(alteracoes)} avaliações salvas com sucesso.", []
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro ao salvar notas em lote: {e}")
+            return False, "Ocorreu um erro ao salvar as avaliações.", []
+
     # --- NOVOS MÉTODOS (CRUD DE ATIVIDADES) ---
 
     @staticmethod
@@ -2,22 +2,81 @@
 
 from flask import current_app
 from flask_login import current_user
-from sqlalchemy import select, func
+from sqlalchemy import select, func, type_coerce, Integer
 from sqlalchemy.orm import joinedload
 from datetime import date, timedelta
 
 from ..models.database import db
-from ..models.horario import Horario
+from ..models.horario import Horario, DIAS_SEMANA
 from ..models.disciplina import Disciplina
 from ..models.instrutor import Instrutor
 from ..models.disciplina_turma import DisciplinaTurma
 from ..models.semana import Semana
 from ..models.turma import Turma
 from ..models.user import User
+from .cache_service import CacheService
+from .dashboard_service import DashboardService
+from .relatorio_service import RelatorioService
+from .identity_service import current_identity
+from .ocupacao_horario import OcupacaoSemana
+
+PERIODOS_POR_DIA = 15
+OPERACOES_LOTE = ('criar', 'atualizar', 'mover', 'remover')
+
+
+class CelulaHorario:
+    """
+    Uma célula do quadro de horários. A matriz base em cache guarda essas
+    células sem os campos de quem visualiza; construir_matriz_horario gera
+    uma cópia por usuário com para_usuario.
+    """
+
+    __slots__ = ('id', 'materia', 'instrutor', 'instrutor_id', 'observacao', 'duracao',
+                 'status', 'is_disposicao', 'is_continuation', 'can_edit')
+
+    def __init__(self, id=None, materia=None, instrutor=None, instrutor_id=None, observacao=None,
+                 duracao=1, status='confirmado', is_disposicao=False, is_continuation=False, can_edit=False):
+        self.id = id
+        self.materia = materia
+        self.instrutor = instrutor
+        self.instrutor_id = instrutor_id
+        self.observacao = observacao
+        self.duracao = duracao
+        self.status = status
+        self.is_disposicao = is_disposicao
+        self.is_continuation = is_continuation
+        self.can_edit = can_edit
+
+    def para_usuario(self, is_admin, instrutor_id):
+        """Cópia da célula para quem visualiza: aulas pendentes de outros instrutores ficam ocultas."""
+        can_see_details = is_admin or (instrutor_id is not None and self.instrutor_id == instrutor_id)
+        oculta = self.status != 'confirmado' and not can_see_details
+        return CelulaHorario(
+            self.id, 'Aguardando Aprovação' if oculta else self.materia, None if oculta else self.instrutor,
+            self.instrutor_id, self.observacao, self.duracao, self.status,
+            self.is_disposicao, self.is_continuation, can_see_details,
+        )
+
+    def to_dict(self):
+        """Dados da célula para respostas JSON (sem o id do instrutor)."""
+        return {campo: getattr(self, campo) for campo in self.__slots__ if campo != 'instrutor_id'}
+
+
+# Célula vazia do quadro; é a mesma instância em todas as posições e nunca é alterada
+A_DISPOSICAO = CelulaHorario(materia='A disposição do C Al /S Ens', is_disposicao=True)
 
 
 class HorarioService:
 
+    @staticmethod
+    def _instrutor_id(user):
+        """Id do perfil de instrutor do usuário; para o usuário logado vem da identidade da requisição."""
+        if user is None:
+            return None
+        if current_identity.user_id is not None and current_identity.user_id == user.id:
+            return current_identity.instrutor_id
+        return user.instrutor_profile.id if user.instrutor_profile else None
+
     @staticmethod
     def can_edit_horario(horario, user):
         """Verifica se um usuário pode editar um horário específico."""
@@ -25,35 +84,53 @@ class HorarioService:
             return False
         if user.role in ['super_admin', 'programador', 'admin_escola']:
             return True
-        if user.role == 'instrutor' and user.instrutor_profile:
-            return horario.instrutor_id == user.instrutor_profile.id
+        if user.role == 'instrutor':
+            instrutor_id = HorarioService._instrutor_id(user)
+            return instrutor_id is not None and horario.instrutor_id == instrutor_id
         return False
 
     @staticmethod
-    def construir_matriz_horario(pelotao, semana_id, user):
-        """Constrói a matriz 15x7 para exibir o quadro de horários, pulando os intervalos."""
-        a_disposicao = {'materia': 'A disposição do C Al /S Ens', 'instrutor': None, 'duracao': 1, 'is_disposicao': True, 'id': None, 'status': 'confirmado'}
-        horario_matrix = [[dict(a_disposicao) for _ in range(7)] for _ in range(15)]
-        dias = ['segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado', 'domingo']
-        
-        aulas = db.session.scalars(
-            select(Horario).options(
-                joinedload(Horario.disciplina),
-                joinedload(Horario.instrutor).joinedload(Instrutor.user)
-            ).where(Horario.pelotao == pelotao, Horario.semana_id == semana_id)
+    def _stamp_matriz(turma_id, semana_id):
+        return f"horario:{turma_id}:{semana_id}"
+
+    @staticmethod
+    def _invalidar_matriz(turma_id, semana_id):
+        """Descarta a matriz em cache da semana/turma após o commit da sessão."""
+        CacheService.invalidate_on_commit(HorarioService._stamp_matriz(turma_id, semana_id))
+
+    @staticmethod
+    def _construir_matriz_base(turma_id, semana_id):
+        """
+        Monta a matriz 15x7 independente de usuário: cada célula é None (à
+        disposição), 'SKIP' ou uma CelulaHorario com os dados da aula. Os campos
+        que dependem de quem visualiza são aplicados em construir_matriz_horario.
+        """
+        matriz = [[None for _ in range(7)] for _ in range(15)]
+
+        # Só as colunas usadas no quadro; o dia vem como o código gravado, que já é o índice da coluna
+        aulas = db.session.execute(
+            select(
+                Horario.id, type_coerce(Horario.dia_semana, Integer), Horario.periodo, Horario.duracao,
+                Horario.status, Horario.instrutor_id, Horario.observacao,
+                Disciplina.materia, User.nome_de_guerra, User.username,
+            )
+            .join(Disciplina, Disciplina.id == Horario.disciplina_id)
+            .outerjoin(Instrutor, Instrutor.id == Horario.instrutor_id)
+            .outerjoin(User, User.id == Instrutor.user_id)
+            .where(Horario.turma_id == turma_id, Horario.semana_id == semana_id)
         ).all()
 
-        for aula in aulas:
+        for aula_id, dia_idx, periodo, duracao, status, instrutor_id, observacao, materia, nome_de_guerra, username in aulas:
             try:
-                dia_idx = dias.index(aula.dia_semana)
-                
                 periodos_processados = 0
-                periodo_inicial_bloco = aula.periodo
+                periodo_inicial_bloco = periodo
                 is_continuation = False
 
-                while periodos_processados < aula.duracao:
+                instrutor_nome = (nome_de_guerra or username) if username else "N/D"
+
+                while periodos_processados < duracao:
                     periodo_atual_idx = periodo_inicial_bloco - 1
-                    periodos_restantes = aula.duracao - periodos_processados
+                    periodos_restantes = duracao - periodos_processados
 
                     duracao_bloco = 0
                     if periodo_inicial_bloco <= 3:
@@ -67,35 +144,53 @@ class HorarioService:
                     
                     if duracao_bloco <= 0: break 
 
-                    can_see_details = HorarioService.can_edit_horario(aula, user)
-                    instrutor_nome = "N/D"
-                    if aula.instrutor and aula.instrutor.user:
-                        instrutor_nome = aula.instrutor.user.nome_de_guerra or aula.instrutor.user.username
-
-                    aula_info = {
-                        'id': aula.id,
-                        'materia': aula.disciplina.materia if aula.status == 'confirmado' or can_see_details else 'Aguardando Aprovação',
-                        'instrutor': instrutor_nome if aula.status == 'confirmado' or can_see_details else None,
-                        'observacao': aula.observacao, # --- CAMPO NOVO ADICIONADO ---
-                        'duracao': duracao_bloco,
-                        'status': aula.status,
-                        'is_disposicao': False,
-                        'can_edit': can_see_details,
-                        'is_continuation': is_continuation
-                    }
+                    aula_info = CelulaHorario(
+                        aula_id, materia, instrutor_nome, instrutor_id, observacao,
+                        duracao_bloco, status, is_continuation=is_continuation,
+                    )
                     
                     if 0 <= periodo_atual_idx < 15:
-                        horario_matrix[periodo_atual_idx][dia_idx] = aula_info
+                        matriz[periodo_atual_idx][dia_idx] = aula_info
                         for i in range(1, duracao_bloco):
                             if (periodo_atual_idx + i) < 15:
-                                horario_matrix[periodo_atual_idx + i][dia_idx] = 'SKIP'
+                                matriz[periodo_atual_idx + i][dia_idx] = 'SKIP'
 
                     periodos_processados += duracao_bloco
                     periodo_inicial_bloco += duracao_bloco
                     is_continuation = True
 
-            except (ValueError, IndexError):
+            except IndexError:
                 continue
+        return matriz
+
+    @staticmethod
+    def construir_matriz_horario(turma_id, semana_id, user):
+        """Constrói a matriz 15x7 para exibir o quadro de horários, pulando os intervalos."""
+        # A matriz base é compartilhada por todos os usuários da turma e só é
+        # reconstruída quando uma aula da semana muda (ou o TTL expira).
+        matriz_base = CacheService.get_or_set(
+            f"horario_matriz:{turma_id}:{semana_id}",
+            lambda: HorarioService._construir_matriz_base(turma_id, semana_id),
+            stamp_key=HorarioService._stamp_matriz(turma_id, semana_id),
+            ttl=current_app.config.get('HORARIO_CACHE_TTL'),
+        )
+
+        is_admin = user is not None and user.role in ['super_admin', 'programador', 'admin_escola']
+        instrutor_id = None
+        if user is not None and user.role == 'instrutor':
+            instrutor_id = HorarioService._instrutor_id(user)
+
+        horario_matrix = []
+        for linha in matriz_base:
+            nova_linha = []
+            for celula in linha:
+                if celula is None:
+                    nova_linha.append(A_DISPOSICAO)
+                elif celula == 'SKIP':
+                    nova_linha.append(celula)
+                else:
+                    nova_linha.append(celula.para_usuario(is_admin, instrutor_id))
+            horario_matrix.append(nova_linha)
         return horario_matrix
 
     @staticmethod
@@ -125,64 +220,71 @@ class HorarioService:
         if not semana:
             return {}
         datas = {}
-        dias = ['segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado', 'domingo']
-        for i, dia_nome in enumerate(dias):
+        for i, dia_nome in enumerate(DIAS_SEMANA):
             data_calculada = semana.data_inicio + timedelta(days=i)
             datas[dia_nome] = data_calculada.strftime('%d/%m')
         return datas
 
     @staticmethod
-    def get_edit_grid_context(pelotao, semana_id, ciclo_id, user):
-        # ... (código existente sem alterações)
-        horario_matrix = HorarioService.construir_matriz_horario(pelotao, semana_id, user)
+    def get_horas_agendadas_por_disciplina(turma_id, disciplina_ids, excluir_horario_id=None):
+        """
+        Retorna {disciplina_id: horas agendadas} para a turma em uma única
+        consulta agrupada. Disciplinas sem aulas não aparecem no dicionário.
+        `excluir_horario_id` desconsidera a aula em edição.
+        """
+        if not disciplina_ids:
+            return {}
+        query = (
+            select(Horario.disciplina_id, func.sum(Horario.duracao))
+            .where(Horario.turma_id == turma_id, Horario.disciplina_id.in_(disciplina_ids))
+            .group_by(Horario.disciplina_id)
+        )
+        if excluir_horario_id:
+            query = query.where(Horario.id != int(excluir_horario_id))
+        return {disciplina_id: total or 0 for disciplina_id, total in db.session.execute(query)}
+
+    @staticmethod
+    def get_edit_grid_context(turma_id, semana_id, ciclo_id, user):
+        turma = db.session.get(Turma, turma_id)
+        if not turma:
+            return {'success': False, 'message': 'Turma não encontrada.'}
+        horario_matrix = HorarioService.construir_matriz_horario(turma_id, semana_id, user)
         semana = db.session.get(Semana, semana_id)
         is_admin = user.role in ['super_admin', 'programador', 'admin_escola']
         
-        def get_horas_agendadas(disciplina_id, pelotao_nome):
-            total_agendado = db.session.scalar(
-                select(func.sum(Horario.duracao)).where(
-                    Horario.disciplina_id == disciplina_id,
-                    Horario.pelotao == pelotao_nome
-                )
-            )
-            return total_agendado or 0
-
         disciplinas_disponiveis = []
         if is_admin:
-            disciplinas_do_ciclo = db.session.scalars(select(Disciplina).where(Disciplina.ciclo_id == ciclo_id).order_by(Disciplina.materia)).all()
-            for d in disciplinas_do_ciclo:
-                horas_agendadas = get_horas_agendadas(d.id, pelotao)
-                horas_restantes = d.carga_horaria_prevista - horas_agendadas
-                disciplinas_disponiveis.append({"id": d.id, "nome": d.materia, "restantes": horas_restantes})
+            disciplinas = db.session.scalars(select(Disciplina).where(Disciplina.ciclo_id == ciclo_id).order_by(Disciplina.materia)).all()
         else:
-            instrutor_id = user.instrutor_profile.id if user.instrutor_profile else 0
-            disciplinas_do_instrutor = db.session.scalars(
+            instrutor_id = HorarioService._instrutor_id(user) or 0
+            disciplinas = db.session.scalars(
                 select(Disciplina)
                 .join(DisciplinaTurma, Disciplina.id == DisciplinaTurma.disciplina_id)
                 .where(
-                    DisciplinaTurma.pelotao == pelotao,
+                    DisciplinaTurma.turma_id == turma_id,
                     Disciplina.ciclo_id == ciclo_id,
                     (DisciplinaTurma.instrutor_id_1 == instrutor_id) | (DisciplinaTurma.instrutor_id_2 == instrutor_id)
                 )
                 .order_by(Disciplina.materia)
             ).all()
 
-            for d in disciplinas_do_instrutor:
-                horas_agendadas = get_horas_agendadas(d.id, pelotao)
-                horas_restantes = d.carga_horaria_prevista - horas_agendadas
-                disciplinas_disponiveis.append({"id": d.id, "nome": d.materia, "restantes": horas_restantes})
+        # Uma única consulta agrupada para as horas já agendadas de todas as disciplinas
+        horas_agendadas = HorarioService.get_horas_agendadas_por_disciplina(turma_id, [d.id for d in disciplinas])
+        for d in disciplinas:
+            horas_restantes = d.carga_horaria_prevista - horas_agendadas.get(d.id, 0)
+            disciplinas_disponiveis.append({"id": d.id, "nome": d.materia, "restantes": horas_restantes})
 
         todos_instrutores = [{"id": i.id, "nome": i.user.nome_de_guerra or i.user.username} for i in db.session.scalars(select(Instrutor).options(joinedload(Instrutor.user)).join(User).order_by(User.nome_de_guerra)).all()]
 
         return {
             'success': True,
             'horario_matrix': horario_matrix,
-            'pelotao_selecionado': pelotao,
+            'turma_selecionada': turma,
             'semana_selecionada': semana,
             'disciplinas_disponiveis': disciplinas_disponiveis,
             'todos_instrutores': todos_instrutores,
             'is_admin': is_admin,
-            'instrutor_logado_id': user.instrutor_profile.id if user.instrutor_profile else None,
+            'instrutor_logado_id': HorarioService._instrutor_id(user),
             'datas_semana': HorarioService.get_datas_da_semana(semana)
         }
 
@@ -199,14 +301,47 @@ class HorarioService:
             'observacao': aula.observacao # --- CAMPO NOVO ADICIONADO ---
         }
 
+    @staticmethod
+    def _mensagem_conflito(conflitos):
+        """Mensagem para o resultado de OcupacaoSemana.conflitos, ou None se não houver conflito."""
+        if conflitos['turma']:
+            return 'Já existe uma aula neste horário.'
+        if conflitos['instrutor']:
+            return 'O instrutor já tem outra aula neste horário.'
+        return None
+
+    @staticmethod
+    def get_conflitos_semana(semana_id):
+        """Relatório de sobreposições de turmas e instrutores na semana."""
+        return OcupacaoSemana.carregar(semana_id).relatorio_conflitos()
+
+    @staticmethod
+    def get_conflitos_pendentes(aulas_pendentes):
+        """
+        {aula_id: mensagem} das aulas pendentes que colidem com aulas já
+        confirmadas; uma consulta de ocupação por semana envolvida.
+        """
+        ocupacoes, conflitos = {}, {}
+        for aula in aulas_pendentes:
+            if aula.semana_id not in ocupacoes:
+                ocupacoes[aula.semana_id] = OcupacaoSemana.carregar(aula.semana_id, status='confirmado')
+            mensagem = HorarioService._mensagem_conflito(ocupacoes[aula.semana_id].conflitos(
+                aula.turma_id, aula.instrutor_id, aula.dia_semana, aula.periodo, aula.duracao, ignorar=aula.id
+            ))
+            if mensagem:
+                conflitos[aula.id] = mensagem
+        return conflitos
+
     @staticmethod
     def save_aula(data, user):
         """Salva uma nova aula ou atualiza uma existente."""
         try:
             horario_id = data.get('horario_id')
-            pelotao = data['pelotao']
+            turma_id = int(data['turma_id'])
             semana_id = int(data['semana_id'])
             dia = data['dia']
+            if dia not in DIAS_SEMANA:
+                return False, 'Dia da semana inválido.', 400
             periodo = int(data['periodo'])
             disciplina_id = int(data['disciplina_id'])
             duracao = int(data.get('duracao', 1))
@@ -217,13 +352,9 @@ class HorarioService:
             if not disciplina:
                 return False, 'Disciplina não encontrada.', 404
                 
-            total_agendado = db.session.scalar(
-                select(func.sum(Horario.duracao)).where(
-                    Horario.disciplina_id == disciplina_id,
-                    Horario.pelotao == pelotao,
-                    Horario.id != horario_id
-                )
-            ) or 0
+            total_agendado = HorarioService.get_horas_agendadas_por_disciplina(
+                turma_id, [disciplina_id], excluir_horario_id=horario_id
+            ).get(disciplina_id, 0)
             
             horas_restantes = disciplina.carga_horaria_prevista - total_agendado
             if duracao > horas_restantes:
@@ -236,9 +367,9 @@ class HorarioService:
                     return False, 'Como administrador, você deve selecionar um instrutor.', 400
                 instrutor_id = int(instrutor_id_from_form)
             else:
-                if not user.instrutor_profile:
+                instrutor_id = HorarioService._instrutor_id(user)
+                if not instrutor_id:
                     return False, 'O seu perfil de instrutor não foi encontrado.', 403
-                instrutor_id = user.instrutor_profile.id
 
             if not instrutor_id:
                 return False, 'Instrutor não especificado.', 400
@@ -246,21 +377,34 @@ class HorarioService:
         except (KeyError, ValueError, TypeError):
             return False, 'Dados inválidos ou incompletos.', 400
 
+        aula = None
         if horario_id:
             aula = db.session.get(Horario, int(horario_id))
             if not aula: return False, 'Aula não encontrada.', 404
             if not HorarioService.can_edit_horario(aula, user): return False, 'Sem permissão para editar esta aula.', 403
+
+        # Todos os períodos da aula, na turma e na agenda do instrutor (em qualquer turma)
+        conflito = HorarioService._mensagem_conflito(OcupacaoSemana.carregar(semana_id).conflitos(
+            turma_id, instrutor_id, dia, periodo, duracao, ignorar=aula.id if aula else None
+        ))
+        if conflito: return False, conflito, 409
+
+        semanas_afetadas = {semana_id}
+        if aula:
+            HorarioService._invalidar_matriz(aula.turma_id, aula.semana_id)
+            semanas_afetadas.add(aula.semana_id)
         else:
-            conflito = db.session.execute(select(Horario).where(Horario.pelotao == pelotao, Horario.semana_id == semana_id, Horario.dia_semana == dia, Horario.periodo == periodo)).scalar_one_or_none()
-            if conflito: return False, 'Já existe uma aula neste horário.', 409
             aula = Horario(status='confirmado' if is_admin else 'pendente')
             db.session.add(aula)
         
         # --- ATUALIZAÇÃO PARA INCLUIR OBSERVAÇÃO ---
-        aula.pelotao, aula.semana_id, aula.dia_semana, aula.periodo, aula.disciplina_id, aula.duracao, aula.instrutor_id, aula.observacao = \
-            pelotao, semana_id, dia, periodo, disciplina_id, duracao, instrutor_id, observacao
+        aula.turma_id, aula.semana_id, aula.dia_semana, aula.periodo, aula.disciplina_id, aula.duracao, aula.instrutor_id, aula.observacao = \
+            turma_id, semana_id, dia, periodo, disciplina_id, duracao, instrutor_id, observacao
+        HorarioService._invalidar_matriz(turma_id, semana_id)
+        DashboardService.invalidar_estatisticas()
 
         try:
+            RelatorioService.atualizar_horas(semanas_afetadas)
             db.session.commit()
             return True, 'Aula salva com sucesso!', 200
         except Exception as e:
@@ -275,15 +419,244 @@ class HorarioService:
         if not aula: return False, 'Aula não encontrada.'
         if not HorarioService.can_edit_horario(aula, user): return False, 'Sem permissão para remover esta aula.'
         
+        HorarioService._invalidar_matriz(aula.turma_id, aula.semana_id)
+        DashboardService.invalidar_estatisticas()
+        semana_id = aula.semana_id
         db.session.delete(aula)
+        RelatorioService.atualizar_horas([semana_id])
         db.session.commit()
         return True, 'Aula removida com sucesso!'
 
+    @staticmethod
+    def _ler_posicao(operacao, duracao, dia=None, periodo=None):
+        """
+        Valida dia/período da operação (os ausentes mantêm a posição atual) e
+        se a aula cabe no dia; retorna (dia, periodo).
+        """
+        dia = operacao.get('dia') or dia
+        periodo = int(operacao.get('periodo') or periodo)
+        if dia not in DIAS_SEMANA:
+            raise ValueError('Dia da semana inválido.')
+        if periodo < 1 or periodo + duracao - 1 > PERIODOS_POR_DIA:
+            raise ValueError('A aula não cabe nos períodos do dia.')
+        return dia, periodo
+
+    @staticmethod
+    def aplicar_lote(turma_id, semana_id, operacoes, user):
+        """
+        Aplica várias operações no quadro de uma turma em uma semana:
+        'criar', 'atualizar', 'mover' (novo dia/período) e 'remover'.
+
+        Aulas da semana, disciplinas, instrutores e horas já agendadas são
+        carregados uma vez; as operações são simuladas em memória, e carga
+        horária e sobreposição de períodos são validadas sobre o estado final.
+        Se alguma operação falhar nada é gravado; caso contrário tudo entra em
+        uma única transação.
+
+        Retorna (sucesso, mensagem, status_code, dados). `dados` traz 'erros'
+        ({'indice', 'mensagem'} por operação) e, no sucesso, as 'celulas' dos
+        dias alterados (para o editor atualizar a grade sem recarregar),
+        'restantes' por disciplina alterada e 'criados' ({indice: id}).
+        """
+        operacoes = list(operacoes or [])
+        if not operacoes:
+            return False, 'Nenhuma operação enviada.', 400, {'erros': []}
+        try:
+            turma_id, semana_id = int(turma_id), int(semana_id)
+        except (TypeError, ValueError):
+            return False, 'Turma ou semana inválida.', 400, {'erros': []}
+        if not db.session.get(Turma, turma_id):
+            return False, 'Turma não encontrada.', 404, {'erros': []}
+        if not db.session.get(Semana, semana_id):
+            return False, 'Semana não encontrada.', 404, {'erros': []}
+
+        is_admin = user.role in ['super_admin', 'programador', 'admin_escola']
+        instrutor_proprio = None if is_admin else HorarioService._instrutor_id(user)
+
+        # --- Pré-carregamento ---
+        aulas = {
+            aula.id: aula for aula in db.session.scalars(
+                select(Horario).where(Horario.turma_id == turma_id, Horario.semana_id == semana_id)
+            )
+        }
+        disciplina_ids, instrutor_ids = {a.disciplina_id for a in aulas.values()}, set()
+        for operacao in operacoes:
+            if not isinstance(operacao, dict):
+                continue
+            for campo, destino in (('disciplina_id', disciplina_ids), ('instrutor_id', instrutor_ids)):
+                try:
+                    destino.add(int(operacao[campo]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+        disciplinas = {
+            d.id: d for d in db.session.scalars(select(Disciplina).where(Disciplina.id.in_(disciplina_ids)))
+        } if disciplina_ids else {}
+        instrutores_validos = set(
+            db.session.scalars(select(Instrutor.id).where(Instrutor.id.in_(instrutor_ids)))
+        ) if instrutor_ids and is_admin else set()
+        horas_agendadas = HorarioService.get_horas_agendadas_por_disciplina(turma_id, list(disciplinas))
+
+        # --- Simulação em memória ---
+        campos = ('dia_semana', 'periodo', 'duracao', 'disciplina_id', 'instrutor_id', 'observacao')
+        estado = {aula_id: {c: getattr(aula, c) for c in campos} for aula_id, aula in aulas.items()}
+        original = {aula_id: dict(celula) for aula_id, celula in estado.items()}
+        ultima_operacao = {}
+        erros = []
+
+        for indice, operacao in enumerate(operacoes):
+            try:
+                if not isinstance(operacao, dict) or operacao.get('op') not in OPERACOES_LOTE:
+                    raise ValueError(f"Operação inválida. Use uma de: {', '.join(OPERACOES_LOTE)}.")
+                tipo = operacao['op']
+
+                if tipo == 'criar':
+                    chave = f'novo:{indice}'
+                    celula = {'observacao': None}
+                else:
+                    chave = int(operacao.get('horario_id') or 0)
+                    if chave not in estado:
+                        raise ValueError('Aula não encontrada neste quadro.')
+                    if chave in aulas and not HorarioService.can_edit_horario(aulas[chave], user):
+                        raise PermissionError('Sem permissão para alterar esta aula.')
+                    if tipo == 'remover':
+                        del estado[chave]
+                        ultima_operacao[chave] = indice
+                        continue
+                    celula = dict(estado[chave])
+
+                if tipo in ('criar', 'atualizar'):
+                    if tipo == 'criar' or 'disciplina_id' in operacao:
+                        disciplina_id = int(operacao['disciplina_id'])
+                        if disciplina_id not in disciplinas:
+                            raise ValueError('Disciplina não encontrada.')
+                        celula['disciplina_id'] = disciplina_id
+                    if tipo == 'criar' or 'duracao' in operacao:
+                        celula['duracao'] = int(operacao.get('duracao') or 1)
+                        if celula['duracao'] < 1:
+                            raise ValueError('A duração deve ser de ao menos um período.')
+                    if 'observacao' in operacao:
+                        celula['observacao'] = (operacao.get('observacao') or '').strip() or None
+                    if is_admin:
+                        if tipo == 'criar' or operacao.get('instrutor_id'):
+                            if not operacao.get('instrutor_id'):
+                                raise ValueError('Como administrador, você deve selecionar um instrutor.')
+                            if int(operacao['instrutor_id']) not in instrutores_validos:
+                                raise ValueError('Instrutor não encontrado.')
+                            celula['instrutor_id'] = int(operacao['instrutor_id'])
+                    elif tipo == 'criar':
+                        if not instrutor_proprio:
+                            raise PermissionError('O seu perfil de instrutor não foi encontrado.')
+                        celula['instrutor_id'] = instrutor_proprio
+
+                if tipo in ('criar', 'mover') and not (operacao.get('dia') and operacao.get('periodo')):
+                    raise KeyError('dia/periodo')
+                celula['dia_semana'], celula['periodo'] = HorarioService._ler_posicao(
+                    operacao, celula['duracao'], celula.get('dia_semana'), celula.get('periodo')
+                )
+
+                estado[chave] = celula
+                ultima_operacao[chave] = indice
+            except (PermissionError, ValueError) as e:
+                erros.append({'indice': indice, 'mensagem': str(e)})
+            except (KeyError, TypeError):
+                erros.append({'indice': indice, 'mensagem': 'Dados inválidos ou incompletos.'})
+
+        # --- Validação do estado final ---
+        if not erros:
+            # Tira do índice as aulas alteradas e recoloca o estado final uma a uma,
+            # validando contra a turma e a agenda dos instrutores na semana toda
+            ocupacao = OcupacaoSemana.carregar(semana_id)
+            for chave in ultima_operacao:
+                ocupacao.remover(chave)
+            posicao = ('dia_semana', 'periodo', 'duracao', 'instrutor_id')
+            for chave in sorted((c for c in ultima_operacao if c in estado), key=ultima_operacao.get):
+                celula = estado[chave]
+                argumentos = (turma_id, celula['instrutor_id'], celula['dia_semana'], celula['periodo'], celula['duracao'])
+                # Sobreposições antigas de aulas que não mudaram de lugar não bloqueiam o lote
+                if chave in original and all(original[chave][c] == celula[c] for c in posicao):
+                    mensagem = None
+                else:
+                    mensagem = HorarioService._mensagem_conflito(ocupacao.conflitos(*argumentos))
+                if mensagem:
+                    erros.append({'indice': ultima_operacao[chave],
+                                  'mensagem': f"{mensagem} ({celula['dia_semana']}, {celula['periodo']}º período)"})
+                else:
+                    ocupacao.adicionar(chave, *argumentos)
+
+            horas_semana = {}
+            for chave, celula in estado.items():
+                horas_semana[celula['disciplina_id']] = horas_semana.get(celula['disciplina_id'], 0) + celula['duracao']
+            horas_originais = {}
+            for celula in original.values():
+                horas_originais[celula['disciplina_id']] = horas_originais.get(celula['disciplina_id'], 0) + celula['duracao']
+            restantes = {}
+            for disciplina_id in set(horas_semana) | set(horas_originais):
+                antes = horas_originais.get(disciplina_id, 0)
+                depois = horas_semana.get(disciplina_id, 0)
+                disciplina = disciplinas.get(disciplina_id)
+                if disciplina is None:
+                    continue
+                restantes[disciplina_id] = disciplina.carga_horaria_prevista - (horas_agendadas.get(disciplina_id, 0) - antes + depois)
+                if depois > antes and restantes[disciplina_id] < 0:
+                    indice = max(i for chave, i in ultima_operacao.items()
+                                 if chave in estado and estado[chave]['disciplina_id'] == disciplina_id)
+                    erros.append({'indice': indice, 'mensagem':
+                                  f'Carga horária de {disciplina.materia} excedida em {-restantes[disciplina_id]}h.'})
+
+        if erros:
+            erros.sort(key=lambda erro: erro['indice'])
+            return False, f'Nenhuma alteração aplicada: {len(erros)} operação(ões) com erro.', 400, {'erros': erros}
+
+        # --- Aplicação em uma única transação ---
+        dias_afetados, criados = set(), {}
+        for chave in ultima_operacao:
+            if chave in original:
+                dias_afetados.add(original[chave]['dia_semana'])
+            if chave not in estado:
+                db.session.delete(aulas[chave])
+                continue
+            dias_afetados.add(estado[chave]['dia_semana'])
+            if chave in aulas:
+                aula = aulas[chave]
+            else:
+                aula = Horario(turma_id=turma_id, semana_id=semana_id, status='confirmado' if is_admin else 'pendente')
+                db.session.add(aula)
+                criados[ultima_operacao[chave]] = aula
+            for campo, valor in estado[chave].items():
+                setattr(aula, campo, valor)
+
+        HorarioService._invalidar_matriz(turma_id, semana_id)
+        DashboardService.invalidar_estatisticas()
+        try:
+            # Ids lidos antes do commit, que expira as aulas criadas
+            db.session.flush()
+            criados = {indice: aula.id for indice, aula in criados.items()}
+            RelatorioService.atualizar_horas([semana_id])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro ao aplicar lote de aulas: {e}")
+            return False, 'Erro interno do servidor ao salvar.', 500, {'erros': []}
+
+        matriz = HorarioService.construir_matriz_horario(turma_id, semana_id, user)
+        celulas = [
+            {'dia': dia, 'periodo': periodo + 1, 'aula': matriz[periodo][DIAS_SEMANA.index(dia)]}
+            for dia in sorted(dias_afetados, key=DIAS_SEMANA.index)
+            for periodo in range(PERIODOS_POR_DIA)
+        ]
+        return True, f'{len(operacoes)} operação(ões) aplicada(s) com sucesso!', 200, {
+            'erros': [],
+            'celulas': celulas,
+            'restantes': restantes,
+            'criados': criados,
+        }
+
     @staticmethod
     def get_aulas_pendentes():
         # ... (código existente sem alterações)
         return db.session.scalars(
             select(Horario).options(
+                joinedload(Horario.turma),
                 joinedload(Horario.disciplina),
                 joinedload(Horario.instrutor).joinedload(Instrutor.user),
                 joinedload(Horario.semana)
@@ -297,7 +670,15 @@ class HorarioService:
         if not aula: return False, 'Aula não encontrada.'
 
         if action == 'aprovar':
+            conflito = HorarioService._mensagem_conflito(
+                OcupacaoSemana.carregar(aula.semana_id, status='confirmado').conflitos(
+                    aula.turma_id, aula.instrutor_id, aula.dia_semana, aula.periodo, aula.duracao, ignorar=aula.id
+                )
+            )
+            if conflito:
+                return False, f'Não é possível aprovar a aula de {aula.disciplina.materia}: {conflito}'
             aula.status = 'confirmado'
+            RelatorioService.atualizar_horas([aula.semana_id])
             message = f'Aula de {aula.disciplina.materia} aprovada.'
         elif action == 'negar':
             db.session.delete(aula)
@@ -305,5 +686,7 @@ class HorarioService:
         else:
             return False, 'Ação inválida.'
             
+        HorarioService._invalidar_matriz(aula.turma_id, aula.semana_id)
+        DashboardService.invalidar_estatisticas()
         db.session.commit()
         return True, message
\ No newline at end of file
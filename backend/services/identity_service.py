@@ -0,0 +1,102 @@
+# backend/services/identity_service.py
+
+from flask import g, has_request_context
+from flask_login import current_user
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from werkzeug.local import LocalProxy
+
+from ..models.database import db
+from ..models.user import User
+from ..models.aluno import Aluno
+
+
+class Identity:
+    """
+    Dados do usuário logado que as permissões e os serviços consultam a cada
+    requisição: função, escolas vinculadas e ids dos perfis.
+    """
+
+    __slots__ = ('user_id', 'role', 'school_ids', 'instrutor_id', 'aluno_id', 'turma_id', 'turma_nome')
+
+    def __init__(self, user_id=None, role=None, school_ids=(), instrutor_id=None,
+                 aluno_id=None, turma_id=None, turma_nome=None):
+        self.user_id = user_id
+        self.role = role
+        self.school_ids = tuple(school_ids)
+        self.instrutor_id = instrutor_id
+        self.aluno_id = aluno_id
+        self.turma_id = turma_id
+        self.turma_nome = turma_nome
+
+    @property
+    def is_authenticated(self):
+        return self.user_id is not None
+
+    @property
+    def school_id(self):
+        """Escola principal do usuário (o primeiro vínculo), ou None."""
+        return self.school_ids[0] if self.school_ids else None
+
+    def __repr__(self):
+        return f"<Identity user_id={self.user_id} role='{self.role}' schools={self.school_ids}>"
+
+
+ANONYMOUS_IDENTITY = Identity()
+
+
+class IdentityService:
+
+    @staticmethod
+    def load_user(user_id):
+        """
+        Carrega o usuário com os perfis de aluno/instrutor, a turma do aluno e os
+        vínculos com escolas em uma única consulta (usado pelo user_loader).
+        """
+        stmt = (
+            select(User)
+            .where(User.id == int(user_id))
+            .options(
+                joinedload(User.aluno_profile).joinedload(Aluno.turma),
+                joinedload(User.instrutor_profile),
+                joinedload(User.user_schools),
+            )
+        )
+        return db.session.execute(stmt).unique().scalar_one_or_none()
+
+    @staticmethod
+    def build(user):
+        """Monta a Identity a partir de um usuário já carregado."""
+        if user is None or not getattr(user, 'is_authenticated', False):
+            return ANONYMOUS_IDENTITY
+
+        aluno = user.aluno_profile
+        instrutor = user.instrutor_profile
+        turma = aluno.turma if aluno else None
+        return Identity(
+            user_id=user.id,
+            role=user.role,
+            school_ids=[us.school_id for us in user.user_schools],
+            instrutor_id=instrutor.id if instrutor else None,
+            aluno_id=aluno.id if aluno else None,
+            turma_id=turma.id if turma else None,
+            turma_nome=turma.nome if turma else None,
+        )
+
+    @staticmethod
+    def get_current():
+        """Identity do usuário da requisição atual, calculada uma única vez."""
+        if not has_request_context():
+            return ANONYMOUS_IDENTITY
+
+        user = current_user._get_current_object()
+        user_id = user.id if getattr(user, 'is_authenticated', False) else None
+        cached = g.get('_current_identity')
+        # Recalcula se o usuário mudou durante a requisição (login/logout)
+        if cached is None or cached.user_id != user_id:
+            cached = IdentityService.build(user)
+            g._current_identity = cached
+        return cached
+
+
+current_identity = LocalProxy(IdentityService.get_current)
@@ -1,7 +1,8 @@
 # backend/services/instrutor_service.py
 
 from flask import current_app
-from sqlalchemy import select, delete, or_
+from sqlalchemy import select, delete, update, or_, func
+from sqlalchemy.orm import contains_eager, selectinload
 from sqlalchemy.exc import IntegrityError
 
 from backend.models.database import db
@@ -10,6 +11,8 @@ from backend.models.user import User
 from backend.models.user_school import UserSchool
 from backend.models.disciplina_turma import DisciplinaTurma
 from backend.models.horario import Horario
+from backend.services.dashboard_service import DashboardService
+from backend.services.pagination import paginar_keyset
 
 
 class InstrutorService:
@@ -80,6 +83,7 @@ class InstrutorService:
             if school_id:
                 InstrutorService._ensure_user_school(user.id, int(school_id), role='instrutor')
 
+            DashboardService.invalidar_estatisticas()
             db.session.commit()
             return True, "Instrutor cadastrado com sucesso!"
 
@@ -119,6 +123,7 @@ class InstrutorService:
                 is_rr=is_rr
             )
             db.session.add(new_profile)
+            DashboardService.invalidar_estatisticas()
             db.session.commit()
             return True, "Perfil de instrutor completado com sucesso."
 
@@ -133,9 +138,31 @@ class InstrutorService:
 
     @staticmethod
     def get_all_instrutores():
-        stmt = select(Instrutor).join(User).order_by(User.nome_completo)
+        stmt = select(Instrutor).join(User).options(contains_eager(Instrutor.user)).order_by(User.nome_completo)
         return db.session.scalars(stmt).all()
 
+    @staticmethod
+    def listar_instrutores(busca=None, ordem='nome', cursor=None, por_pagina=50):
+        """Lista paginada (keyset) de instrutores, com busca e ordenação feitas no banco."""
+        stmt = select(Instrutor).join(User, Instrutor.user_id == User.id).options(selectinload(Instrutor.user))
+
+        if busca:
+            termo = f"%{busca.strip()}%"
+            stmt = stmt.where(or_(
+                User.nome_completo.ilike(termo),
+                User.nome_de_guerra.ilike(termo),
+                User.matricula.ilike(termo),
+                User.email.ilike(termo),
+            ))
+
+        chaves = {
+            'nome': [func.coalesce(User.nome_completo, ''), Instrutor.id],
+            'nome_de_guerra': [func.coalesce(User.nome_de_guerra, ''), Instrutor.id],
+            'matricula': [User.matricula, Instrutor.id],
+        }.get(ordem) or [func.coalesce(User.nome_completo, ''), Instrutor.id]
+
+        return paginar_keyset(stmt, chaves, cursor=cursor, por_pagina=por_pagina)
+
     @staticmethod
     def update_instrutor(instrutor_id: int, data: dict):
         instrutor = db.session.get(Instrutor, instrutor_id)
@@ -168,6 +195,23 @@ class InstrutorService:
             current_app.logger.exception("Erro ao atualizar instrutor")
             return False, f"Erro ao atualizar instrutor: {str(e)}"
 
+    @staticmethod
+    def preparar_exclusao(instrutor_id: int):
+        """
+        Libera o instrutor para exclusão: tira-o dos vínculos com turmas e
+        retorna uma mensagem de erro quando ainda há aulas agendadas com ele.
+        """
+        horarios_count = db.session.scalar(
+            select(func.count(Horario.id)).where(Horario.instrutor_id == instrutor_id)
+        )
+        if horarios_count > 0:
+            return f"Não é possível excluir este instrutor, pois existem {horarios_count} aulas agendadas com ele."
+        for coluna in (DisciplinaTurma.instrutor_id_1, DisciplinaTurma.instrutor_id_2):
+            db.session.execute(
+                update(DisciplinaTurma).where(coluna == instrutor_id).values({coluna.key: None})
+            )
+        return None
+
     @staticmethod
     def delete_instrutor(instrutor_id: int):
         instrutor = db.session.get(Instrutor, instrutor_id)
@@ -175,13 +219,19 @@ class InstrutorService:
             return False, "Instrutor não encontrado."
         
         try:
+            erro = InstrutorService.preparar_exclusao(instrutor_id)
+            if erro:
+                return False, erro
+
             user_a_deletar = instrutor.user
             if user_a_deletar:
                 db.session.delete(user_a_deletar)
+                DashboardService.invalidar_estatisticas()
                 db.session.commit()
                 return True, "Instrutor e usuário vinculado foram excluídos com sucesso."
             else:
                 db.session.delete(instrutor)
+                DashboardService.invalidar_estatisticas()
                 db.session.commit()
                 return True, "Perfil de instrutor órfão removido com sucesso."
 
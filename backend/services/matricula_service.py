@@ -0,0 +1,73 @@
+# backend/services/matricula_service.py
+
+from sqlalchemy import select, insert, literal, union, exists
+
+from ..models.database import db
+from ..models.aluno import Aluno
+from ..models.disciplina import Disciplina
+from ..models.historico_disciplina import HistoricoDisciplina
+from ..models.turma import Turma
+from ..models.user_school import UserSchool
+from .historico_service import HistoricoService
+
+
+class MatriculaService:
+    """
+    Matrícula dos alunos nas disciplinas da escola.
+
+    Todo aluno deve ter um registro em HistoricoDisciplina para cada disciplina
+    da sua escola. Em vez de criar esses registros um a um (ou ao abrir a
+    página de notas), as operações que podem abrir lacunas — nova disciplina,
+    novo aluno, mudança de turma ou de escola — chamam `matricular_pendentes`,
+    que preenche a diferença com um único INSERT ... SELECT ... WHERE NOT EXISTS.
+    A restrição única (aluno_id, disciplina_id) impede matrículas duplicadas.
+    """
+
+    @staticmethod
+    def _alunos_por_escola():
+        """Pares (aluno_id, school_id): escola da turma do aluno ou vínculo do usuário com a escola."""
+        pela_turma = select(Aluno.id.label('aluno_id'), Turma.school_id.label('school_id')).join(
+            Turma, Aluno.turma_id == Turma.id
+        )
+        pelo_vinculo = select(Aluno.id.label('aluno_id'), UserSchool.school_id.label('school_id')).join(
+            UserSchool, UserSchool.user_id == Aluno.user_id
+        )
+        return union(pela_turma, pelo_vinculo).subquery('alunos_escola')
+
+    @staticmethod
+    def matricular_pendentes(school_id=None, aluno_ids=None, disciplina_ids=None):
+        """
+        Matricula os alunos nas disciplinas da escola que ainda faltam, limitando
+        opcionalmente a uma escola, a alguns alunos ou a algumas disciplinas.
+        Não faz commit: a inserção entra na transação de quem chamou.
+        Retorna o número de matrículas criadas.
+        """
+        # Listas vazias não matriculam ninguém (subconsultas também são aceitas como filtro)
+        for filtro in (aluno_ids, disciplina_ids):
+            if isinstance(filtro, (list, tuple, set)) and not filtro:
+                return 0
+
+        pares = MatriculaService._alunos_por_escola()
+        alvo = select(pares.c.aluno_id, Disciplina.id).join(Disciplina, Disciplina.school_id == pares.c.school_id)
+        if school_id is not None:
+            alvo = alvo.where(pares.c.school_id == school_id)
+        if aluno_ids is not None:
+            alvo = alvo.where(pares.c.aluno_id.in_(aluno_ids))
+        if disciplina_ids is not None:
+            alvo = alvo.where(Disciplina.id.in_(disciplina_ids))
+
+        ja_matriculado = exists().where(
+            HistoricoDisciplina.aluno_id == pares.c.aluno_id,
+            HistoricoDisciplina.disciplina_id == Disciplina.id,
+        )
+        faltantes = alvo.add_columns(literal('cursando')).where(~ja_matriculado)
+
+        # As linhas pendentes na sessão (ex: o aluno recém-criado) precisam estar no banco
+        db.session.flush()
+        resultado = db.session.execute(
+            insert(HistoricoDisciplina.__table__).from_select(['aluno_id', 'disciplina_id', 'status'], faltantes)
+        )
+        if resultado.rowcount:
+            # Novas disciplinas cursando mudam o total e a situação no resumo de notas
+            HistoricoService.atualizar_resumos(select(alvo.subquery().c.aluno_id))
+        return resultado.rowcount
@@ -0,0 +1,140 @@
+# backend/services/ocupacao_horario.py
+
+from sqlalchemy import select
+
+from ..models.database import db
+from ..models.horario import Horario
+
+
+def mascara_periodos(periodo, duracao):
+    """Bits dos períodos ocupados por uma aula: o período 1 é o bit 0."""
+    return ((1 << max(duracao, 1)) - 1) << (periodo - 1)
+
+
+def periodos_da_mascara(mascara):
+    """Lista dos períodos (1..n) com bit ligado na máscara."""
+    periodos, periodo = [], 1
+    while mascara:
+        if mascara & 1:
+            periodos.append(periodo)
+        mascara >>= 1
+        periodo += 1
+    return periodos
+
+
+class OcupacaoSemana:
+    """
+    Índice de ocupação de uma semana em bitsets: para cada (turma, dia) e
+    cada (instrutor, dia) guarda um inteiro com um bit por período ocupado.
+
+    Uma aula de `duracao` períodos vira uma máscara contígua, então saber se
+    ela se sobrepõe a qualquer outra da turma ou do instrutor é um AND de
+    inteiros, qualquer que seja a duração. As aulas de cada chave também são
+    guardadas para dizer com quem é o conflito e para retirar uma aula em
+    edição do índice.
+    """
+
+    __slots__ = ('semana_id', '_turmas', '_instrutores', '_aulas')
+
+    def __init__(self, semana_id):
+        self.semana_id = semana_id
+        # chave -> [bitset da chave, {aula_id: máscara}]
+        self._turmas = {}
+        self._instrutores = {}
+        # aula_id -> (turma_id, instrutor_id, dia, máscara)
+        self._aulas = {}
+
+    @classmethod
+    def carregar(cls, semana_id, status=None):
+        """Monta o índice da semana (todas as turmas) com uma única consulta."""
+        stmt = select(
+            Horario.id, Horario.turma_id, Horario.instrutor_id,
+            Horario.dia_semana, Horario.periodo, Horario.duracao,
+        ).where(Horario.semana_id == semana_id)
+        if status is not None:
+            stmt = stmt.where(Horario.status == status)
+        ocupacao = cls(semana_id)
+        for aula_id, turma_id, instrutor_id, dia, periodo, duracao in db.session.execute(stmt):
+            ocupacao.adicionar(aula_id, turma_id, instrutor_id, dia, periodo, duracao)
+        return ocupacao
+
+    @staticmethod
+    def _marcar(indice, chave, aula_id, mascara):
+        entrada = indice.setdefault(chave, [0, {}])
+        entrada[0] |= mascara
+        entrada[1][aula_id] = mascara
+
+    @staticmethod
+    def _desmarcar(indice, chave, aula_id):
+        entrada = indice.get(chave)
+        if not entrada or entrada[1].pop(aula_id, None) is None:
+            return
+        # Recalcula o bitset da chave: aulas antigas sobrepostas não podem ser desligadas por XOR
+        bits = 0
+        for mascara in entrada[1].values():
+            bits |= mascara
+        entrada[0] = bits
+
+    def adicionar(self, aula_id, turma_id, instrutor_id, dia, periodo, duracao):
+        self.remover(aula_id)
+        mascara = mascara_periodos(periodo, duracao)
+        self._aulas[aula_id] = (turma_id, instrutor_id, dia, mascara)
+        self._marcar(self._turmas, (turma_id, dia), aula_id, mascara)
+        if instrutor_id is not None:
+            self._marcar(self._instrutores, (instrutor_id, dia), aula_id, mascara)
+
+    def remover(self, aula_id):
+        aula = self._aulas.pop(aula_id, None)
+        if aula is None:
+            return
+        turma_id, instrutor_id, dia, _ = aula
+        self._desmarcar(self._turmas, (turma_id, dia), aula_id)
+        if instrutor_id is not None:
+            self._desmarcar(self._instrutores, (instrutor_id, dia), aula_id)
+
+    @staticmethod
+    def _com_quem(indice, chave, mascara, ignorar):
+        entrada = indice.get(chave)
+        if not entrada or not entrada[0] & mascara:
+            return []
+        return sorted(aula_id for aula_id, outra in entrada[1].items() if outra & mascara and aula_id != ignorar)
+
+    def conflitos(self, turma_id, instrutor_id, dia, periodo, duracao, ignorar=None):
+        """
+        Aulas que ocupariam algum dos períodos da aula informada, na mesma
+        turma ou com o mesmo instrutor. `ignorar` desconsidera a própria
+        aula em edição. Retorna {'turma': [ids], 'instrutor': [ids]}, com
+        listas vazias quando não há conflito.
+        """
+        mascara = mascara_periodos(periodo, duracao)
+        return {
+            'turma': self._com_quem(self._turmas, (turma_id, dia), mascara, ignorar),
+            'instrutor': self._com_quem(self._instrutores, (instrutor_id, dia), mascara, ignorar)
+            if instrutor_id is not None else [],
+        }
+
+    def esta_livre(self, turma_id, instrutor_id, dia, periodo, duracao, ignorar=None):
+        conflitos = self.conflitos(turma_id, instrutor_id, dia, periodo, duracao, ignorar)
+        return not conflitos['turma'] and not conflitos['instrutor']
+
+    def relatorio_conflitos(self):
+        """
+        Todas as sobreposições da semana: uma entrada por par de aulas que
+        dividem períodos da mesma turma ou do mesmo instrutor.
+        """
+        relatorio = []
+        for tipo, indice in (('turma', self._turmas), ('instrutor', self._instrutores)):
+            for (chave, dia), (bits, aulas) in indice.items():
+                itens = sorted(aulas.items())
+                for i, (aula_id, mascara) in enumerate(itens):
+                    for outra_id, outra in itens[i + 1:]:
+                        comum = mascara & outra
+                        if comum:
+                            relatorio.append({
+                                'tipo': tipo,
+                                tipo: chave,
+                                'dia': dia,
+                                'periodos': periodos_da_mascara(comum),
+                                'aulas': [aula_id, outra_id],
+                            })
+        return relatorio
@@ -0,0 +1,90 @@
+# backend/services/pagination.py
+
+import base64
+import binascii
+import json
+
+from sqlalchemy import and_, or_
+
+from ..models.database import db
+
+
+class PaginaKeyset:
+    """Uma página de resultados e o cursor para buscar a próxima."""
+
+    __slots__ = ('itens', 'proximo_cursor', 'por_pagina')
+
+    def __init__(self, itens, proximo_cursor, por_pagina):
+        self.itens = itens
+        self.proximo_cursor = proximo_cursor
+        self.por_pagina = por_pagina
+
+    @property
+    def tem_proxima(self):
+        return self.proximo_cursor is not None
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
+
+    def __bool__(self):
+        return bool(self.itens)
+
+
+def codificar_cursor(valores):
+    raw = json.dumps(list(valores), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, tamanho):
+    """Retorna a lista de valores do cursor, ou None se ele for inválido."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valores = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(valores, list) or len(valores) != tamanho:
+        return None
+    return valores
+
+
+def _depois_de(chaves, valores, descendente):
+    """
+    Condição "linha vem depois do cursor" para a ordenação (k1, k2, ..., id),
+    expandida em OR/AND para funcionar em qualquer banco (sem row values).
+    """
+    condicoes = []
+    for i, (chave, valor) in enumerate(zip(chaves, valores)):
+        anteriores = [c == v for c, v in zip(chaves[:i], valores[:i])]
+        comparacao = chave < valor if descendente else chave > valor
+        condicoes.append(and_(*anteriores, comparacao))
+    return or_(*condicoes)
+
+
+def paginar_keyset(stmt, chaves, cursor=None, por_pagina=50, descendente=False):
+    """
+    Pagina `stmt` por keyset (seek): em vez de OFFSET, a próxima página começa
+    depois dos valores de ordenação do último item, o que mantém o custo
+    constante em qualquer página e usa o índice das colunas de ordenação.
+
+    `chaves` são as expressões de ordenação; a última deve ser única (ex: o id)
+    e nenhuma pode ser nula (use coalesce). O `stmt` deve selecionar uma única
+    entidade.
+    """
+    valores = decodificar_cursor(cursor, len(chaves))
+    if valores is not None:
+        stmt = stmt.where(_depois_de(chaves, valores, descendente))
+
+    ordem = [c.desc() if descendente else c.asc() for c in chaves]
+    stmt = stmt.add_columns(*chaves).order_by(*ordem).limit(por_pagina + 1)
+    linhas = db.session.execute(stmt).all()
+
+    proximo_cursor = None
+    if len(linhas) > por_pagina:
+        linhas = linhas[:por_pagina]
+        proximo_cursor = codificar_cursor(linhas[-1][1:])
+    return PaginaKeyset([linha[0] for linha in linhas], proximo_cursor, por_pagina)
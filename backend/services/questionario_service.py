@@ -0,0 +1,144 @@
+# backend/services/questionario_service.py
+
+from collections import defaultdict
+from sqlalchemy import select, func, insert, update, delete
+from sqlalchemy.orm import selectinload
+
+from ..models.database import db, somente_leitura
+from ..models.questionario import Questionario
+from ..models.pergunta import Pergunta
+from ..models.resposta import Resposta
+
+
+class QuestionarioService:
+
+    @staticmethod
+    def get_questionario_completo(questionario_id):
+        """Carrega o questionário com perguntas e opções em consultas agrupadas (sem N+1)."""
+        return db.session.scalars(
+            select(Questionario)
+            .options(selectinload(Questionario.perguntas).selectinload(Pergunta.opcoes))
+            .where(Questionario.id == questionario_id)
+        ).first()
+
+    @staticmethod
+    @somente_leitura
+    def get_dados_graficos(questionario):
+        """
+        Monta os dados dos gráficos de resultado: {pergunta_id: {'labels', 'dados', 'outros'}}.
+        As contagens vêm de um único GROUP BY sobre as respostas do questionário e os
+        textos livres ("Outro") de uma segunda consulta.
+        """
+        contagens = {
+            (pergunta_id, opcao_id): total
+            for pergunta_id, opcao_id, total in db.session.execute(
+                select(Resposta.pergunta_id, Resposta.opcao_resposta_id, func.count(Resposta.id))
+                .where(Resposta.questionario_id == questionario.id)
+                .group_by(Resposta.pergunta_id, Resposta.opcao_resposta_id)
+            )
+        }
+
+        outros = defaultdict(list)
+        for pergunta_id, texto in db.session.execute(
+            select(Resposta.pergunta_id, Resposta.texto_livre)
+            .where(
+                Resposta.questionario_id == questionario.id,
+                Resposta.texto_livre.is_not(None),
+                Resposta.texto_livre != ''
+            )
+            .order_by(Resposta.id)
+        ):
+            outros[pergunta_id].append(texto)
+
+        dados_graficos = {}
+        for pergunta in questionario.perguntas:
+            dados_graficos[pergunta.id] = {
+                'labels': [opcao.texto for opcao in pergunta.opcoes],
+                'dados': [contagens.get((pergunta.id, opcao.id), 0) for opcao in pergunta.opcoes],
+                'outros': outros.get(pergunta.id, [])
+            }
+        return dados_graficos
+
+    @staticmethod
+    def _respostas_do_formulario(questionario, form):
+        """
+        Converte o formulário em {(pergunta_id, opcao_id): texto_livre}, usando as
+        opções já carregadas do questionário. Opções que não pertencem à pergunta
+        são ignoradas.
+        """
+        respostas = {}
+        for pergunta in questionario.perguntas:
+            opcoes = {opcao.id: opcao for opcao in pergunta.opcoes}
+            if pergunta.tipo == 'multipla':
+                valores = form.getlist(f'pergunta_{pergunta.id}')
+            else:
+                valor = form.get(f'pergunta_{pergunta.id}')
+                valores = [valor] if valor else []
+
+            for valor in valores:
+                try:
+                    opcao = opcoes.get(int(valor))
+                except (TypeError, ValueError):
+                    opcao = None
+                if opcao is None:
+                    continue
+                texto_livre = None
+                if opcao.aceita_texto_livre:
+                    texto_livre = (form.get(f'outro_{pergunta.id}') or '').strip() or None
+                respostas[(pergunta.id, opcao.id)] = texto_livre
+        return respostas
+
+    @staticmethod
+    def registrar_respostas(questionario, user_id, form):
+        """Grava as respostas de um participante em um único INSERT em lote."""
+        respostas = QuestionarioService._respostas_do_formulario(questionario, form)
+        if respostas:
+            # INSERT do Core: um único executemany, mesmo com texto_livre nulo em parte das linhas
+            db.session.execute(insert(Resposta.__table__), [
+                {
+                    'questionario_id': questionario.id, 'pergunta_id': pergunta_id,
+                    'opcao_resposta_id': opcao_id, 'texto_livre': texto_livre, 'user_id': user_id
+                }
+                for (pergunta_id, opcao_id), texto_livre in respostas.items()
+            ])
+        return len(respostas)
+
+    @staticmethod
+    def atualizar_respostas(questionario, user_id, form):
+        """
+        Aplica apenas as diferenças entre as respostas gravadas e as do formulário:
+        remove as opções desmarcadas, atualiza textos livres alterados e insere as novas.
+        Retorna (inseridas, atualizadas, removidas).
+        """
+        desejadas = QuestionarioService._respostas_do_formulario(questionario, form)
+        atuais = db.session.execute(
+            select(Resposta.id, Resposta.pergunta_id, Resposta.opcao_resposta_id, Resposta.texto_livre)
+            .where(Resposta.questionario_id == questionario.id, Resposta.user_id == user_id)
+        ).all()
+
+        remover, atualizar, existentes = [], [], set()
+        for resposta_id, pergunta_id, opcao_id, texto_livre in atuais:
+            chave = (pergunta_id, opcao_id)
+            if chave not in desejadas or chave in existentes:
+                remover.append(resposta_id)
+                continue
+            existentes.add(chave)
+            if desejadas[chave] != texto_livre:
+                atualizar.append({'id': resposta_id, 'texto_livre': desejadas[chave]})
+
+        novas = [
+            {
+                'questionario_id': questionario.id, 'pergunta_id': pergunta_id,
+                'opcao_resposta_id': opcao_id, 'texto_livre': texto_livre, 'user_id': user_id
+            }
+            for (pergunta_id, opcao_id), texto_livre in desejadas.items()
+            if (pergunta_id, opcao_id) not in existentes
+        ]
+
+        if remover:
+            db.session.execute(delete(Resposta).where(Resposta.id.in_(remover)))
+        if atualizar:
+            db.session.execute(update(Resposta), atualizar)
+        if novas:
+            db.session.execute(insert(Resposta.__table__), novas)
+        return len(novas), len(atualizar), len(remover)
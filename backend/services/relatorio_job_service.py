@@ -0,0 +1,358 @@
+# backend/services/relatorio_job_service.py
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask import current_app
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis é opcional em desenvolvimento
+    redis = None
+
+
+STATUS_PENDENTE = 'pendente'
+STATUS_PROCESSANDO = 'processando'
+STATUS_CONCLUIDO = 'concluido'
+STATUS_ERRO = 'erro'
+
+
+class PdfServiceError(Exception):
+    """Falha ao gerar o PDF no serviço do WeasyPrint."""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def gerar_pdf_com_api(html_content, api_url, timeout=30):
+    """Gera o PDF usando a API do WeasyPrint (container Docker)."""
+    try:
+        response = requests.post(
+            api_url,
+            json={'html': html_content},
+            headers={'Content-Type': 'application/json'},
+            timeout=timeout
+        )
+    except requests.exceptions.RequestException as e:
+        # Erros de conexão, timeout, etc.
+        raise PdfServiceError(f"Serviço de geração de PDF indisponível: {e}")
+
+    if response.status_code >= 500 or response.status_code == 429:
+        raise PdfServiceError(f"Serviço de geração de PDF retornou {response.status_code}.")
+    if response.status_code >= 400:
+        raise PdfServiceError(f"Requisição de PDF rejeitada ({response.status_code}).", retryable=False)
+    return response.content
+
+
+class _MemoryJobStore:
+    """Armazenamento dos jobs no próprio processo (desenvolvimento e testes)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._html = {}
+        self._results = {}
+
+    def create(self, job, html, ttl):
+        self._purge()
+        with self._lock:
+            self._jobs[job['id']] = dict(job, expires_at=time.time() + ttl)
+            self._html[job['id']] = html
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['expires_at'] < time.time():
+                return None
+            return dict(job)
+
+    def get_html(self, job_id):
+        with self._lock:
+            return self._html.get(job_id)
+
+    def update(self, job_id, ttl=None, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+                if ttl is not None:
+                    self._jobs[job_id]['expires_at'] = time.time() + ttl
+
+    def store_result(self, job_id, content, ttl):
+        with self._lock:
+            self._results[job_id] = content
+            self._html.pop(job_id, None)
+            if job_id in self._jobs:
+                self._jobs[job_id]['expires_at'] = time.time() + ttl
+
+    def get_result(self, job_id):
+        if self.get(job_id) is None:
+            return None
+        with self._lock:
+            return self._results.get(job_id)
+
+    def _purge(self):
+        agora = time.time()
+        with self._lock:
+            for job_id in [j for j, job in self._jobs.items() if job['expires_at'] < agora]:
+                self._jobs.pop(job_id, None)
+                self._html.pop(job_id, None)
+                self._results.pop(job_id, None)
+
+
+class _RedisJobStore:
+    """
+    Armazenamento dos jobs no Redis, compartilhado entre web e worker.
+
+    O worker tira o job da fila movendo-o para a lista de processamento
+    (BLMOVE, Redis 6.2+) e só o remove de lá ao terminar. Se o worker cair
+    no meio de um job, `recover` devolve à fila os que ficaram parados ali.
+    """
+
+    QUEUE_KEY = 'relatorio_jobs:fila'
+    PROCESSING_KEY = 'relatorio_jobs:processando'
+    FINAL_STATUSES = ('concluido', 'erro')
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _key(job_id, suffix=''):
+        return f"relatorio_job:{job_id}{suffix}"
+
+    def create(self, job, html, ttl):
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(job['id']), mapping={k: str(v) for k, v in job.items() if v is not None})
+        pipe.expire(self._key(job['id']), ttl)
+        pipe.set(self._key(job['id'], ':html'), html, ex=ttl)
+        pipe.rpush(self.QUEUE_KEY, job['id'])
+        pipe.execute()
+
+    def get(self, job_id):
+        raw = self.client.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        job = {k.decode(): v.decode() for k, v in raw.items()}
+        job['user_id'] = int(job['user_id'])
+        job['attempts'] = int(job.get('attempts', 0))
+        return job
+
+    def get_html(self, job_id):
+        html = self.client.get(self._key(job_id, ':html'))
+        return html.decode() if html is not None else None
+
+    def update(self, job_id, ttl=None, **fields):
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(job_id), mapping={k: str(v) for k, v in fields.items() if v is not None})
+        if ttl is not None:
+            pipe.expire(self._key(job_id), ttl)
+        pipe.execute()
+
+    def store_result(self, job_id, content, ttl):
+        pipe = self.client.pipeline()
+        pipe.set(self._key(job_id, ':pdf'), content, ex=ttl)
+        pipe.delete(self._key(job_id, ':html'))
+        pipe.expire(self._key(job_id), ttl)
+        pipe.execute()
+
+    def get_result(self, job_id):
+        return self.client.get(self._key(job_id, ':pdf'))
+
+    def pop(self, timeout):
+        job_id = self.client.blmove(self.QUEUE_KEY, self.PROCESSING_KEY, timeout, 'LEFT', 'RIGHT')
+        if job_id is None:
+            return None
+        job_id = job_id.decode()
+        self.client.hset(self._key(job_id), 'claimed_at', str(time.time()))
+        return job_id
+
+    def ack(self, job_id):
+        """Retira o job da lista de processamento depois que o worker terminou."""
+        self.client.lrem(self.PROCESSING_KEY, 0, job_id)
+
+    def recover(self, stale_after):
+        """
+        Devolve ao início da fila os jobs presos em processamento há mais de
+        `stale_after` segundos (worker encerrado no meio do job) e descarta os
+        que já terminaram ou expiraram. Retorna os ids devolvidos à fila.
+        """
+        recovered = []
+        for raw_id in self.client.lrange(self.PROCESSING_KEY, 0, -1):
+            job_id = raw_id.decode()
+            job = self.get(job_id)
+            if job is not None and job['status'] not in self.FINAL_STATUSES:
+                if not job.get('claimed_at'):
+                    # Recém-movido por outro worker, que ainda vai marcar o início: conta a partir de agora
+                    self.client.hsetnx(self._key(job_id), 'claimed_at', str(time.time()))
+                    continue
+                if time.time() - float(job['claimed_at']) <= stale_after:
+                    continue
+            # LREM é atômico: se outro worker já recuperou o job, nada é removido aqui
+            if not self.client.lrem(self.PROCESSING_KEY, 1, job_id) or job is None:
+                continue
+            if job['status'] not in self.FINAL_STATUSES:
+                self.client.hset(self._key(job_id), 'status', STATUS_PENDENTE)
+                self.client.lpush(self.QUEUE_KEY, job_id)
+                recovered.append(job_id)
+        return recovered
+
+
+class RelatorioJobService:
+    """
+    Fila de geração de relatórios em PDF.
+
+    A requisição web apenas registra o job (com o HTML já renderizado) e
+    retorna; a conversão em PDF acontece em segundo plano, com novas
+    tentativas para falhas transitórias do serviço do WeasyPrint. Com
+    REDIS_URL configurado, os jobs ficam no Redis e são processados pelo
+    comando `flask relatorios-worker`. Sem Redis, um pool de threads do
+    próprio processo executa os jobs, o que só funciona com um único
+    processo web; fora de TESTING/DEBUG isso exige REPORT_JOB_MEMORY_STORE.
+    """
+
+    @staticmethod
+    def _state():
+        return current_app.extensions.setdefault('relatorio_jobs', {})
+
+    @staticmethod
+    def _store():
+        state = RelatorioJobService._state()
+        if 'store' not in state:
+            url = current_app.config.get('REDIS_URL')
+            if url and redis is not None:
+                state['store'] = _RedisJobStore(redis.Redis.from_url(url))
+            elif current_app.testing or current_app.debug or current_app.config.get('REPORT_JOB_MEMORY_STORE'):
+                state['store'] = _MemoryJobStore()
+            else:
+                raise RuntimeError(
+                    'Fila de relatórios indisponível: configure REDIS_URL '
+                    '(ou REPORT_JOB_MEMORY_STORE com um único processo web).'
+                )
+        return state['store']
+
+    @staticmethod
+    def _executor():
+        state = RelatorioJobService._state()
+        if 'executor' not in state:
+            state['executor'] = ThreadPoolExecutor(
+                max_workers=current_app.config.get('REPORT_JOB_WORKERS', 2),
+                thread_name_prefix='relatorio-job'
+            )
+        return state['executor']
+
+    @staticmethod
+    def submit(html, user_id, filename='relatorio.pdf'):
+        """Registra um novo job e retorna o seu id."""
+        job = {
+            'id': uuid.uuid4().hex,
+            'user_id': user_id,
+            'status': STATUS_PENDENTE,
+            'attempts': 0,
+            'filename': filename,
+            'created_at': time.time(),
+        }
+        store = RelatorioJobService._store()
+        store.create(job, html, current_app.config.get('REPORT_JOB_RETENTION', 3600))
+
+        if isinstance(store, _MemoryJobStore):
+            app = current_app._get_current_object()
+            RelatorioJobService._executor().submit(RelatorioJobService._run_in_app, app, job['id'])
+        return job['id']
+
+    @staticmethod
+    def get_job(job_id, user_id):
+        """Retorna o job se ele existir e pertencer ao usuário."""
+        job = RelatorioJobService._store().get(job_id)
+        if not job or job['user_id'] != user_id:
+            return None
+        return job
+
+    @staticmethod
+    def get_result(job_id, user_id):
+        """Retorna (job, pdf) de um job concluído do usuário, ou (job, None)."""
+        job = RelatorioJobService.get_job(job_id, user_id)
+        if not job or job['status'] != STATUS_CONCLUIDO:
+            return job, None
+        return job, RelatorioJobService._store().get_result(job_id)
+
+    @staticmethod
+    def _run_in_app(app, job_id):
+        with app.app_context():
+            RelatorioJobService._process_safely(job_id)
+
+    @staticmethod
+    def _process_safely(job_id):
+        try:
+            RelatorioJobService.process(job_id)
+        except Exception as e:
+            current_app.logger.error(f"Erro ao processar relatório {job_id}: {e}")
+            RelatorioJobService._store().update(job_id, status=STATUS_ERRO, error='Erro interno ao gerar o relatório.')
+
+    @staticmethod
+    def process(job_id):
+        """Gera o PDF de um job, repetindo falhas transitórias com backoff exponencial."""
+        config = current_app.config
+        store = RelatorioJobService._store()
+        retention = config.get('REPORT_JOB_RETENTION', 3600)
+        max_attempts = config.get('REPORT_JOB_MAX_ATTEMPTS', 3)
+        backoff = config.get('REPORT_JOB_RETRY_BACKOFF', 2)
+
+        html = store.get_html(job_id)
+        if html is None:
+            # Sem o HTML o job nunca terminaria: o cliente veria 'pendente' para sempre
+            current_app.logger.warning(f"Relatório {job_id}: conteúdo ausente ou expirado.")
+            store.update(job_id, ttl=retention, status=STATUS_ERRO,
+                         error='O conteúdo do relatório expirou. Gere o relatório novamente.')
+            return False
+
+        for attempt in range(1, max_attempts + 1):
+            store.update(job_id, status=STATUS_PROCESSANDO, attempts=attempt)
+            try:
+                pdf = gerar_pdf_com_api(html, config['WEASYPRINT_API_URL'], config.get('WEASYPRINT_TIMEOUT', 30))
+            except PdfServiceError as e:
+                current_app.logger.warning(f"Relatório {job_id}: tentativa {attempt} falhou: {e}")
+                if not e.retryable or attempt == max_attempts:
+                    store.update(job_id, ttl=retention, status=STATUS_ERRO, error=str(e))
+                    return False
+                time.sleep(backoff * (2 ** (attempt - 1)))
+                continue
+
+            store.store_result(job_id, pdf, retention)
+            store.update(job_id, status=STATUS_CONCLUIDO, finished_at=time.time())
+            return True
+        return False
+
+    @staticmethod
+    def recover_stale_jobs():
+        """Devolve à fila os jobs que um worker encerrado deixou em processamento."""
+        store = RelatorioJobService._store()
+        recovered = store.recover(current_app.config.get('REPORT_JOB_STALE_AFTER', 600))
+        for job_id in recovered:
+            current_app.logger.warning(f"Relatório {job_id}: devolvido à fila após interrupção do worker.")
+        return recovered
+
+    @staticmethod
+    def run_worker(poll_timeout=5, max_jobs=None):
+        """
+        Laço do worker: consome a fila do Redis até ser interrompido (ou até
+        processar `max_jobs` jobs). Ao iniciar e sempre que a fila fica ociosa,
+        recupera os jobs abandonados por workers que caíram.
+        """
+        store = RelatorioJobService._store()
+        if not isinstance(store, _RedisJobStore):
+            raise RuntimeError('O worker de relatórios requer REDIS_URL configurado.')
+        RelatorioJobService.recover_stale_jobs()
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            job_id = store.pop(poll_timeout)
+            if not job_id:
+                RelatorioJobService.recover_stale_jobs()
+                continue
+            try:
+                RelatorioJobService._process_safely(job_id)
+            finally:
+                store.ack(job_id)
+            processed += 1
@@ -1,20 +1,50 @@
 # backend/services/relatorio_service.py
 
-from ..models.database import db
+from ..models.database import db, somente_leitura
 from ..models.horario import Horario
+from ..models.horas_instrutor_semana import HorasInstrutorSemana
 from ..models.semana import Semana
 from ..models.instrutor import Instrutor
 from ..models.disciplina import Disciplina
 from ..models.user import User
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, delete, insert
 from sqlalchemy.orm import joinedload
 from collections import defaultdict
 
 class RelatorioService:
     @staticmethod
+    def atualizar_horas(semana_ids):
+        """
+        Recalcula no banco o livro de horas (HorasInstrutorSemana) das semanas
+        indicadas a partir das aulas confirmadas, com um DELETE + INSERT ...
+        SELECT. Não faz commit: entra na transação de quem alterou as aulas.
+        """
+        semana_ids = {semana_id for semana_id in semana_ids if semana_id is not None}
+        if not semana_ids:
+            return
+
+        horas = (
+            select(Horario.semana_id, Horario.instrutor_id, Horario.disciplina_id, func.sum(Horario.duracao))
+            .where(Horario.semana_id.in_(semana_ids), Horario.status == 'confirmado')
+            .group_by(Horario.semana_id, Horario.instrutor_id, Horario.disciplina_id)
+        )
+
+        db.session.flush()
+        tabela = HorasInstrutorSemana.__table__
+        db.session.execute(delete(tabela).where(tabela.c.semana_id.in_(semana_ids)))
+        db.session.execute(insert(tabela).from_select(
+            ['semana_id', 'instrutor_id', 'disciplina_id', 'horas'], horas
+        ))
+
+    @staticmethod
+    @somente_leitura
     def get_horas_aula_por_instrutor(data_inicio, data_fim, is_rr_filter=False, instrutor_ids_filter=None):
         """
         Busca e totaliza as horas-aula por instrutor e disciplina para um determinado período.
+
+        As horas vêm do livro de horas (HorasInstrutorSemana). As horas pagas
+        anteriormente são o total acumulado, por instrutor e disciplina, das
+        semanas anteriores ao período, calculado com uma função de janela.
         
         Args:
             data_inicio (date): A data de início do período do relatório.
@@ -25,47 +55,51 @@ class RelatorioService:
         Returns:
             list: Uma lista de dicionários, cada um representando um instrutor e suas aulas.
         """
-        # 1. Encontrar todas as semanas que se sobrepõem ao período solicitado.
-        semanas_no_periodo_ids = db.session.scalars(
-            select(Semana.id).where(
-                Semana.data_inicio <= data_fim,
-                Semana.data_fim >= data_inicio
-            )
-        ).all()
-
-        if not semanas_no_periodo_ids:
-            return []
-
-        # 2. Construir a query base para buscar as aulas confirmadas no período.
+        # 1. Linhas do livro de todas as semanas que começam até o fim do período, com o
+        #    total acumulado das semanas anteriores de cada instrutor/disciplina.
+        livro = HorasInstrutorSemana
         query = (
             select(
-                Horario.instrutor_id,
-                Horario.disciplina_id,
-                func.sum(Horario.duracao).label('ch_a_pagar')
-            )
-            .join(Instrutor, Horario.instrutor_id == Instrutor.id)
-            .where(
-                Horario.semana_id.in_(semanas_no_periodo_ids),
-                Horario.status == 'confirmado'
+                livro.instrutor_id,
+                livro.disciplina_id,
+                livro.horas,
+                Semana.data_fim,
+                func.sum(livro.horas).over(
+                    partition_by=(livro.instrutor_id, livro.disciplina_id),
+                    order_by=(Semana.data_inicio, Semana.id),
+                    rows=(None, -1),
+                ).label('horas_anteriores'),
             )
+            .join(Semana, Semana.id == livro.semana_id)
+            .join(Instrutor, livro.instrutor_id == Instrutor.id)
+            .where(Semana.data_inicio <= data_fim)
         )
 
-        # 3. Aplicar filtros opcionais
+        # 2. Aplicar filtros opcionais
         if is_rr_filter:
             query = query.where(Instrutor.is_rr == True)
         
         if instrutor_ids_filter:
-            query = query.where(Horario.instrutor_id.in_(instrutor_ids_filter))
+            query = query.where(livro.instrutor_id.in_(instrutor_ids_filter))
 
-        # 4. Agrupar os resultados por instrutor e disciplina
+        # 3. Somar as semanas que se sobrepõem ao período. O acumulado da primeira delas
+        #    (o menor) é o que já foi pago antes do período.
+        semanas = query.subquery()
         aulas_agrupadas = db.session.execute(
-            query.group_by(Horario.instrutor_id, Horario.disciplina_id)
+            select(
+                semanas.c.instrutor_id,
+                semanas.c.disciplina_id,
+                func.sum(semanas.c.horas).label('ch_a_pagar'),
+                func.min(func.coalesce(semanas.c.horas_anteriores, 0)).label('ch_paga_anteriormente'),
+            )
+            .where(semanas.c.data_fim >= data_inicio)
+            .group_by(semanas.c.instrutor_id, semanas.c.disciplina_id)
         ).all()
 
         if not aulas_agrupadas:
             return []
             
-        # 5. Estruturar os dados para o template do relatório
+        # 4. Estruturar os dados para o template do relatório
         instrutor_ids = {aula.instrutor_id for aula in aulas_agrupadas}
         
         # Pré-carrega todos os dados de instrutores e disciplinas necessários para evitar múltiplas queries
@@ -88,7 +122,7 @@ class RelatorioService:
                 disciplina_info = {
                     'nome': disciplinas_map.get(aula.disciplina_id).materia if aula.disciplina_id in disciplinas_map else "N/D",
                     'ch_total': disciplinas_map.get(aula.disciplina_id).carga_horaria_prevista if aula.disciplina_id in disciplinas_map else 0,
-                    'ch_paga_anteriormente': 0, # Lógica a ser implementada se necessário
+                    'ch_paga_anteriormente': aula.ch_paga_anteriormente,
                     'ch_a_pagar': aula.ch_a_pagar
                 }
                 dados_formatados[aula.instrutor_id]['disciplinas'].append(disciplina_info)
@@ -1,9 +1,12 @@
 from sqlalchemy import select
 from backend.models.database import db
 from backend.models.site_config import SiteConfig
+from backend.services.cache_service import CacheService
 from flask import current_app
 import re
 
+SITE_CONFIG_STAMP = 'site_config'
+
 class SiteConfigService:
 
     _DEFAULT_CONFIGS = [
@@ -54,11 +57,8 @@ class SiteConfigService:
     @staticmethod
     def get_config(key: str, default_value: str = None):
         """Pega uma configuração do site"""
-        config = db.session.execute(
-            select(SiteConfig).where(SiteConfig.config_key == key)
-        ).scalar_one_or_none()
-        
-        return config.config_value if config else default_value
+        config_map = SiteConfigService.get_config_map()
+        return config_map[key] if key in config_map else default_value
     
     @staticmethod
     def set_config(key: str, value: str, config_type: str = 'text', 
@@ -111,12 +111,25 @@ class SiteConfigService:
             )
             db.session.add(config)
         
+        CacheService.invalidate_on_commit(SITE_CONFIG_STAMP)
         return config
     
     @staticmethod
     def get_all_configs():
         """Pega todas as configurações"""
         return db.session.execute(select(SiteConfig)).scalars().all()
+
+    @staticmethod
+    def get_config_map():
+        """
+        Retorna o dicionário chave->valor de todas as configurações, servido
+        pelo cache do processo enquanto o stamp de versão não mudar.
+        """
+        def _load():
+            rows = db.session.execute(select(SiteConfig.config_key, SiteConfig.config_value)).all()
+            return {key: value for key, value in rows}
+
+        return CacheService.get_or_set('site_config:map', _load, stamp_key=SITE_CONFIG_STAMP)
     
     @staticmethod
     def get_configs_by_category(category: str):
@@ -128,12 +141,10 @@ class SiteConfigService:
     @staticmethod
     def init_default_configs():
         """Inicializa configurações padrão"""
+        existing_keys = set(db.session.execute(select(SiteConfig.config_key)).scalars().all())
+        added = False
         for key, value, config_type, description, category in SiteConfigService._DEFAULT_CONFIGS:
-            existing = db.session.execute(
-                select(SiteConfig).where(SiteConfig.config_key == key)
-            ).scalar_one_or_none()
-            
-            if not existing:
+            if key not in existing_keys:
                 config = SiteConfig(
                     config_key=key,
                     config_value=value,
@@ -142,7 +153,12 @@ class SiteConfigService:
                     category=category
                 )
                 db.session.add(config)
+                added = True
+
+        if added:
+            CacheService.invalidate_on_commit(SITE_CONFIG_STAMP)
         
     @staticmethod
     def delete_all_configs():
-        db.session.query(SiteConfig).delete()
\ No newline at end of file
+        db.session.query(SiteConfig).delete()
+        CacheService.invalidate_on_commit(SITE_CONFIG_STAMP)
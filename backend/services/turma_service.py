@@ -1,12 +1,16 @@
 # backend/services/turma_service.py
 
 from flask import current_app
-from sqlalchemy import select
+from sqlalchemy import select, func
 from ..models.database import db
 from ..models.turma import Turma
 from ..models.aluno import Aluno
 from ..models.disciplina_turma import DisciplinaTurma
+from ..models.horario import Horario
 from ..models.turma_cargo import TurmaCargo
+from .dashboard_service import DashboardService
+from .relatorio_service import RelatorioService
+from .matricula_service import MatriculaService
 
 class TurmaService:
     @staticmethod
@@ -29,6 +33,7 @@ class TurmaService:
 
             if alunos_ids:
                 db.session.query(Aluno).filter(Aluno.id.in_(alunos_ids)).update({"turma_id": nova_turma.id})
+                MatriculaService.matricular_pendentes(aluno_ids=alunos_ids)
             
             db.session.commit()
             return True, "Turma cadastrada com sucesso!"
@@ -58,6 +63,7 @@ class TurmaService:
             
             if alunos_ids_selecionados:
                 db.session.query(Aluno).filter(Aluno.id.in_(alunos_ids_selecionados)).update({"turma_id": turma_id})
+                MatriculaService.matricular_pendentes(aluno_ids=alunos_ids_selecionados)
                 
             db.session.commit()
             return True, "Turma atualizada com sucesso!"
@@ -79,7 +85,13 @@ class TurmaService:
             db.session.query(Aluno).filter(Aluno.turma_id == turma_id).update({"turma_id": None})
             
             db.session.query(TurmaCargo).filter_by(turma_id=turma_id).delete()
-            db.session.query(DisciplinaTurma).filter_by(pelotao=turma.nome).delete()
+            db.session.query(DisciplinaTurma).filter_by(turma_id=turma_id).delete()
+            semanas_com_aulas = db.session.scalars(
+                select(Horario.semana_id).where(Horario.turma_id == turma_id).distinct()
+            ).all()
+            db.session.query(Horario).filter_by(turma_id=turma_id).delete()
+            RelatorioService.atualizar_horas(semanas_com_aulas)
+            DashboardService.invalidar_estatisticas()
             
             db.session.delete(turma)
             db.session.commit()
@@ -89,6 +101,26 @@ class TurmaService:
             current_app.logger.error(f"Erro ao excluir turma: {e}")
             return False, f'Erro ao excluir a turma: {str(e)}'
 
+    @staticmethod
+    def listar_turmas_com_contagem(school_id=None):
+        """
+        Retorna [(turma, total_de_alunos)] ordenado por nome. A contagem vem de
+        uma subconsulta agrupada, sem carregar a lista de alunos de cada turma.
+        """
+        contagem = (
+            select(Aluno.turma_id, func.count(Aluno.id).label('total'))
+            .group_by(Aluno.turma_id)
+            .subquery()
+        )
+        stmt = (
+            select(Turma, func.coalesce(contagem.c.total, 0))
+            .outerjoin(contagem, contagem.c.turma_id == Turma.id)
+            .order_by(Turma.nome)
+        )
+        if school_id:
+            stmt = stmt.where(Turma.school_id == school_id)
+        return [(turma, total) for turma, total in db.session.execute(stmt).all()]
+
     @staticmethod
     def get_cargos_da_turma(turma_id, cargos_lista):
         """Busca os cargos de uma turma e garante que todos da lista existam."""
@@ -1,8 +1,16 @@
 # backend/services/user_service.py
 
+import csv
+import io
+import itertools
+import re
+from collections import Counter
+from datetime import datetime, timezone
+
 from flask import current_app, session
 from flask_login import current_user
-from sqlalchemy import select
+from sqlalchemy import select, insert, func, or_
+from sqlalchemy.orm import contains_eager
 from sqlalchemy.exc import IntegrityError
 from werkzeug.utils import secure_filename
 import os
@@ -13,6 +21,41 @@ from ..models.aluno import Aluno
 from ..models.user_school import UserSchool
 from ..models.school import School
 from ..services.asset_service import AssetService
+from ..services.dashboard_service import DashboardService
+from ..services.identity_service import current_identity
+from ..services.instrutor_service import InstrutorService
+from ..services.pagination import paginar_keyset
+from ..services.uniqueness import norm_matricula
+from ..services.matricula_service import MatriculaService
+
+# Matrículas por bloco (limita o tamanho das listas IN e dos INSERTs em lote)
+PRE_CADASTRO_LOTE = 500
+
+PRE_CADASTRO_CRIADO = 'criado'
+PRE_CADASTRO_VINCULADO = 'vinculado'
+PRE_CADASTRO_EXISTENTE = 'existente'
+PRE_CADASTRO_DUPLICADO = 'duplicado'
+PRE_CADASTRO_INVALIDO = 'invalido'
+PRE_CADASTRO_ERRO = 'erro'
+
+# Separadores aceitos numa matrícula digitada (ex: "20-02", "12.345"); qualquer outro
+# caractere não numérico torna a linha inválida em vez de ser descartado em silêncio
+SEPARADORES_MATRICULA = re.compile(r'[\s.\-/]+')
+
+
+def _insert_ignorando_conflitos(table):
+    """INSERT que ignora linhas em conflito com chaves únicas (ON CONFLICT DO NOTHING)."""
+    dialeto = db.session.get_bind().dialect.name
+    if dialeto == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table).on_conflict_do_nothing()
+    if dialeto == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table).on_conflict_do_nothing()
+    if dialeto in ('mysql', 'mariadb'):
+        return insert(table).prefix_with('IGNORE')
+    return insert(table)
+
 
 class UserService:
     
@@ -35,6 +78,7 @@ class UserService:
             db.session.add(new_user)
             db.session.flush()
             db.session.add(UserSchool(user_id=new_user.id, school_id=school_id, role=role))
+            DashboardService.invalidar_estatisticas()
             db.session.commit()
             return True, f"Usuário {matricula} pré-cadastrado com sucesso como {role}."
         except Exception as e:
@@ -44,38 +88,112 @@ class UserService:
 
     @staticmethod
     def batch_pre_register_users(matriculas, role, school_id):
-        novos_usuarios_count = 0
-        usuarios_existentes_count = 0
-        
-        for matricula in matriculas:
-            user = db.session.scalar(select(User).filter_by(matricula=matricula))
-            if user:
-                usuarios_existentes_count += 1
-                existing_assignment = db.session.scalar(
-                    select(UserSchool).filter_by(user_id=user.id, school_id=school_id)
-                )
-                if not existing_assignment:
-                    db.session.add(UserSchool(user_id=user.id, school_id=school_id, role=role))
-                continue
-            
-            try:
-                new_user = User(matricula=matricula, role=role, is_active=False)
-                db.session.add(new_user)
-                db.session.flush()
-                db.session.add(UserSchool(user_id=new_user.id, school_id=school_id, role=role))
-                novos_usuarios_count += 1
-            except Exception as e:
-                db.session.rollback()
-                current_app.logger.error(f"Erro no pré-cadastro em lote para {matricula}: {e}")
-                return False, 0, 0
+        """
+        Pré-cadastra um lote de matrículas (lista ou iterável, ex: um CSV lido
+        em streaming) com um número fixo de consultas por bloco: um IN para os
+        usuários existentes, um INSERT em lote para os novos e outro para os
+        vínculos com a escola, ignorando conflitos de cadastros concorrentes.
 
+        Retorna (success, relatorio), onde o relatório tem uma entrada por linha
+        recebida: {'linha', 'matricula', 'status', 'mensagem'}.
+        """
+        relatorio = []
+        validas = {}
+        for linha, bruta in enumerate(matriculas, start=1):
+            sem_separadores = SEPARADORES_MATRICULA.sub('', bruta or '')
+            matricula = norm_matricula(bruta) if sem_separadores.isdigit() else None
+            item = {'linha': linha, 'matricula': matricula or (bruta or '').strip()}
+            if not matricula:
+                item.update(status=PRE_CADASTRO_INVALIDO, mensagem='Matrícula inválida.')
+            elif matricula in validas:
+                item.update(status=PRE_CADASTRO_DUPLICADO, mensagem=f"Repetida (linha {validas[matricula]['linha']}).")
+            else:
+                validas[matricula] = item
+            relatorio.append(item)
+
+        pendentes = list(validas)
         try:
+            for inicio in range(0, len(pendentes), PRE_CADASTRO_LOTE):
+                bloco = pendentes[inicio:inicio + PRE_CADASTRO_LOTE]
+                existentes = dict(db.session.execute(
+                    select(User.matricula, User.id).where(User.matricula.in_(bloco))
+                ).all())
+
+                novas = [m for m in bloco if m not in existentes]
+                if novas:
+                    db.session.execute(
+                        _insert_ignorando_conflitos(User.__table__),
+                        [{'matricula': m, 'role': role, 'is_active': False, 'must_change_password': False} for m in novas]
+                    )
+                    criados = dict(db.session.execute(
+                        select(User.matricula, User.id).where(User.matricula.in_(novas))
+                    ).all())
+                else:
+                    criados = {}
+
+                ids = {**existentes, **criados}
+                ja_vinculados = set(db.session.scalars(
+                    select(UserSchool.user_id).where(
+                        UserSchool.school_id == school_id, UserSchool.user_id.in_(ids.values())
+                    )
+                ))
+                agora = datetime.now(timezone.utc)
+                vinculos = [
+                    {'user_id': user_id, 'school_id': school_id, 'role': role, 'created_at': agora}
+                    for user_id in ids.values() if user_id not in ja_vinculados
+                ]
+                if vinculos:
+                    db.session.execute(_insert_ignorando_conflitos(UserSchool.__table__), vinculos)
+                    # Usuários existentes que já têm perfil de aluno passam a cursar as disciplinas da escola
+                    MatriculaService.matricular_pendentes(
+                        school_id=school_id, aluno_ids=select(Aluno.id).where(Aluno.user_id.in_([v['user_id'] for v in vinculos]))
+                    )
+
+                for matricula in bloco:
+                    item = validas[matricula]
+                    if matricula in criados:
+                        item.update(status=PRE_CADASTRO_CRIADO, mensagem='Pré-cadastrado.')
+                    elif ids.get(matricula) in ja_vinculados:
+                        item.update(status=PRE_CADASTRO_EXISTENTE, mensagem='Já cadastrado nesta escola.')
+                    else:
+                        item.update(status=PRE_CADASTRO_VINCULADO, mensagem='Já existia; vinculado à escola.')
+
+            DashboardService.invalidar_estatisticas()
             db.session.commit()
-            return True, novos_usuarios_count, usuarios_existentes_count
+            return True, relatorio
         except Exception as e:
             db.session.rollback()
-            current_app.logger.error(f"Erro final no commit do pré-cadastro em lote: {e}")
-            return False, 0, 0
+            current_app.logger.error(f"Erro no pré-cadastro em lote: {e}")
+            for item in validas.values():
+                item.update(status=PRE_CADASTRO_ERRO, mensagem='Não processada (erro no lote).')
+            return False, relatorio
+
+    @staticmethod
+    def resumir_relatorio(relatorio):
+        """Contagem de linhas por status de um relatório de pré-cadastro."""
+        return Counter(item['status'] for item in relatorio)
+
+    @staticmethod
+    def ler_matriculas_csv(stream):
+        """
+        Lê as matrículas de um CSV enviado, linha a linha, sem carregar o arquivo
+        inteiro. Usa a coluna "matricula" se houver cabeçalho; caso contrário, a
+        primeira coluna. Aceita ',' ou ';' como separador.
+        """
+        texto = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        primeira = texto.readline()
+        delimitador = ';' if primeira.count(';') > primeira.count(',') else ','
+        coluna = 0
+        for indice, campos in enumerate(csv.reader(itertools.chain([primeira], texto), delimiter=delimitador)):
+            if indice == 0:
+                cabecalho = [c.strip().lower() for c in campos]
+                nomes = [n for n in ('matricula', 'matrícula') if n in cabecalho]
+                if nomes:
+                    coluna = cabecalho.index(nomes[0])
+                    continue
+            if not any(c.strip() for c in campos):
+                continue
+            yield campos[coluna].strip() if coluna < len(campos) else ''
 
     @staticmethod
     def assign_school_role(user_id, school_id, role):
@@ -104,6 +222,9 @@ class UserService:
             db.session.add(new_assignment)
         
         try:
+            if user.aluno_profile:
+                MatriculaService.matricular_pendentes(aluno_ids=[user.aluno_profile.id], school_id=school_id)
+            DashboardService.invalidar_estatisticas()
             db.session.commit()
             return True, f"Função de '{role}' atribuída com sucesso a {user.nome_completo or user.matricula} na escola {school.nome}."
         except IntegrityError:
@@ -127,9 +248,52 @@ class UserService:
             return False, "Vínculo não encontrado para este usuário e escola."
 
         db.session.delete(assignment)
+        DashboardService.invalidar_estatisticas()
         db.session.commit()
         return True, "Vínculo com a escola removido com sucesso."
 
+    @staticmethod
+    def get_usuarios_gerenciaveis():
+        """Usuários que podem receber vínculos (apenas as colunas usadas no seletor)."""
+        return db.session.execute(
+            select(User.id, User.nome_completo, User.username, User.matricula)
+            .where(User.role.notin_(['programador', 'super_admin']))
+            .order_by(User.nome_completo)
+        ).all()
+
+    @staticmethod
+    def get_usuarios_sem_escola():
+        """Usuários gerenciáveis sem nenhum vínculo com escola."""
+        return db.session.scalars(
+            select(User)
+            .where(
+                User.role.notin_(['programador', 'super_admin']),
+                ~select(UserSchool.id).where(UserSchool.user_id == User.id).exists()
+            )
+            .order_by(User.nome_completo)
+        ).all()
+
+    @staticmethod
+    def listar_atribuicoes(school_id=None, busca=None, cursor=None, por_pagina=50):
+        """Lista paginada (keyset) dos vínculos usuário/escola, ordenada por escola e nome."""
+        stmt = (
+            select(UserSchool)
+            .join(User, UserSchool.user_id == User.id)
+            .join(School, UserSchool.school_id == School.id)
+            .options(contains_eager(UserSchool.user), contains_eager(UserSchool.school))
+        )
+        if school_id:
+            stmt = stmt.where(UserSchool.school_id == school_id)
+        if busca:
+            termo = f"%{busca.strip()}%"
+            stmt = stmt.where(or_(
+                User.nome_completo.ilike(termo),
+                User.username.ilike(termo),
+                User.matricula.ilike(termo),
+            ))
+        chaves = [School.nome, func.coalesce(User.nome_completo, ''), UserSchool.id]
+        return paginar_keyset(stmt, chaves, cursor=cursor, por_pagina=por_pagina)
+
     @staticmethod
     def get_current_school_id():
         if not current_user.is_authenticated:
@@ -140,11 +304,8 @@ class UserService:
             if school_id_from_session:
                 return school_id_from_session
 
-        user_school = db.session.scalar(
-            select(UserSchool).filter_by(user_id=current_user.id)
-        )
-        
-        return user_school.school_id if user_school else None
+        # Os vínculos já foram carregados junto com o usuário (ver IdentityService)
+        return current_identity.school_id
     
     @staticmethod
     def delete_user_by_id(user_id: int):
@@ -156,7 +317,12 @@ class UserService:
             return False, "Não é permitido excluir um Super Admin ou Programador."
 
         try:
+            if user.instrutor_profile:
+                erro = InstrutorService.preparar_exclusao(user.instrutor_profile.id)
+                if erro:
+                    return False, erro
             db.session.delete(user)
+            DashboardService.invalidar_estatisticas()
             db.session.commit()
             return True, f"Usuário '{user.nome_completo or user.matricula}' foi excluído permanentemente."
         except Exception as e:
@@ -12,21 +12,22 @@ from ..models.disciplina import Disciplina
 
 class VinculoService:
     @staticmethod
-    def get_all_vinculos(turma_filtrada: str = '', disciplina_filtrada_id: int = None):
+    def get_all_vinculos(turma_filtrada_id: int = None, disciplina_filtrada_id: int = None):
         # Carrega ambos os instrutores para exibição correta
         query = db.select(DisciplinaTurma).options(
             joinedload(DisciplinaTurma.instrutor_1).joinedload(Instrutor.user),
             joinedload(DisciplinaTurma.instrutor_2).joinedload(Instrutor.user),
-            joinedload(DisciplinaTurma.disciplina)
+            joinedload(DisciplinaTurma.disciplina),
+            joinedload(DisciplinaTurma.turma)
         )
 
-        if turma_filtrada:
-            query = query.filter(DisciplinaTurma.pelotao == turma_filtrada)
+        if turma_filtrada_id:
+            query = query.filter(DisciplinaTurma.turma_id == turma_filtrada_id)
 
         if disciplina_filtrada_id:
             query = query.filter(DisciplinaTurma.disciplina_id == disciplina_filtrada_id)
 
-        query = query.order_by(DisciplinaTurma.pelotao, DisciplinaTurma.disciplina_id)
+        query = query.join(DisciplinaTurma.turma).order_by(Turma.nome, DisciplinaTurma.disciplina_id)
         return db.session.scalars(query).all()
 
     @staticmethod
@@ -41,7 +42,7 @@ class VinculoService:
         # Procura por um vínculo para esta turma e disciplina
         vinculo_existente = db.session.scalars(select(DisciplinaTurma).filter_by(
             disciplina_id=disciplina_id,
-            pelotao=turma.nome
+            turma_id=turma.id
         )).first()
 
         try:
@@ -63,7 +64,7 @@ class VinculoService:
                 # Se não existe, cria um novo vínculo com o instrutor no primeiro slot
                 novo_vinculo = DisciplinaTurma(
                     instrutor_id_1=instrutor_id,
-                    pelotao=turma.nome,
+                    turma_id=turma.id,
                     disciplina_id=disciplina_id
                 )
                 db.session.add(novo_vinculo)
@@ -91,7 +92,7 @@ class VinculoService:
 
         try:
             vinculo.instrutor_id_1 = instrutor_id
-            vinculo.pelotao = turma.nome
+            vinculo.turma_id = turma.id
             vinculo.disciplina_id = disciplina_id
             
             db.session.commit()
@@ -97,6 +97,11 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            # O modo batch recria tabelas; se SQLITE_FOREIGN_KEYS ligar foreign_keys (Config.SQLITE_PRAGMAS),
+            # o DROP da tabela antiga apagaria ou bloquearia as linhas que a referenciam
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            connection.commit()
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -0,0 +1,36 @@
+"""Adiciona flag aceita_texto_livre em opcoes_respostas
+
+Revision ID: 7c1f4b2a9d10
+Revises: 3ed2689003dc
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1f4b2a9d10'
+down_revision = '3ed2689003dc'
+branch_labels = None
+depends_on = None
+
+# Textos que antes eram reconhecidos por comparação de string nos controllers
+TEXTOS_LIVRES = ('Outro', 'Outra área', 'Outro motivo', 'Outra forma', 'Quais')
+
+
+def upgrade():
+    with op.batch_alter_table('opcoes_respostas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('aceita_texto_livre', sa.Boolean(), server_default='0', nullable=False))
+
+    opcoes = sa.table('opcoes_respostas', sa.column('texto', sa.String), sa.column('aceita_texto_livre', sa.Boolean))
+    op.execute(
+        opcoes.update()
+        .where(opcoes.c.texto.in_(TEXTOS_LIVRES))
+        .values(aceita_texto_livre=True)
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('opcoes_respostas', schema=None) as batch_op:
+        batch_op.drop_column('aceita_texto_livre')
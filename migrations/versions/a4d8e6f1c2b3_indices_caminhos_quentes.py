@@ -0,0 +1,54 @@
+"""Adiciona índices para as consultas mais frequentes
+
+Revision ID: a4d8e6f1c2b3
+Revises: 7c1f4b2a9d10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d8e6f1c2b3'
+down_revision = '7c1f4b2a9d10'
+branch_labels = None
+depends_on = None
+
+INDICES = [
+    ('ix_horarios_pelotao_semana', 'horarios', ['pelotao', 'semana_id', 'dia_semana', 'periodo']),
+    ('ix_horarios_disciplina_pelotao', 'horarios', ['disciplina_id', 'pelotao']),
+    ('ix_horarios_status', 'horarios', ['status']),
+    ('ix_horarios_instrutor_semana', 'horarios', ['instrutor_id', 'semana_id']),
+    ('ix_historico_disciplinas_aluno_disciplina', 'historico_disciplinas', ['aluno_id', 'disciplina_id']),
+    ('ix_historico_disciplinas_disciplina', 'historico_disciplinas', ['disciplina_id']),
+    ('ix_respostas_questionario_user', 'respostas', ['questionario_id', 'user_id']),
+    ('ix_respostas_questionario_pergunta_opcao', 'respostas', ['questionario_id', 'pergunta_id', 'opcao_resposta_id']),
+    ('ix_disciplina_turmas_pelotao_disciplina', 'disciplina_turmas', ['pelotao', 'disciplina_id']),
+    ('ix_disciplina_turmas_instrutor_1', 'disciplina_turmas', ['instrutor_id_1']),
+    ('ix_disciplina_turmas_instrutor_2', 'disciplina_turmas', ['instrutor_id_2']),
+    ('ix_semanas_ciclo_datas', 'semanas', ['ciclo_id', 'data_inicio', 'data_fim']),
+    ('ix_semanas_datas', 'semanas', ['data_inicio', 'data_fim']),
+    ('ix_user_schools_school_role', 'user_schools', ['school_id', 'role']),
+]
+
+
+def _colunas(inspector, tabela):
+    return {coluna['name'] for coluna in inspector.get_columns(tabela)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for nome, tabela, colunas in INDICES:
+        # Bancos criados só pela migração inicial podem não ter colunas adicionadas
+        # depois nos modelos (ex: semanas.ciclo_id); nesses casos o índice é ignorado.
+        if not set(colunas) <= _colunas(inspector, tabela):
+            continue
+        op.create_index(nome, tabela, colunas, unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for nome, tabela, _ in reversed(INDICES):
+        if nome in {indice['name'] for indice in inspector.get_indexes(tabela)}:
+            op.drop_index(nome, table_name=tabela)
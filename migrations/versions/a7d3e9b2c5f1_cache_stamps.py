@@ -0,0 +1,31 @@
+"""Cria a tabela de carimbos de versão do cache
+
+Revision ID: a7d3e9b2c5f1
+Revises: f2c6a9e1d4b8
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9b2c5f1'
+down_revision = 'f2c6a9e1d4b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'cache_stamps' not in inspector.get_table_names():
+        op.create_table(
+            'cache_stamps',
+            sa.Column('chave', sa.String(length=100), nullable=False),
+            sa.Column('versao', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('chave'),
+        )
+
+
+def downgrade():
+    op.drop_table('cache_stamps')
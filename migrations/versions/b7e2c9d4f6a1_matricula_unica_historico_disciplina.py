@@ -0,0 +1,94 @@
+"""Matrícula única por aluno e disciplina em historico_disciplinas
+
+Revision ID: b7e2c9d4f6a1
+Revises: a4d8e6f1c2b3
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c9d4f6a1'
+down_revision = 'a4d8e6f1c2b3'
+branch_labels = None
+depends_on = None
+
+INDICE_ANTIGO = 'ix_historico_disciplinas_aluno_disciplina'
+RESTRICAO = 'uq_historico_disciplinas_aluno_disciplina'
+COLUNAS_NOTA = ('nota', 'nota_p1', 'nota_p2', 'nota_rec')
+
+
+def _com_nota(tabela):
+    """Condição SQL: a linha tem alguma nota lançada (média, P1, P2 ou recuperação)."""
+    return '(' + ' OR '.join(f'{tabela}.{coluna} IS NOT NULL' for coluna in COLUNAS_NOTA) + ')'
+
+
+def _exigir_no_maximo_uma_com_nota():
+    conflitos = op.get_bind().execute(sa.text(f"""
+        SELECT aluno_id, disciplina_id, COUNT(*) FROM historico_disciplinas
+        WHERE {_com_nota('historico_disciplinas')}
+        GROUP BY aluno_id, disciplina_id
+        HAVING COUNT(*) > 1
+        ORDER BY aluno_id, disciplina_id
+    """)).all()
+    if conflitos:
+        pares = ', '.join(f'({aluno_id}, {disciplina_id}): {total}' for aluno_id, disciplina_id, total in conflitos)
+        raise RuntimeError(
+            f"Matrículas duplicadas com notas em mais de um registro (aluno_id, disciplina_id): {pares}. "
+            f"Escolha as notas corretas, apague os registros excedentes e rode a migração de novo."
+        )
+
+
+def upgrade():
+    # Duplicatas com notas em mais de uma linha precisam de decisão manual:
+    # nenhuma nota lançada é apagada pela migração
+    _exigir_no_maximo_uma_com_nota()
+
+    # As demais duplicatas não têm nota. Fica o registro com nota (se houver)
+    # e, quando nenhum tem, o de menor id.
+    op.execute(sa.text(f"""
+        DELETE FROM historico_disciplinas
+        WHERE NOT {_com_nota('historico_disciplinas')}
+          AND EXISTS (
+            SELECT 1 FROM historico_disciplinas o
+            WHERE o.aluno_id = historico_disciplinas.aluno_id
+              AND o.disciplina_id = historico_disciplinas.disciplina_id
+              AND o.id <> historico_disciplinas.id
+              AND ({_com_nota('o')} OR o.id < historico_disciplinas.id)
+          )
+    """))
+
+    inspector = sa.inspect(op.get_bind())
+    indices = {indice['name'] for indice in inspector.get_indexes('historico_disciplinas')}
+    with op.batch_alter_table('historico_disciplinas', schema=None) as batch_op:
+        # A restrição única já cobre as buscas por (aluno_id, disciplina_id)
+        if INDICE_ANTIGO in indices:
+            batch_op.drop_index(INDICE_ANTIGO)
+        batch_op.create_unique_constraint(RESTRICAO, ['aluno_id', 'disciplina_id'])
+
+    # Matrículas que faltam: antes eram criadas ao abrir a página de notas, agora
+    # MatriculaService.matricular_pendentes cuida dos casos novos. Mesma consulta, sem filtros.
+    op.execute(sa.text("""
+        INSERT INTO historico_disciplinas (aluno_id, disciplina_id, status)
+        SELECT alunos_escola.aluno_id, d.id, 'cursando'
+        FROM (
+            SELECT a.id AS aluno_id, t.school_id AS school_id
+            FROM alunos a JOIN turmas t ON a.turma_id = t.id
+            UNION
+            SELECT a.id AS aluno_id, us.school_id AS school_id
+            FROM alunos a JOIN user_schools us ON us.user_id = a.user_id
+        ) alunos_escola
+        JOIN disciplinas d ON d.school_id = alunos_escola.school_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM historico_disciplinas h
+            WHERE h.aluno_id = alunos_escola.aluno_id AND h.disciplina_id = d.id
+        )
+    """))
+
+
+def downgrade():
+    with op.batch_alter_table('historico_disciplinas', schema=None) as batch_op:
+        batch_op.drop_constraint(RESTRICAO, type_='unique')
+        batch_op.create_index(INDICE_ANTIGO, ['aluno_id', 'disciplina_id'], unique=False)
@@ -0,0 +1,57 @@
+"""Cria o resumo materializado de notas por aluno
+
+Revision ID: c3f1a8e5d2b7
+Revises: b7e2c9d4f6a1
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f1a8e5d2b7'
+down_revision = 'b7e2c9d4f6a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'resumo_notas_alunos' not in inspector.get_table_names():
+        op.create_table(
+            'resumo_notas_alunos',
+            sa.Column('aluno_id', sa.Integer(), nullable=False),
+            sa.Column('media_final', sa.Float(), nullable=True),
+            sa.Column('disciplinas_avaliadas', sa.Integer(), nullable=False),
+            sa.Column('disciplinas_total', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('atualizado_em', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['aluno_id'], ['alunos.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('aluno_id'),
+        )
+        op.create_index('ix_resumo_notas_alunos_media', 'resumo_notas_alunos', ['media_final'], unique=False)
+
+    # Preenche o resumo com as notas já lançadas (mesma regra de HistoricoService.atualizar_resumos)
+    op.execute(sa.text("""
+        INSERT INTO resumo_notas_alunos
+            (aluno_id, media_final, disciplinas_avaliadas, disciplinas_total, status, atualizado_em)
+        SELECT h.aluno_id,
+               AVG(h.nota),
+               COUNT(h.nota),
+               COUNT(h.id),
+               CASE
+                   WHEN COUNT(h.nota) < COUNT(h.id) THEN 'cursando'
+                   WHEN AVG(h.nota) >= 7.0 THEN 'aprovado'
+                   ELSE 'reprovado'
+               END,
+               CURRENT_TIMESTAMP
+        FROM historico_disciplinas h
+        WHERE NOT EXISTS (SELECT 1 FROM resumo_notas_alunos r WHERE r.aluno_id = h.aluno_id)
+        GROUP BY h.aluno_id
+    """))
+
+
+def downgrade():
+    op.drop_index('ix_resumo_notas_alunos_media', table_name='resumo_notas_alunos')
+    op.drop_table('resumo_notas_alunos')
@@ -0,0 +1,107 @@
+"""Troca o nome do pelotão por turma_id em horarios e disciplina_turmas
+
+Revision ID: d5a9f2c7e4b1
+Revises: c3f1a8e5d2b7
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a9f2c7e4b1'
+down_revision = 'c3f1a8e5d2b7'
+branch_labels = None
+depends_on = None
+
+# tabela -> (índices antigos por nome do pelotão, índices novos por turma_id, chave estrangeira)
+TABELAS = {
+    'horarios': (
+        {
+            'ix_horarios_pelotao_semana': ['pelotao', 'semana_id', 'dia_semana', 'periodo'],
+            'ix_horarios_disciplina_pelotao': ['disciplina_id', 'pelotao'],
+        },
+        {
+            'ix_horarios_turma_semana': ['turma_id', 'semana_id', 'dia_semana', 'periodo'],
+            'ix_horarios_disciplina_turma': ['disciplina_id', 'turma_id'],
+        },
+        'fk_horarios_turma_id',
+    ),
+    'disciplina_turmas': (
+        {
+            'ix_disciplina_turmas_pelotao_disciplina': ['pelotao', 'disciplina_id'],
+        },
+        {
+            'ix_disciplina_turmas_turma_disciplina': ['turma_id', 'disciplina_id'],
+        },
+        'fk_disciplina_turmas_turma_id',
+    ),
+}
+
+
+def _pelotoes_sem_turma(tabela):
+    return op.get_bind().execute(sa.text(f"""
+        SELECT pelotao, COUNT(*) FROM {tabela}
+        WHERE turma_id IS NULL
+        GROUP BY pelotao ORDER BY pelotao
+    """)).all()
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for tabela in TABELAS:
+        if 'turma_id' not in {coluna['name'] for coluna in inspector.get_columns(tabela)}:
+            op.add_column(tabela, sa.Column('turma_id', sa.Integer(), nullable=True))
+
+        # Turma.nome é único, então o nome gravado identifica a turma sem ambiguidade
+        op.execute(sa.text(f"""
+            UPDATE {tabela}
+            SET turma_id = (SELECT t.id FROM turmas t WHERE t.nome = {tabela}.pelotao)
+            WHERE turma_id IS NULL
+        """))
+
+    # Registros de turmas renomeadas ou excluídas fazem parte do histórico (e do
+    # relatório de horas-aula): a migração para, antes de alterar qualquer tabela,
+    # até que sejam remapeados. Rodar de novo é seguro: só preenche o que falta.
+    pendentes = {tabela: _pelotoes_sem_turma(tabela) for tabela in TABELAS}
+    pendentes = {tabela: linhas for tabela, linhas in pendentes.items() if linhas}
+    if pendentes:
+        detalhes = '; '.join(
+            f"{tabela}: " + ', '.join(f'{pelotao!r} ({total})' for pelotao, total in linhas)
+            for tabela, linhas in pendentes.items()
+        )
+        raise RuntimeError(
+            f"Pelotões sem turma com o mesmo nome (registros entre parênteses): {detalhes}. "
+            f"Atualize a coluna pelotao para o nome atual da turma (ou recrie a turma) "
+            f"e rode a migração de novo."
+        )
+
+    for tabela, (indices_antigos, indices_novos, chave) in TABELAS.items():
+        existentes = {indice['name'] for indice in inspector.get_indexes(tabela)}
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            for nome in indices_antigos:
+                if nome in existentes:
+                    batch_op.drop_index(nome)
+            batch_op.alter_column('turma_id', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_foreign_key(chave, 'turmas', ['turma_id'], ['id'])
+            batch_op.drop_column('pelotao')
+            for nome, colunas in indices_novos.items():
+                batch_op.create_index(nome, colunas, unique=False)
+
+
+def downgrade():
+    for tabela, (indices_antigos, indices_novos, chave) in TABELAS.items():
+        op.add_column(tabela, sa.Column('pelotao', sa.String(length=50), nullable=True))
+        op.execute(sa.text(f"""
+            UPDATE {tabela}
+            SET pelotao = (SELECT t.nome FROM turmas t WHERE t.id = {tabela}.turma_id)
+        """))
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            for nome in indices_novos:
+                batch_op.drop_index(nome)
+            batch_op.drop_constraint(chave, type_='foreignkey')
+            batch_op.drop_column('turma_id')
+            batch_op.alter_column('pelotao', existing_type=sa.String(length=50), nullable=False)
+            for nome, colunas in indices_antigos.items():
+                batch_op.create_index(nome, colunas, unique=False)
@@ -0,0 +1,117 @@
+"""Grava dia_semana e status de horarios como códigos inteiros
+
+Revision ID: e8b3d1f6a9c2
+Revises: d5a9f2c7e4b1
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3d1f6a9c2'
+down_revision = 'd5a9f2c7e4b1'
+branch_labels = None
+depends_on = None
+
+# Mesma ordem de DIAS_SEMANA e STATUS_HORARIO em backend/models/horario.py
+DIAS_SEMANA = ('segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado', 'domingo')
+STATUS_HORARIO = ('pendente', 'confirmado')
+
+# Grafias acentuadas que podem ter sido gravadas antes da validação do dia
+VARIANTES = {'terça': 'terca', 'sábado': 'sabado'}
+
+INDICES_ANTIGOS = {
+    'ix_horarios_turma_semana': ['turma_id', 'semana_id', 'dia_semana', 'periodo'],
+    'ix_horarios_status': ['status'],
+}
+INDICES_NOVOS = {
+    'ix_horarios_turma_semana': ['turma_id', 'semana_id', 'dia_semana', 'periodo', 'duracao'],
+    'ix_horarios_status': ['status'],
+}
+
+
+def _case_texto_para_codigo(coluna, valores, variantes=None):
+    ramos = [f"WHEN '{valor}' THEN {codigo}" for codigo, valor in enumerate(valores)]
+    for variante, valor in (variantes or {}).items():
+        ramos.append(f"WHEN '{variante}' THEN {valores.index(valor)}")
+    return f"CASE lower(trim({coluna})) {' '.join(ramos)} END"
+
+
+def _case_codigo_para_texto(coluna, valores):
+    ramos = [f"WHEN {codigo} THEN '{valor}'" for codigo, valor in enumerate(valores)]
+    return f"CASE {coluna} {' '.join(ramos)} END"
+
+
+def _trocar_colunas(novas, tipo_antigo, tipo_novo, indices_antigos, indices_novos):
+    inspector = sa.inspect(op.get_bind())
+    existentes = {indice['name'] for indice in inspector.get_indexes('horarios')}
+    with op.batch_alter_table('horarios', schema=None) as batch_op:
+        for nome in indices_antigos:
+            if nome in existentes:
+                batch_op.drop_index(nome)
+        for coluna in novas:
+            batch_op.drop_column(coluna)
+    # O batch do SQLite não renomeia para o nome de uma coluna removida no mesmo passo,
+    # e os índices só enxergam os nomes novos depois da troca
+    with op.batch_alter_table('horarios', schema=None) as batch_op:
+        for coluna in novas:
+            batch_op.alter_column(
+                f'{coluna}_novo', new_column_name=coluna,
+                existing_type=tipo_novo, nullable=False,
+            )
+    for nome, colunas in indices_novos.items():
+        op.create_index(nome, 'horarios', colunas, unique=False)
+
+
+def _valores_sem_codigo():
+    return op.get_bind().execute(sa.text("""
+        SELECT 'dia_semana', dia_semana, COUNT(*) FROM horarios
+        WHERE dia_semana_novo IS NULL GROUP BY dia_semana
+        UNION ALL
+        SELECT 'status', status, COUNT(*) FROM horarios
+        WHERE status_novo IS NULL GROUP BY status
+        ORDER BY 1, 2
+    """)).all()
+
+
+def upgrade():
+    colunas = {coluna['name'] for coluna in sa.inspect(op.get_bind()).get_columns('horarios')}
+    for coluna in ('dia_semana_novo', 'status_novo'):
+        if coluna not in colunas:
+            op.add_column('horarios', sa.Column(coluna, sa.SmallInteger(), nullable=True))
+    op.execute(sa.text(f"""
+        UPDATE horarios SET
+            dia_semana_novo = {_case_texto_para_codigo('dia_semana', DIAS_SEMANA, VARIANTES)},
+            status_novo = {_case_texto_para_codigo('status', STATUS_HORARIO)}
+    """))
+    # Aulas com valores fora das listas ainda contam no relatório de horas-aula:
+    # a migração para antes de trocar as colunas, para que sejam corrigidas à mão.
+    # Rodar de novo é seguro: as colunas novas são recalculadas.
+    sem_codigo = _valores_sem_codigo()
+    if sem_codigo:
+        detalhes = ', '.join(f'{coluna}={valor!r} ({total})' for coluna, valor, total in sem_codigo)
+        raise RuntimeError(
+            f"horarios com valores sem código (registros entre parênteses): {detalhes}. "
+            f"Valores aceitos: dia_semana {', '.join(DIAS_SEMANA)}; status {', '.join(STATUS_HORARIO)}. "
+            f"Corrija os registros e rode a migração de novo."
+        )
+    _trocar_colunas(
+        ('dia_semana', 'status'), sa.String(length=20), sa.SmallInteger(),
+        INDICES_ANTIGOS, INDICES_NOVOS,
+    )
+
+
+def downgrade():
+    op.add_column('horarios', sa.Column('dia_semana_novo', sa.String(length=20), nullable=True))
+    op.add_column('horarios', sa.Column('status_novo', sa.String(length=20), nullable=True))
+    op.execute(sa.text(f"""
+        UPDATE horarios SET
+            dia_semana_novo = {_case_codigo_para_texto('dia_semana', DIAS_SEMANA)},
+            status_novo = {_case_codigo_para_texto('status', STATUS_HORARIO)}
+    """))
+    _trocar_colunas(
+        ('dia_semana', 'status'), sa.SmallInteger(), sa.String(length=20),
+        INDICES_NOVOS, INDICES_ANTIGOS,
+    )
@@ -0,0 +1,54 @@
+"""Cria o livro de horas-aula por instrutor, disciplina e semana
+
+Revision ID: f2c6a9e1d4b8
+Revises: e8b3d1f6a9c2
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6a9e1d4b8'
+down_revision = 'e8b3d1f6a9c2'
+branch_labels = None
+depends_on = None
+
+# Código de 'confirmado' em horarios.status (STATUS_HORARIO em backend/models/horario.py)
+STATUS_CONFIRMADO = 1
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'horas_instrutor_semanas' not in inspector.get_table_names():
+        op.create_table(
+            'horas_instrutor_semanas',
+            sa.Column('semana_id', sa.Integer(), nullable=False),
+            sa.Column('instrutor_id', sa.Integer(), nullable=False),
+            sa.Column('disciplina_id', sa.Integer(), nullable=False),
+            sa.Column('horas', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['semana_id'], ['semanas.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['instrutor_id'], ['instrutores.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['disciplina_id'], ['disciplinas.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('semana_id', 'instrutor_id', 'disciplina_id'),
+        )
+        op.create_index(
+            'ix_horas_instrutor_semanas_instrutor', 'horas_instrutor_semanas',
+            ['instrutor_id', 'disciplina_id', 'semana_id', 'horas'], unique=False,
+        )
+
+    # Preenche o livro com as aulas já confirmadas (mesma regra de RelatorioService.atualizar_horas)
+    op.execute(sa.text(f"""
+        INSERT INTO horas_instrutor_semanas (semana_id, instrutor_id, disciplina_id, horas)
+        SELECT h.semana_id, h.instrutor_id, h.disciplina_id, SUM(h.duracao)
+        FROM horarios h
+        WHERE h.status = {STATUS_CONFIRMADO}
+          AND NOT EXISTS (SELECT 1 FROM horas_instrutor_semanas l WHERE l.semana_id = h.semana_id)
+        GROUP BY h.semana_id, h.instrutor_id, h.disciplina_id
+    """))
+
+
+def downgrade():
+    op.drop_index('ix_horas_instrutor_semanas_instrutor', table_name='horas_instrutor_semanas')
+    op.drop_table('horas_instrutor_semanas')
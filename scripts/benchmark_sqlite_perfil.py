@@ -0,0 +1,111 @@
+"""
+Mede escritas concorrentes num SQLite em arquivo com o perfil padrão do
+driver (journal de rollback, synchronous=FULL) e com Config.SQLITE_PRAGMAS
+(WAL, synchronous=NORMAL, busy_timeout...).
+
+Cada escritor grava lançamentos em transações curtas, como no lançamento de
+notas e na edição do quadro; os leitores fazem a consulta agregada de um
+relatório ao mesmo tempo. Para cada perfil, o script mostra as transações
+gravadas por segundo, as falhas ("database is locked") e as leituras feitas.
+
+Uso: python scripts/benchmark_sqlite_perfil.py [--escritores 8] [--leitores 4] [--transacoes 200] [--timeout 0]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from backend.config import Config  # noqa: E402
+from backend.models.database import configurar_pragmas_sqlite  # noqa: E402
+
+
+def _engine(caminho, pragmas, timeout):
+    engine = create_engine(
+        f'sqlite:///{caminho}', pool_size=Config.DB_POOL_SIZE, max_overflow=Config.DB_MAX_OVERFLOW,
+        connect_args={'timeout': timeout},
+    )
+    configurar_pragmas_sqlite(engine, pragmas)
+    return engine
+
+
+def medir(pragmas, escritores, leitores, transacoes, timeout):
+    with tempfile.TemporaryDirectory() as pasta:
+        return _medir(_engine(os.path.join(pasta, 'carga.db'), pragmas, timeout), escritores, leitores, transacoes)
+
+
+def _medir(engine, escritores, leitores, transacoes):
+    with engine.begin() as conn:
+        conn.exec_driver_sql('CREATE TABLE lancamentos (id INTEGER PRIMARY KEY, aluno_id INTEGER, nota REAL)')
+        conn.exec_driver_sql('CREATE INDEX ix_lancamentos_aluno ON lancamentos (aluno_id)')
+
+    gravadas, falhas, leituras = [0], [0], [0]
+    trava, fim = threading.Lock(), threading.Event()
+
+    def escritor(numero):
+        for i in range(transacoes):
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text('INSERT INTO lancamentos (aluno_id, nota) VALUES (:a, :n)'),
+                                 {'a': (numero * transacoes + i) % 500, 'n': i % 10})
+                with trava:
+                    gravadas[0] += 1
+            except OperationalError:
+                with trava:
+                    falhas[0] += 1
+
+    def leitor():
+        while not fim.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text('SELECT aluno_id, AVG(nota) FROM lancamentos GROUP BY aluno_id')).all()
+                with trava:
+                    leituras[0] += 1
+            except OperationalError:
+                pass
+
+    threads_leitura = [threading.Thread(target=leitor) for _ in range(leitores)]
+    threads_escrita = [threading.Thread(target=escritor, args=(n,)) for n in range(escritores)]
+    inicio = time.perf_counter()
+    for thread in threads_leitura + threads_escrita:
+        thread.start()
+    for thread in threads_escrita:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+    fim.set()
+    for thread in threads_leitura:
+        thread.join()
+    engine.dispose()
+    return gravadas[0] / duracao, falhas[0], leituras[0], duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escritores', type=int, default=8)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--transacoes', type=int, default=200, help='transações por escritor')
+    parser.add_argument('--timeout', type=float, default=5.0,
+                        help='timeout do driver em segundos (5 é o padrão do sqlite3)')
+    args = parser.parse_args()
+
+    perfis = {
+        'padrão do driver': {},
+        'Config.SQLITE_PRAGMAS': Config.SQLITE_PRAGMAS,
+    }
+    print(f"{args.escritores} escritores x {args.transacoes} transações, {args.leitores} leitores\n")
+    print(f"{'perfil':<24}{'gravadas/s':>12}{'falhas':>8}{'leituras':>10}{'tempo (s)':>11}")
+    for nome, pragmas in perfis.items():
+        por_segundo, falhas, leituras, duracao = medir(
+            pragmas, args.escritores, args.leitores, args.transacoes, args.timeout
+        )
+        print(f"{nome:<24}{por_segundo:>12.0f}{falhas:>8}{leituras:>10}{duracao:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
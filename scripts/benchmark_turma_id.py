@@ -0,0 +1,206 @@
+"""
+Compara as consultas do dashboard e do quadro horário com as aulas e os
+vínculos identificados pelo nome do pelotão (String) e por turma_id (inteiro).
+
+Monta dois bancos SQLite em memória com os mesmos dados, um com o esquema
+antigo (coluna `pelotao` e os índices por nome) e outro com o atual
+(`turma_id` e os índices por id), e mede cada consulta nos dois.
+
+Uso: python scripts/benchmark_turma_id.py [--escolas 4] [--turmas 10] [--semanas 40] [--repeticoes 50]
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+from datetime import date, timedelta
+
+DIAS = ['segunda', 'terca', 'quarta', 'quinta', 'sexta']
+
+ESQUEMA_COMUM = """
+CREATE TABLE turmas (id INTEGER PRIMARY KEY, nome VARCHAR(100) NOT NULL UNIQUE, ano INTEGER, school_id INTEGER NOT NULL);
+CREATE TABLE semanas (id INTEGER PRIMARY KEY, data_inicio DATE NOT NULL, data_fim DATE NOT NULL);
+CREATE TABLE disciplinas (id INTEGER PRIMARY KEY, materia VARCHAR(100) NOT NULL, school_id INTEGER NOT NULL);
+"""
+
+ESQUEMAS = {
+    'pelotao': ESQUEMA_COMUM + """
+CREATE TABLE horarios (
+    id INTEGER PRIMARY KEY, pelotao VARCHAR(50) NOT NULL, dia_semana VARCHAR(20) NOT NULL,
+    periodo INTEGER NOT NULL, duracao INTEGER, semana_id INTEGER NOT NULL, disciplina_id INTEGER NOT NULL,
+    instrutor_id INTEGER NOT NULL, status VARCHAR(20) NOT NULL
+);
+CREATE INDEX ix_horarios_pelotao_semana ON horarios (pelotao, semana_id, dia_semana, periodo);
+CREATE INDEX ix_horarios_disciplina_pelotao ON horarios (disciplina_id, pelotao);
+CREATE INDEX ix_horarios_status ON horarios (status);
+CREATE TABLE disciplina_turmas (
+    id INTEGER PRIMARY KEY, pelotao VARCHAR(50) NOT NULL, disciplina_id INTEGER NOT NULL,
+    instrutor_id_1 INTEGER, instrutor_id_2 INTEGER
+);
+CREATE INDEX ix_disciplina_turmas_pelotao_disciplina ON disciplina_turmas (pelotao, disciplina_id);
+CREATE INDEX ix_disciplina_turmas_instrutor_1 ON disciplina_turmas (instrutor_id_1);
+CREATE INDEX ix_disciplina_turmas_instrutor_2 ON disciplina_turmas (instrutor_id_2);
+""",
+    'turma_id': ESQUEMA_COMUM + """
+CREATE TABLE horarios (
+    id INTEGER PRIMARY KEY, turma_id INTEGER NOT NULL REFERENCES turmas (id), dia_semana VARCHAR(20) NOT NULL,
+    periodo INTEGER NOT NULL, duracao INTEGER, semana_id INTEGER NOT NULL, disciplina_id INTEGER NOT NULL,
+    instrutor_id INTEGER NOT NULL, status VARCHAR(20) NOT NULL
+);
+CREATE INDEX ix_horarios_turma_semana ON horarios (turma_id, semana_id, dia_semana, periodo);
+CREATE INDEX ix_horarios_disciplina_turma ON horarios (disciplina_id, turma_id);
+CREATE INDEX ix_horarios_status ON horarios (status);
+CREATE TABLE disciplina_turmas (
+    id INTEGER PRIMARY KEY, turma_id INTEGER NOT NULL REFERENCES turmas (id), disciplina_id INTEGER NOT NULL,
+    instrutor_id_1 INTEGER, instrutor_id_2 INTEGER
+);
+CREATE INDEX ix_disciplina_turmas_turma_disciplina ON disciplina_turmas (turma_id, disciplina_id);
+CREATE INDEX ix_disciplina_turmas_instrutor_1 ON disciplina_turmas (instrutor_id_1);
+CREATE INDEX ix_disciplina_turmas_instrutor_2 ON disciplina_turmas (instrutor_id_2);
+""",
+}
+
+# Mesmas consultas dos serviços, nas duas formas de identificar a turma.
+# Parâmetros: :school_id, :turma (nome ou id), :semana_id, :hoje, :instrutor_id
+CONSULTAS = {
+    'dashboard: aulas pendentes da escola': {
+        'pelotao': """SELECT count(h.id) FROM horarios h JOIN turmas t ON t.nome = h.pelotao
+                      WHERE h.status = 'pendente' AND t.school_id = :school_id""",
+        'turma_id': """SELECT count(h.id) FROM horarios h JOIN turmas t ON t.id = h.turma_id
+                       WHERE h.status = 'pendente' AND t.school_id = :school_id""",
+    },
+    'dashboard: próximas aulas da escola': {
+        'pelotao': """SELECT h.id FROM horarios h JOIN semanas s ON s.id = h.semana_id
+                      JOIN turmas t ON t.nome = h.pelotao
+                      WHERE s.data_fim >= :hoje AND h.status = 'confirmado' AND t.school_id = :school_id
+                      ORDER BY s.data_inicio, h.periodo LIMIT 5""",
+        'turma_id': """SELECT h.id FROM horarios h JOIN semanas s ON s.id = h.semana_id
+                       JOIN turmas t ON t.id = h.turma_id
+                       WHERE s.data_fim >= :hoje AND h.status = 'confirmado' AND t.school_id = :school_id
+                       ORDER BY s.data_inicio, h.periodo LIMIT 5""",
+    },
+    'quadro: aulas da turma na semana': {
+        'pelotao': """SELECT h.id, h.dia_semana, h.periodo, h.duracao, d.materia FROM horarios h
+                      JOIN disciplinas d ON d.id = h.disciplina_id
+                      WHERE h.pelotao = :turma AND h.semana_id = :semana_id""",
+        'turma_id': """SELECT h.id, h.dia_semana, h.periodo, h.duracao, d.materia FROM horarios h
+                       JOIN disciplinas d ON d.id = h.disciplina_id
+                       WHERE h.turma_id = :turma AND h.semana_id = :semana_id""",
+    },
+    'quadro: horas agendadas por disciplina': {
+        'pelotao': """SELECT h.disciplina_id, sum(h.duracao) FROM horarios h
+                      WHERE h.pelotao = :turma AND h.disciplina_id IN (SELECT id FROM disciplinas WHERE school_id = :school_id)
+                      GROUP BY h.disciplina_id""",
+        'turma_id': """SELECT h.disciplina_id, sum(h.duracao) FROM horarios h
+                       WHERE h.turma_id = :turma AND h.disciplina_id IN (SELECT id FROM disciplinas WHERE school_id = :school_id)
+                       GROUP BY h.disciplina_id""",
+    },
+    'quadro: turmas vinculadas ao instrutor': {
+        'pelotao': """SELECT t.id, t.nome FROM turmas t WHERE t.nome IN (
+                          SELECT DISTINCT v.pelotao FROM disciplina_turmas v
+                          WHERE v.instrutor_id_1 = :instrutor_id OR v.instrutor_id_2 = :instrutor_id)
+                      ORDER BY t.nome""",
+        'turma_id': """SELECT t.id, t.nome FROM turmas t WHERE t.id IN (
+                           SELECT v.turma_id FROM disciplina_turmas v
+                           WHERE v.instrutor_id_1 = :instrutor_id OR v.instrutor_id_2 = :instrutor_id)
+                       ORDER BY t.nome""",
+    },
+}
+
+
+def gerar_dados(escolas, turmas_por_escola, semanas, seed=42):
+    """Dados sintéticos: cada turma tem o quadro de todas as semanas quase cheio."""
+    aleatorio = random.Random(seed)
+    turmas = [
+        (escola * turmas_por_escola + i + 1, f'{i + 1}º Pelotão - Escola {escola + 1} - CTSP 2025', 2025, escola + 1)
+        for escola in range(escolas) for i in range(turmas_por_escola)
+    ]
+    inicio = date.today() - timedelta(weeks=semanas // 2)
+    lista_semanas = [
+        (i + 1, (inicio + timedelta(weeks=i)).isoformat(), (inicio + timedelta(weeks=i, days=6)).isoformat())
+        for i in range(semanas)
+    ]
+    disciplinas = [(d + 1, f'Disciplina {d + 1}', d // 30 + 1) for d in range(escolas * 30)]
+
+    horarios, vinculos = [], []
+    for turma_id, _, _, school_id in turmas:
+        materias = [d[0] for d in disciplinas if d[2] == school_id]
+        for disciplina_id in materias:
+            vinculos.append((turma_id, disciplina_id, aleatorio.randint(1, 80), None))
+        for semana_id, _, _ in lista_semanas:
+            for dia in DIAS:
+                periodo = 1
+                while periodo <= 12:
+                    duracao = aleatorio.choice((1, 2, 2, 3))
+                    status = 'pendente' if aleatorio.random() < 0.05 else 'confirmado'
+                    horarios.append((turma_id, dia, periodo, duracao, semana_id,
+                                     aleatorio.choice(materias), aleatorio.randint(1, 80), status))
+                    periodo += duracao
+    return turmas, lista_semanas, disciplinas, horarios, vinculos
+
+
+def montar_banco(esquema, dados):
+    turmas, semanas, disciplinas, horarios, vinculos = dados
+    nomes = {turma[0]: turma[1] for turma in turmas}
+    conexao = sqlite3.connect(':memory:')
+    conexao.executescript(ESQUEMAS[esquema])
+    conexao.executemany('INSERT INTO turmas VALUES (?, ?, ?, ?)', turmas)
+    conexao.executemany('INSERT INTO semanas VALUES (?, ?, ?)', semanas)
+    conexao.executemany('INSERT INTO disciplinas VALUES (?, ?, ?)', disciplinas)
+
+    chave = (lambda turma_id: nomes[turma_id]) if esquema == 'pelotao' else (lambda turma_id: turma_id)
+    conexao.executemany(
+        f'INSERT INTO horarios ({esquema}, dia_semana, periodo, duracao, semana_id, disciplina_id, instrutor_id, status) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        [(chave(h[0]),) + h[1:] for h in horarios],
+    )
+    conexao.executemany(
+        f'INSERT INTO disciplina_turmas ({esquema}, disciplina_id, instrutor_id_1, instrutor_id_2) VALUES (?, ?, ?, ?)',
+        [(chave(v[0]),) + v[1:] for v in vinculos],
+    )
+    conexao.execute('ANALYZE')
+    conexao.commit()
+    return conexao, chave
+
+
+def medir(conexao, sql, parametros, repeticoes):
+    """Mediana, em milissegundos, de `repeticoes` execuções completas da consulta."""
+    conexao.execute(sql, parametros).fetchall()  # aquece o cache de páginas
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        conexao.execute(sql, parametros).fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escolas', type=int, default=4)
+    parser.add_argument('--turmas', type=int, default=10, help='turmas por escola')
+    parser.add_argument('--semanas', type=int, default=40)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    dados = gerar_dados(args.escolas, args.turmas, args.semanas)
+    print(f"{len(dados[0])} turmas, {len(dados[1])} semanas, {len(dados[3])} aulas, {len(dados[4])} vínculos\n")
+
+    bancos = {esquema: montar_banco(esquema, dados) for esquema in ESQUEMAS}
+    turma_id, semana_id = len(dados[0]) // 2, len(dados[1]) // 2
+    school_id = dados[0][turma_id - 1][3]
+
+    print(f"{'consulta':<42} {'pelotao (ms)':>13} {'turma_id (ms)':>14} {'ganho':>7}")
+    for nome, sqls in CONSULTAS.items():
+        tempos = {}
+        for esquema, (conexao, chave) in bancos.items():
+            parametros = {
+                'school_id': school_id, 'turma': chave(turma_id), 'semana_id': semana_id,
+                'hoje': date.today().isoformat(), 'instrutor_id': 7,
+            }
+            tempos[esquema] = medir(conexao, sqls[esquema], parametros, args.repeticoes)
+        ganho = tempos['pelotao'] / tempos['turma_id'] if tempos['turma_id'] else float('inf')
+        print(f"{nome:<42} {tempos['pelotao']:>13.3f} {tempos['turma_id']:>14.3f} {ganho:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
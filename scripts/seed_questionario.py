@@ -19,6 +19,9 @@ from backend.models.pergunta import Pergunta
 from backend.models.opcao_resposta import OpcaoResposta
 
 
+# Opções que abrem um campo de texto livre
+OPCOES_TEXTO_LIVRE = {'Outro', 'Outra área', 'Outro motivo', 'Outra forma', 'Quais'}
+
 # 3. Dados a serem inseridos
 DADOS_QUESTIONARIO = {
     "titulo": "Avaliação Inicial CTSP",
@@ -83,7 +86,11 @@ def popular_questionario_db():
 
             # Adiciona as opções de resposta para a pergunta
             for opcao_texto in pergunta_info['opcoes']:
-                opcao = OpcaoResposta(texto=opcao_texto, pergunta_id=nova_pergunta.id)
+                opcao = OpcaoResposta(
+                    texto=opcao_texto,
+                    pergunta_id=nova_pergunta.id,
+                    aceita_texto_livre=opcao_texto in OPCOES_TEXTO_LIVRE
+                )
                 db.session.add(opcao)
 
         # Se tudo correu bem, salva todas as alterações no banco de dados
@@ -139,3 +139,24 @@ def setup_school_with_users(db_session):
     db_session.commit()
     
     return school, admin_user, [aluno1, aluno2], ciclo
+
+@pytest.fixture(scope='function')
+def count_queries(test_app):
+    """Conta os comandos SQL executados no engine enquanto o contexto estiver ativo."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _counter():
+        statements = []
+
+        def _before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(_db.engine, 'before_cursor_execute', _before_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(_db.engine, 'before_cursor_execute', _before_execute)
+
+    return _counter
@@ -105,12 +105,13 @@ class TestPermissionSystem:
             instrutor_user = User(matricula='instr_sched', username='instr_sched', role='instrutor', is_active=True)
             instrutor_user.set_password('instrpass')
             disciplina = Disciplina(materia='Disciplina Agenda', carga_horaria_prevista=10, school_id=escola.id, ciclo_id=ciclo.id)
-            db.session.add_all([semana, instrutor_user, disciplina])
+            turma = Turma(nome='Pel Agenda', ano=2025, school_id=escola.id)
+            db.session.add_all([semana, instrutor_user, disciplina, turma])
             db.session.commit()
             instrutor = Instrutor(user_id=instrutor_user.id, telefone=None, is_rr=False)
             db.session.add(instrutor)
             db.session.commit()
-            horario = Horario(pelotao='Pel Agenda', dia_semana='segunda', periodo=1, duracao=1, semana_id=semana.id, disciplina_id=disciplina.id, instrutor_id=instrutor.id, status='pendente')
+            horario = Horario(turma_id=turma.id, dia_semana='segunda', periodo=1, duracao=1, semana_id=semana.id, disciplina_id=disciplina.id, instrutor_id=instrutor.id, status='pendente')
             db.session.add(horario)
             db.session.commit()
             horario_id = horario.id
@@ -172,7 +173,7 @@ class TestWorkflow:
                 UserSchool(user_id=admin_user.id, school_id=school.id, role='admin_escola'),
                 UserSchool(user_id=aluno_user.id, school_id=school.id, role='aluno')
             ])
-            vinculo = DisciplinaTurma(pelotao=turma.nome, disciplina_id=disciplina.id, instrutor_id_1=instrutor.id)
+            vinculo = DisciplinaTurma(turma_id=turma.id, disciplina_id=disciplina.id, instrutor_id_1=instrutor.id)
             db.session.add(vinculo)
             db.session.commit()
 
@@ -181,10 +182,10 @@ class TestWorkflow:
                 client.post('/login', data={'username': 'instrutor_wf', 'password': 'pass1'}, follow_redirects=True)
                 with client.session_transaction() as sess:
                     assert sess.get('_user_id') == str(instrutor_user.id)
-                aula_data = {'pelotao': turma.nome, 'semana_id': semana.id, 'dia': 'segunda', 'periodo': 3, 'disciplina_id': disciplina.id, 'duracao': 2}
+                aula_data = {'turma_id': turma.id, 'semana_id': semana.id, 'dia': 'segunda', 'periodo': 3, 'disciplina_id': disciplina.id, 'duracao': 2}
                 response_instrutor = client.post('/horario/salvar-aula', json=aula_data)
                 assert response_instrutor.status_code == 200
-                aula_criada = db.session.scalar(select(Horario).where(Horario.pelotao == turma.nome))
+                aula_criada = db.session.scalar(select(Horario).where(Horario.turma_id == turma.id))
                 assert aula_criada is not None
                 assert aula_criada.status == 'pendente'
                 client.get('/logout', follow_redirects=True)
@@ -197,7 +198,78 @@ class TestWorkflow:
                 client.get('/logout', follow_redirects=True)
 
                 client.post('/login', data={'username': 'aluno_wf', 'password': 'pass3'}, follow_redirects=True)
-                response_aluno = client.get('/horario/', query_string={'pelotao': turma.nome, 'semana_id': semana.id})
+                response_aluno = client.get('/horario/', query_string={'turma_id': turma.id, 'semana_id': semana.id})
                 assert response_aluno.status_code == 200
                 assert b'Teste de Workflow' in response_aluno.data
                 assert b'Sgt Workflow' in response_aluno.data
+
+class TestStaticCaching:
+    """Testes dos cabeçalhos de cache de arquivos estáticos e páginas autenticadas."""
+
+    def test_static_url_tem_fingerprint_e_cache_imutavel(self, test_client, test_app):
+        with test_app.test_request_context():
+            from flask import url_for
+            url = url_for('static', filename='css/style.css')
+        assert '?v=' in url
+
+        response = test_client.get(url)
+        assert response.status_code == 200
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == 365 * 24 * 60 * 60
+        assert 'no-store' not in response.headers.get('Cache-Control', '')
+
+    def test_static_sem_versao_revalida_com_etag(self, test_client):
+        response = test_client.get('/static/css/style.css')
+        assert response.cache_control.no_cache
+        etag = response.headers.get('ETag')
+        assert etag
+
+        revalidation = test_client.get('/static/css/style.css', headers={'If-None-Match': etag})
+        assert revalidation.status_code == 304
+
+    def test_html_autenticado_nao_e_armazenado(self, test_client, test_app):
+        with test_app.app_context():
+            user = User(matricula='cache_user', username='cache_user', email='cache@test.com', role='programador', is_active=True)
+            user.set_password('cachepass')
+            db.session.add(user)
+            db.session.commit()
+
+        login_page = test_client.get('/login')
+        assert 'no-store' not in login_page.headers.get('Cache-Control', '')
+
+        test_client.post('/login', data={'username': 'cache_user', 'password': 'cachepass'})
+        response = test_client.get('/', follow_redirects=True)
+        assert response.mimetype == 'text/html'
+        assert 'no-store' in response.headers['Cache-Control']
+
+
+class TestPreCadastroCsv:
+
+    def test_upload_de_csv_mostra_relatorio(self, test_client, test_app):
+        import io
+        with test_app.app_context():
+            escola = School(nome='Escola CSV')
+            admin = User(matricula='adm_csv', username='adm_csv', email='adm@csv.com', role='admin_escola', is_active=True)
+            admin.set_password('adminpass')
+            db.session.add_all([escola, admin])
+            db.session.flush()
+            db.session.add(UserSchool(user_id=admin.id, school_id=escola.id, role='admin_escola'))
+            db.session.commit()
+            escola_id = escola.id
+
+        test_client.post('/login', data={'username': 'adm_csv', 'password': 'adminpass'})
+        response = test_client.post(
+            '/pre-cadastro?role=aluno',
+            data={'role': 'aluno', 'arquivo_csv': (io.BytesIO(b'matricula\n5001\n5002\nxyz\n'), 'alunos.csv')},
+            content_type='multipart/form-data',
+        )
+        html = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert 'Relatório do pré-cadastro' in html
+        assert 'Matrícula inválida.' in html
+
+        with test_app.app_context():
+            criados = db.session.scalars(
+                select(User.matricula).join(UserSchool).where(UserSchool.school_id == escola_id, User.role == 'aluno')
+            ).all()
+            assert sorted(criados) == ['5001', '5002']
@@ -0,0 +1,136 @@
+# tests/test_desempenho_service.py
+
+import statistics
+
+import pytest
+from sqlalchemy import insert, select
+
+from backend.models.database import db
+from backend.models.user import User
+from backend.models.aluno import Aluno
+from backend.models.disciplina import Disciplina
+from backend.models.historico_disciplina import HistoricoDisciplina
+from backend.models.turma import Turma
+from backend.services.desempenho_service import DesempenhoService
+from backend.services.historico_service import HistoricoService
+from backend.services.matricula_service import MatriculaService
+
+
+@pytest.fixture
+def turma_com_notas(setup_school_with_users):
+    """Turma base com mais dois alunos e notas lançadas em duas disciplinas."""
+    school, admin, alunos, ciclo = setup_school_with_users
+    turma = db.session.scalar(select(Turma).filter_by(school_id=school.id))
+    for i, nome in enumerate(['Aluno Extra A', 'Aluno Extra B']):
+        user = User(matricula=f'extra{i}', nome_completo=nome, role='aluno', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Aluno(user_id=user.id, opm='OPM', turma_id=turma.id))
+    direito = Disciplina(materia='Direito', carga_horaria_prevista=20, ciclo_id=ciclo.id, school_id=school.id)
+    tiro = Disciplina(materia='Tiro', carga_horaria_prevista=20, ciclo_id=ciclo.id, school_id=school.id)
+    db.session.add_all([direito, tiro])
+    db.session.flush()
+    MatriculaService.matricular_pendentes(school_id=school.id)
+    db.session.commit()
+
+    alunos = db.session.scalars(select(Aluno).filter_by(turma_id=turma.id).order_by(Aluno.id)).all()
+    # Direito: 9, 6 (recuperação 9 -> MFD 7), 8, sem nota; Tiro: 7, 7, 5, 10
+    notas_direito = [('9', '9', None), ('6', '6', '9'), ('8', '8', None), (None, None, None)]
+    notas_tiro = [('7', '7', None), ('7', '7', None), ('5', '5', None), ('10', '10', None)]
+    for aluno, d, t in zip(alunos, notas_direito, notas_tiro):
+        for disciplina, (p1, p2, rec) in [(direito, d), (tiro, t)]:
+            registro = db.session.scalar(select(HistoricoDisciplina).filter_by(aluno_id=aluno.id, disciplina_id=disciplina.id))
+            HistoricoService.avaliar_aluno(registro.id, {'nota_p1': p1, 'nota_p2': p2, 'nota_rec': rec}, from_admin=True)
+    return turma, admin, alunos, direito, tiro
+
+
+class TestDesempenhoService:
+
+    def test_estatisticas_por_disciplina(self, test_app, turma_com_notas, count_queries):
+        turma, _, _, direito, tiro = turma_com_notas
+        turma_id = turma.id
+
+        with count_queries() as statements:
+            estatisticas = {e['materia']: e for e in DesempenhoService.get_estatisticas_turma(turma_id)}
+        assert len(statements) == 1
+
+        d = estatisticas['Direito']
+        assert (d['matriculados'], d['avaliados']) == (4, 3)
+        assert d['media'] == pytest.approx(8.0)
+        assert d['mediana'] == pytest.approx(8.0)
+        assert d['desvio_padrao'] == pytest.approx(statistics.pstdev([9, 7, 8]))
+        assert (d['minima'], d['maxima']) == (7.0, 9.0)
+        assert (d['abaixo_da_media'], d['com_recuperacao']) == (1, 1)
+        assert sum(d['distribuicao']) == 3 and d['distribuicao'][7] == 1
+
+        t = estatisticas['Tiro']
+        # Número par de notas: média das duas do meio
+        assert t['mediana'] == pytest.approx(7.0)
+        assert t['distribuicao'][9] == 1  # nota 10 cai na última faixa
+
+    def test_classificacao_geral_e_por_disciplina(self, test_app, turma_com_notas):
+        turma, _, alunos, direito, _ = turma_com_notas
+
+        # Média do curso considera só as disciplinas já avaliadas
+        geral = DesempenhoService.get_classificacao_turma(turma.id)
+        assert [linha['media'] for linha in geral] == [10.0, 8.0, 7.0, 6.5]
+        assert [linha['posicao'] for linha in geral] == [1, 2, 3, 4]
+        assert geral[0]['aluno_id'] == alunos[3].id
+        assert geral[0]['status'] == 'cursando'
+        assert geral[-1]['status'] == 'reprovado'
+
+        por_direito = DesempenhoService.get_classificacao_turma(turma.id, direito.id)
+        assert [linha['media'] for linha in por_direito] == [9.0, 8.0, 7.0, None]
+
+    def test_empates_dividem_a_posicao(self, test_app, turma_com_notas):
+        turma, _, _, _, tiro = turma_com_notas
+        posicoes = [linha['posicao'] for linha in DesempenhoService.get_classificacao_turma(turma.id, tiro.id)]
+        assert posicoes == [1, 2, 2, 4]
+
+    def test_classificacao_de_turma_grande_em_uma_consulta(self, test_app, setup_school_with_users, count_queries):
+        school, _, _, _ = setup_school_with_users
+        turma = Turma(nome='Turma Grande', ano=2025, school_id=school.id)
+        db.session.add(turma)
+        db.session.flush()
+        turma_id, total = turma.id, 600
+        db.session.execute(insert(User.__table__), [
+            {'matricula': f'g{i}', 'nome_completo': f'Aluno {i:03d}', 'role': 'aluno', 'is_active': True}
+            for i in range(total)
+        ])
+        user_ids = db.session.scalars(select(User.id).where(User.matricula.like('g%'))).all()
+        db.session.execute(insert(Aluno.__table__), [
+            {'user_id': uid, 'opm': 'OPM', 'turma_id': turma_id, 'foto_perfil': 'default.png'} for uid in user_ids
+        ])
+        db.session.commit()
+
+        with count_queries() as statements:
+            classificacao = DesempenhoService.get_classificacao_turma(turma_id)
+        assert len(statements) == 1
+        assert len(classificacao) == total
+
+
+class TestDesempenhoController:
+
+    def test_pagina_e_api(self, test_client, test_app, turma_com_notas):
+        turma, admin, _, _, _ = turma_com_notas
+        turma_id = turma.id
+        admin.username = 'admin_desempenho'
+        admin.set_password('senha123')
+        db.session.commit()
+
+        test_client.post('/login', data={'username': 'admin_desempenho', 'password': 'senha123'})
+        assert test_client.get(f'/historico/turma/{turma_id}/desempenho').status_code == 200
+        resposta = test_client.get(f'/historico/api/turma/{turma_id}/desempenho').get_json()
+        assert resposta['success'] and len(resposta['classificacao']) == 4
+        assert test_client.get('/historico/api/turma/9999/desempenho').status_code == 404
+
+    def test_aluno_nao_ve_o_desempenho(self, test_client, test_app, turma_com_notas):
+        turma, _, alunos, _, _ = turma_com_notas
+        turma_id = turma.id
+        user = db.session.get(User, alunos[0].user_id)
+        user.username = 'aluno_desempenho'
+        user.set_password('senha123')
+        db.session.commit()
+
+        test_client.post('/login', data={'username': 'aluno_desempenho', 'password': 'senha123'})
+        assert test_client.get(f'/historico/api/turma/{turma_id}/desempenho').status_code == 404
@@ -92,7 +92,7 @@ class TestDisciplinaService:
         disciplina_id = disciplina.id
 
         matricula1 = HistoricoDisciplina(aluno_id=aluno1.id, disciplina_id=disciplina_id)
-        vinculo_turma = DisciplinaTurma(pelotao=aluno1.turma.nome, disciplina_id=disciplina_id)
+        vinculo_turma = DisciplinaTurma(turma_id=aluno1.turma_id, disciplina_id=disciplina_id)
         db_session.add_all([matricula1, vinculo_turma])
         db_session.commit()
 
@@ -132,3 +132,56 @@ class TestDisciplinaService:
         materias_ciclo1 = [item['disciplina'].materia for item in disciplinas_agrupadas['Ciclo 1']]
         assert materias_ciclo1 == ['Armamento e Munição', 'Legislação I']
         assert disciplinas_agrupadas['Ciclo 2'][0]['disciplina'].materia == 'Legislação II'
+
+    def test_get_progresso_em_lote(self, db_session, setup_school_with_users, count_queries):
+        """Calcula progresso de várias disciplinas e a matriz por turma em uma consulta."""
+        from datetime import date, timedelta
+        from backend.models.semana import Semana
+        from backend.models.horario import Horario
+        from backend.models.instrutor import Instrutor
+        from backend.models.user import User
+
+        school, _, _, ciclo_base = setup_school_with_users
+        hoje = date.today()
+        passada = Semana(nome='Passada', data_inicio=hoje - timedelta(days=14), data_fim=hoje - timedelta(days=8), ciclo_id=ciclo_base.id)
+        futura = Semana(nome='Futura', data_inicio=hoje + timedelta(days=7), data_fim=hoje + timedelta(days=13), ciclo_id=ciclo_base.id)
+        user_instrutor = User(matricula='inst_prog', username='inst_prog', role='instrutor')
+        d1 = Disciplina(materia="Progresso A", carga_horaria_prevista=10, ciclo_id=ciclo_base.id, school_id=school.id)
+        d2 = Disciplina(materia="Progresso B", carga_horaria_prevista=4, ciclo_id=ciclo_base.id, school_id=school.id)
+        pel_a, pel_b, pel_c = (Turma(nome=nome, ano=2025, school_id=school.id) for nome in ('Pel A', 'Pel B', 'Pel C'))
+        db_session.add_all([passada, futura, user_instrutor, d1, d2, pel_a, pel_b, pel_c])
+        db_session.commit()
+        instrutor = Instrutor(user_id=user_instrutor.id, telefone=None)
+        db_session.add(instrutor)
+        db_session.commit()
+
+        def aula(turma, semana, disciplina, duracao, status='confirmado'):
+            return Horario(turma_id=turma.id, dia_semana='segunda', periodo=1, duracao=duracao, semana_id=semana.id,
+                           disciplina_id=disciplina.id, instrutor_id=instrutor.id, status=status)
+
+        db_session.add_all([
+            aula(pel_a, passada, d1, 3),
+            aula(pel_b, passada, d1, 2),
+            aula(pel_a, futura, d1, 4),
+            aula(pel_a, passada, d2, 6),
+            aula(pel_b, passada, d2, 2, status='pendente'),
+        ])
+        db_session.commit()
+        a, b, c = pel_a.id, pel_b.id, pel_c.id
+        db_session.refresh(d1)
+        db_session.refresh(d2)
+
+        with count_queries() as statements:
+            progresso, matriz = DisciplinaService.get_progresso_em_lote([d1, d2], turma_ids=[a, b, c])
+        assert len(statements) == 1
+
+        assert progresso[d1.id] == {'agendado': 5, 'programado': 9, 'previsto': 10, 'percentual': 50}
+        assert progresso[d2.id]['percentual'] == 100
+        assert matriz[d1.id][a]['agendado'] == 3
+        assert matriz[d1.id][b]['agendado'] == 2
+        assert matriz[d1.id][c]['programado'] == 0
+        assert matriz[d2.id][b]['agendado'] == 0
+
+        progresso_pel_b, _ = DisciplinaService.get_progresso_em_lote([d1, d2], turma_id=b)
+        assert progresso_pel_b[d1.id]['agendado'] == 2
+        assert DisciplinaService.get_dados_progresso(d1, a)['percentual'] == 30
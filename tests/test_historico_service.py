@@ -0,0 +1,190 @@
+# tests/test_historico_service.py
+
+from backend.models.database import db
+from backend.models.disciplina import Disciplina
+from backend.models.historico_disciplina import HistoricoDisciplina
+from backend.models.disciplina_turma import DisciplinaTurma
+from backend.models.instrutor import Instrutor
+from backend.models.user import User
+from backend.models.user_school import UserSchool
+from backend.services.disciplina_service import DisciplinaService
+from backend.services.historico_service import HistoricoService
+from backend.services.matricula_service import MatriculaService
+
+
+def _matricular(school, ciclo, nomes):
+    disciplinas = [
+        Disciplina(materia=nome, carga_horaria_prevista=20, ciclo_id=ciclo.id, school_id=school.id)
+        for nome in nomes
+    ]
+    db.session.add_all(disciplinas)
+    db.session.flush()
+    MatriculaService.matricular_pendentes(school_id=school.id)
+    db.session.commit()
+    return disciplinas
+
+
+def _registro(aluno_id, disciplina):
+    return next(h for h in HistoricoService.get_historico_disciplinas_for_aluno(aluno_id)
+                if h.disciplina_id == disciplina.id)
+
+
+class TestResumoNotas:
+
+    def test_calculo_da_media_da_disciplina(self):
+        assert HistoricoService.calcular_media_disciplina(8.0, 6.0) == 7.0
+        assert HistoricoService.calcular_media_disciplina(8.0, None) is None
+        # Recuperação só entra para o admin e com MPD abaixo da média
+        assert HistoricoService.calcular_media_disciplina(5.0, 6.0, 10.0) == 5.5
+        assert HistoricoService.calcular_media_disciplina(5.0, 6.0, 10.0, considerar_rec=True) == 7.0
+        assert HistoricoService.calcular_media_disciplina(8.0, 8.0, 10.0, considerar_rec=True) == 8.0
+
+    def test_avaliar_aluno_atualiza_o_resumo(self, test_app, setup_school_with_users):
+        school, _, alunos, ciclo = setup_school_with_users
+        direito, tiro = _matricular(school, ciclo, ['Direito', 'Tiro'])
+        aluno_id = alunos[0].id
+
+        resumo = HistoricoService.get_resumo_aluno(aluno_id)
+        assert (resumo.media_final, resumo.disciplinas_avaliadas, resumo.disciplinas_total) == (None, 0, 2)
+        assert resumo.status == 'cursando'
+
+        HistoricoService.avaliar_aluno(_registro(aluno_id, direito).id, {'nota_p1': '9', 'nota_p2': '7'})
+        resumo = HistoricoService.get_resumo_aluno(aluno_id)
+        assert (resumo.media_final, resumo.disciplinas_avaliadas, resumo.status) == (8.0, 1, 'cursando')
+
+        HistoricoService.avaliar_aluno(_registro(aluno_id, tiro).id, {'nota_p1': '5', 'nota_p2': '5'})
+        resumo = HistoricoService.get_resumo_aluno(aluno_id)
+        assert (resumo.media_final, resumo.disciplinas_avaliadas, resumo.status) == (6.5, 2, 'reprovado')
+
+        # O outro aluno não é afetado
+        assert HistoricoService.get_resumo_aluno(alunos[1].id).disciplinas_avaliadas == 0
+
+    def test_resumo_acompanha_matriculas_e_exclusoes(self, test_app, setup_school_with_users):
+        school, _, alunos, ciclo = setup_school_with_users
+        direito, = _matricular(school, ciclo, ['Direito'])
+        aluno_id = alunos[0].id
+        HistoricoService.avaliar_aluno(_registro(aluno_id, direito).id, {'nota_p1': '8', 'nota_p2': '8'})
+        assert HistoricoService.get_resumo_aluno(aluno_id).status == 'aprovado'
+
+        # Uma nova disciplina volta o aluno para "cursando"
+        success, _ = DisciplinaService.create_disciplina(
+            {'materia': 'Tiro', 'carga_horaria_prevista': 10, 'ciclo_id': ciclo.id}, school.id
+        )
+        assert success
+        resumo = HistoricoService.get_resumo_aluno(aluno_id)
+        assert (resumo.disciplinas_total, resumo.status) == (2, 'cursando')
+
+        tiro_id = db.session.scalar(db.select(Disciplina.id).filter_by(materia='Tiro'))
+        DisciplinaService.delete_disciplina(tiro_id)
+        resumo = HistoricoService.get_resumo_aluno(aluno_id)
+        assert (resumo.disciplinas_total, resumo.media_final, resumo.status) == (1, 8.0, 'aprovado')
+
+        resumos = HistoricoService.get_resumos([a.id for a in alunos])
+        assert set(resumos) == {a.id for a in alunos}
+
+
+class TestLancamentoEmLote:
+
+    def _planilha(self, setup_school_with_users):
+        school, admin, alunos, ciclo = setup_school_with_users
+        direito, = _matricular(school, ciclo, ['Direito'])
+        turma_id = alunos[0].turma_id
+        registros = HistoricoService.get_planilha_notas(turma_id, direito.id)
+        return turma_id, direito.id, admin, registros
+
+    def test_salva_a_turma_inteira_em_uma_transacao(self, test_app, setup_school_with_users):
+        turma_id, disciplina_id, _, registros = self._planilha(setup_school_with_users)
+        linhas = [
+            {'historico_id': registros[0].id, 'nota_p1': '6', 'nota_p2': '5', 'nota_rec': '10'},
+            {'historico_id': registros[1].id, 'nota_p1': '8,5', 'nota_p2': '9.5'},
+        ]
+
+        success, _, erros = HistoricoService.lancar_notas_turma(turma_id, disciplina_id, linhas, from_admin=True)
+        assert success and erros == []
+        notas = {r.id: r.nota for r in HistoricoService.get_planilha_notas(turma_id, disciplina_id)}
+        assert notas == {registros[0].id: 7.0, registros[1].id: 9.0}
+        assert HistoricoService.get_resumo_aluno(registros[1].aluno_id).status == 'aprovado'
+
+    def test_erros_por_linha_e_nada_gravado(self, test_app, setup_school_with_users):
+        turma_id, disciplina_id, _, registros = self._planilha(setup_school_with_users)
+        linhas = [
+            {'historico_id': registros[0].id, 'nota_p1': '8', 'nota_p2': '8'},
+            {'historico_id': registros[1].id, 'nota_p1': 'dez', 'nota_p2': '8'},
+            {'historico_id': registros[1].id, 'nota_p1': '11', 'nota_p2': '8'},
+            {'historico_id': 9999, 'nota_p1': '8', 'nota_p2': '8'},
+        ]
+
+        success, _, erros = HistoricoService.lancar_notas_turma(turma_id, disciplina_id, linhas)
+        assert not success
+        assert [erro['linha'] for erro in erros] == [2, 3, 4]
+        assert 'repetida' in erros[1]['mensagem']
+        assert all(r.nota is None for r in HistoricoService.get_planilha_notas(turma_id, disciplina_id))
+
+    def test_instrutor_nao_altera_recuperacao(self, test_app, setup_school_with_users):
+        turma_id, disciplina_id, _, registros = self._planilha(setup_school_with_users)
+        registros[0].nota_rec = 9.0
+        db.session.commit()
+
+        linhas = [{'historico_id': registros[0].id, 'nota_p1': '6', 'nota_p2': '5', 'nota_rec': '0'}]
+        success, _, _ = HistoricoService.lancar_notas_turma(turma_id, disciplina_id, linhas, from_admin=False)
+        assert success
+        registro = HistoricoService.get_planilha_notas(turma_id, disciplina_id)[0]
+        assert (registro.nota_rec, registro.nota) == (9.0, 5.5)
+
+    def test_planilha_por_formulario_e_json(self, test_client, test_app, setup_school_with_users):
+        turma_id, disciplina_id, admin, registros = self._planilha(setup_school_with_users)
+        ids = [r.id for r in registros]
+        admin.username = 'admin_planilha'
+        admin.set_password('senha123')
+        db.session.commit()
+        test_client.post('/login', data={'username': 'admin_planilha', 'password': 'senha123'})
+        url = f'/historico/turma/{turma_id}/disciplina/{disciplina_id}/notas'
+
+        assert test_client.get(url).status_code == 200
+        form = {'historico_id': ids, f'nota_p1-{ids[0]}': '7', f'nota_p2-{ids[0]}': '9',
+                f'nota_p1-{ids[1]}': '', f'nota_p2-{ids[1]}': ''}
+        assert test_client.post(url, data=form).status_code == 302
+        assert db.session.get(HistoricoDisciplina, ids[0]).nota == 8.0
+
+        resposta = test_client.post(url, json={'notas': [{'historico_id': ids[1], 'nota_p1': 'x'}]})
+        assert resposta.status_code == 400
+        assert resposta.get_json()['erros'][0]['historico_id'] == ids[1]
+        # Formulário com erro volta para a planilha com os valores digitados
+        resposta = test_client.post(url, data={'historico_id': [ids[0]], f'nota_p1-{ids[0]}': '12'})
+        assert resposta.status_code == 200 and b'value="12"' in resposta.data
+
+    def test_instrutor_sem_vinculo_nao_lanca_notas(self, test_client, test_app, setup_school_with_users):
+        turma_id, disciplina_id, _, registros = self._planilha(setup_school_with_users)
+        school_id = db.session.get(Disciplina, disciplina_id).school_id
+        usuarios = {}
+        for nome in ('vinculado', 'alheio'):
+            user = User(matricula=f'inst_{nome}', username=f'inst_{nome}', role='instrutor', is_active=True)
+            user.set_password('senha123')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add_all([Instrutor(user_id=user.id, telefone=None),
+                                UserSchool(user_id=user.id, school_id=school_id, role='instrutor')])
+            usuarios[nome] = user
+        db.session.flush()
+        db.session.add(DisciplinaTurma(turma_id=turma_id, disciplina_id=disciplina_id,
+                                       instrutor_id_2=usuarios['vinculado'].instrutor_profile.id))
+        db.session.commit()
+        url = f'/historico/turma/{turma_id}/disciplina/{disciplina_id}/notas'
+        ids = [r.id for r in registros]
+        form = {'historico_id': [ids[0]], f'nota_p1-{ids[0]}': '7', f'nota_p2-{ids[0]}': '9'}
+
+        # Instrutor da escola sem vínculo com a disciplina na turma: só consulta
+        test_client.post('/login', data={'username': 'inst_alheio', 'password': 'senha123'})
+        resposta = test_client.get(url)
+        assert resposta.status_code == 200 and b'Salvar Notas' not in resposta.data
+        assert test_client.post(url, data=form).status_code == 302
+        resposta = test_client.post(url, json={'notas': [{'historico_id': ids[0], 'nota_p1': '7', 'nota_p2': '9'}]})
+        assert resposta.status_code == 403
+        db.session.expire_all()
+        assert all(r.nota_p1 is None for r in HistoricoService.get_planilha_notas(turma_id, disciplina_id))
+
+        test_client.get('/logout')
+        test_client.post('/login', data={'username': 'inst_vinculado', 'password': 'senha123'})
+        assert test_client.post(url, data=form).status_code == 302
+        db.session.expire_all()
+        assert db.session.get(HistoricoDisciplina, ids[0]).nota == 8.0
@@ -0,0 +1,435 @@
+# tests/test_horario_service.py
+
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import select
+from sqlalchemy.exc import StatementError
+
+from backend.services.horario_service import HorarioService
+from backend.services.turma_service import TurmaService
+from backend.services.ocupacao_horario import OcupacaoSemana, mascara_periodos
+from backend.models.database import db
+from backend.models.user import User
+from backend.models.instrutor import Instrutor
+from backend.models.disciplina import Disciplina
+from backend.models.school import School
+from backend.models.semana import Semana
+from backend.models.horario import Horario
+from backend.models.ciclo import Ciclo
+from backend.models.turma import Turma
+
+# Turmas criadas pelo fixture com ids fixos (o banco é recriado a cada teste)
+TURMA_ID, OUTRA_TURMA_ID = 1, 2
+
+
+@pytest.fixture
+def setup_grade(db_session):
+    """Cria escola, ciclo, semana, um instrutor, um admin e disciplinas com aulas agendadas."""
+    school = School(nome="Escola Grade")
+    ciclo = Ciclo(nome='Ciclo Grade')
+    db_session.add_all([school, ciclo])
+    db_session.commit()
+
+    semana = Semana(nome='Semana 1', data_inicio=date(2025, 3, 3), data_fim=date(2025, 3, 3) + timedelta(days=6), ciclo_id=ciclo.id)
+    admin = User(matricula='adm_grade', username='adm_grade', role='admin_escola', is_active=True)
+    user_instrutor = User(matricula='inst_grade', username='inst_grade', nome_de_guerra='Grade', role='instrutor', is_active=True)
+    db_session.add_all([semana, admin, user_instrutor])
+    db_session.add_all([
+        Turma(id=TURMA_ID, nome='Pel Grade', ano=2025, school_id=school.id),
+        Turma(id=OUTRA_TURMA_ID, nome='Outro Pel', ano=2025, school_id=school.id),
+    ])
+    db_session.commit()
+
+    instrutor = Instrutor(user_id=user_instrutor.id, telefone=None)
+    db_session.add(instrutor)
+    db_session.commit()
+
+    def criar_disciplinas(quantidade, inicio=0):
+        disciplinas = []
+        for i in range(inicio, inicio + quantidade):
+            disciplina = Disciplina(materia=f'Matéria {i:02d}', carga_horaria_prevista=40, school_id=school.id, ciclo_id=ciclo.id)
+            db_session.add(disciplina)
+            disciplinas.append(disciplina)
+        db_session.commit()
+        for i, disciplina in enumerate(disciplinas):
+            db_session.add(Horario(
+                turma_id=TURMA_ID, dia_semana='segunda', periodo=i + 1, duracao=2,
+                semana_id=semana.id, disciplina_id=disciplina.id, instrutor_id=instrutor.id, status='confirmado'
+            ))
+        db_session.commit()
+        return disciplinas
+
+    return admin, instrutor, semana, ciclo, criar_disciplinas
+
+
+class TestHorasRestantes:
+    """Testes do cálculo agrupado de horas restantes."""
+
+    def test_horas_agendadas_agrupadas(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        d1, d2, d3 = criar_disciplinas(3)
+        extra = Horario(turma_id=TURMA_ID, dia_semana='terca', periodo=1, duracao=3,
+                        semana_id=semana.id, disciplina_id=d1.id, instrutor_id=instrutor.id)
+        outra_turma = Horario(turma_id=OUTRA_TURMA_ID, dia_semana='terca', periodo=1, duracao=5,
+                              semana_id=semana.id, disciplina_id=d1.id, instrutor_id=instrutor.id)
+        db.session.add_all([extra, outra_turma])
+        db.session.commit()
+
+        horas = HorarioService.get_horas_agendadas_por_disciplina(TURMA_ID, [d1.id, d2.id])
+        assert horas == {d1.id: 5, d2.id: 2}
+
+        horas_sem_extra = HorarioService.get_horas_agendadas_por_disciplina(TURMA_ID, [d1.id], excluir_horario_id=extra.id)
+        assert horas_sem_extra == {d1.id: 2}
+
+    def test_editor_numero_de_consultas_constante(self, test_app, setup_grade, count_queries):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        criar_disciplinas(2)
+        # Primeira chamada apenas recarrega os objetos expirados pelos commits do fixture
+        contexto = HorarioService.get_edit_grid_context(TURMA_ID, semana.id, ciclo.id, admin)
+
+        with count_queries() as poucas:
+            contexto = HorarioService.get_edit_grid_context(TURMA_ID, semana.id, ciclo.id, admin)
+        assert [d['restantes'] for d in contexto['disciplinas_disponiveis']] == [38, 38]
+
+        criar_disciplinas(20, inicio=2)
+        contexto = HorarioService.get_edit_grid_context(TURMA_ID, semana.id, ciclo.id, admin)
+        with count_queries() as muitas:
+            contexto = HorarioService.get_edit_grid_context(TURMA_ID, semana.id, ciclo.id, admin)
+        assert len(contexto['disciplinas_disponiveis']) == 22
+
+        # disciplinas do ciclo, horas agendadas (agrupadas) e instrutores; a matriz vem do cache
+        assert len(poucas) == 3
+        assert len(muitas) == 3
+
+    def test_save_aula_respeita_carga_restante(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        disciplina, = criar_disciplinas(1)
+        data = {
+            'turma_id': TURMA_ID, 'semana_id': semana.id, 'dia': 'quarta', 'periodo': 1,
+            'disciplina_id': disciplina.id, 'instrutor_id': instrutor.id,
+        }
+
+        success, message, status = HorarioService.save_aula(dict(data, duracao=39), admin)
+        assert status == 400
+        assert '38h' in message
+
+        success, message, status = HorarioService.save_aula(dict(data, duracao=38), admin)
+        assert success is True
+
+
+class TestMatrizHorarioCache:
+    """Testes do cache da matriz semanal de horários."""
+
+    def _dados_aula(self, semana, disciplina, instrutor, **kw):
+        data = {
+            'turma_id': TURMA_ID, 'semana_id': semana.id, 'dia': 'quinta', 'periodo': 4,
+            'disciplina_id': disciplina.id, 'instrutor_id': instrutor.id, 'duracao': 1,
+        }
+        data.update(kw)
+        return data
+
+    def test_matriz_reutilizada_entre_usuarios(self, test_app, setup_grade, count_queries):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        criar_disciplinas(1)
+        aluno = User(matricula='aluno_grade', username='aluno_grade', role='aluno', is_active=True)
+        db.session.add(aluno)
+        db.session.commit()
+
+        matriz_admin = HorarioService.construir_matriz_horario(TURMA_ID, semana.id, admin)
+        assert aluno.role == 'aluno'  # recarrega o usuário expirado pelo commit
+        with count_queries() as statements:
+            matriz_aluno = HorarioService.construir_matriz_horario(TURMA_ID, semana.id, aluno)
+
+        assert statements == []
+        assert matriz_admin[0][0].can_edit is True
+        assert matriz_aluno[0][0].can_edit is False
+        assert matriz_aluno[0][0].materia == 'Matéria 00'
+        assert matriz_aluno[1][0] == 'SKIP'
+        assert matriz_aluno[5][3].is_disposicao is True
+
+    def test_pendente_mascarado_e_invalidacao(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        disciplina, = criar_disciplinas(1)
+        outro_user = User(matricula='inst_outro', username='inst_outro', role='instrutor', is_active=True)
+        db.session.add(outro_user)
+        db.session.commit()
+        outro_instrutor = Instrutor(user_id=outro_user.id, telefone=None)
+        db.session.add(outro_instrutor)
+        db.session.commit()
+
+        assert HorarioService.construir_matriz_horario(TURMA_ID, semana.id, outro_user)[3][3].is_disposicao
+
+        # Instrutor agenda uma aula pendente: a matriz em cache é invalidada no commit
+        success, message, status = HorarioService.save_aula(self._dados_aula(semana, disciplina, outro_instrutor), outro_user)
+        assert success is True
+
+        celula_dono = HorarioService.construir_matriz_horario(TURMA_ID, semana.id, outro_user)[3][3]
+        celula_admin = HorarioService.construir_matriz_horario(TURMA_ID, semana.id, admin)[3][3]
+        celula_outro = HorarioService.construir_matriz_horario(TURMA_ID, semana.id, instrutor.user)[3][3]
+        assert celula_dono.status == 'pendente' and celula_dono.can_edit is True
+        assert celula_admin.materia == 'Matéria 00'
+        assert celula_outro.materia == 'Aguardando Aprovação'
+        assert celula_outro.instrutor is None
+
+        success, message = HorarioService.aprovar_horario(celula_dono.id, 'aprovar')
+        assert success is True
+        celula_outro = HorarioService.construir_matriz_horario(TURMA_ID, semana.id, instrutor.user)[3][3]
+        assert celula_outro.materia == 'Matéria 00'
+
+        success, message = HorarioService.remove_aula(celula_dono.id, admin)
+        assert success is True
+        assert HorarioService.construir_matriz_horario(TURMA_ID, semana.id, admin)[3][3].is_disposicao
+
+    def test_renomear_e_excluir_turma(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        criar_disciplinas(1)
+
+        # As aulas ficam ligadas pelo id: renomear a turma não as perde
+        success, _ = TurmaService.update_turma(TURMA_ID, {'nome': 'Pel Renomeado', 'ano': 2025})
+        assert success is True
+        assert HorarioService.construir_matriz_horario(TURMA_ID, semana.id, admin)[0][0].materia == 'Matéria 00'
+        assert db.session.scalar(db.select(Horario)).turma.nome == 'Pel Renomeado'
+
+        success, _ = TurmaService.delete_turma(TURMA_ID)
+        assert success is True
+        assert db.session.scalars(db.select(Horario).filter_by(turma_id=TURMA_ID)).all() == []
+
+
+class TestCodificacaoHorario:
+
+    def test_dia_e_status_gravados_como_codigos(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        disciplina, = criar_disciplinas(1)
+
+        gravado = db.session.execute(db.text('SELECT dia_semana, status FROM horarios')).one()
+        assert tuple(gravado) == (0, 1)
+        aula = db.session.scalars(select(Horario).where(Horario.dia_semana == 'segunda')).one()
+        assert (aula.dia_semana, aula.status) == ('segunda', 'confirmado')
+
+        aula.dia_semana = 'feriado'
+        with pytest.raises(StatementError):
+            db.session.commit()
+        db.session.rollback()
+
+    def test_save_aula_rejeita_dia_invalido(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        disciplina, = criar_disciplinas(1)
+        success, message, status = HorarioService.save_aula({
+            'turma_id': TURMA_ID, 'semana_id': semana.id, 'dia': 'terça', 'periodo': 4,
+            'disciplina_id': disciplina.id, 'instrutor_id': instrutor.id,
+        }, admin)
+        assert (success, status) == (False, 400) and 'Dia' in message
+
+
+class TestAplicarLote:
+    """Testes do lote de operações no quadro horário."""
+
+    def test_lote_cria_move_e_remove_em_uma_transacao(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        d1, d2 = criar_disciplinas(2)
+        aula_d1 = db.session.scalar(db.select(Horario).filter_by(disciplina_id=d1.id))
+        aula_d2 = db.session.scalar(db.select(Horario).filter_by(disciplina_id=d2.id))
+        operacoes = [
+            {'op': 'criar', 'dia': 'quarta', 'periodo': 1, 'disciplina_id': d1.id, 'instrutor_id': instrutor.id, 'duracao': 2},
+            {'op': 'criar', 'dia': 'quarta', 'periodo': 3, 'disciplina_id': d2.id, 'instrutor_id': instrutor.id},
+            {'op': 'mover', 'horario_id': aula_d1.id, 'dia': 'terca', 'periodo': 4},
+            {'op': 'atualizar', 'horario_id': aula_d1.id, 'observacao': 'Aula externa'},
+            {'op': 'remover', 'horario_id': aula_d2.id},
+        ]
+
+        success, message, status, dados = HorarioService.aplicar_lote(TURMA_ID, semana.id, operacoes, admin)
+        assert success is True and status == 200
+
+        aulas = db.session.scalars(db.select(Horario).filter_by(turma_id=TURMA_ID).order_by(Horario.id)).all()
+        posicoes = {(a.dia_semana, a.periodo, a.duracao, a.observacao) for a in aulas}
+        assert posicoes == {('terca', 4, 2, 'Aula externa'), ('quarta', 1, 2, None), ('quarta', 3, 1, None)}
+        assert all(a.status == 'confirmado' for a in aulas)
+        assert set(dados['criados']) == {0, 1}
+
+        # Células de segunda (origem), terça e quarta, com a matriz já atualizada
+        assert {c['dia'] for c in dados['celulas']} == {'segunda', 'terca', 'quarta'}
+        celulas = {(c['dia'], c['periodo']): c['aula'] for c in dados['celulas']}
+        assert celulas[('terca', 4)].observacao == 'Aula externa'
+        assert celulas[('terca', 5)] == 'SKIP'
+        assert celulas[('segunda', 1)].is_disposicao is True
+        assert dados['restantes'] == {d1.id: 36, d2.id: 39}
+
+    def test_conflito_invalida_o_lote_inteiro(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        d1, = criar_disciplinas(1)
+        operacoes = [
+            {'op': 'criar', 'dia': 'quarta', 'periodo': 1, 'disciplina_id': d1.id, 'instrutor_id': instrutor.id, 'duracao': 3},
+            {'op': 'criar', 'dia': 'quarta', 'periodo': 2, 'disciplina_id': d1.id, 'instrutor_id': instrutor.id},
+            {'op': 'criar', 'dia': 'feriado', 'periodo': 1, 'disciplina_id': d1.id, 'instrutor_id': instrutor.id},
+        ]
+
+        success, message, status, dados = HorarioService.aplicar_lote(TURMA_ID, semana.id, operacoes, admin)
+        assert success is False and status == 400
+        assert [erro['indice'] for erro in dados['erros']] == [2]
+
+        success, message, status, dados = HorarioService.aplicar_lote(TURMA_ID, semana.id, operacoes[:2], admin)
+        assert [erro['indice'] for erro in dados['erros']] == [1]
+        assert 'Já existe uma aula' in dados['erros'][0]['mensagem']
+        assert db.session.scalar(db.select(db.func.count(Horario.id))) == 1
+
+    def test_carga_horaria_validada_no_lote(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        d1, = criar_disciplinas(1)
+        operacoes = [
+            {'op': 'criar', 'dia': dia, 'periodo': 1, 'disciplina_id': d1.id, 'instrutor_id': instrutor.id, 'duracao': 12}
+            for dia in ['terca', 'quarta', 'quinta', 'sexta']
+        ]
+        success, message, status, dados = HorarioService.aplicar_lote(TURMA_ID, semana.id, operacoes, admin)
+        assert not success
+        assert 'excedida em 10h' in dados['erros'][0]['mensagem']
+
+    def test_instrutor_so_altera_as_proprias_aulas(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        # Aulas de segunda já se sobrepõem no fixture e não bloqueiam o lote
+        d1, d2 = criar_disciplinas(2)
+        outro_user = User(matricula='inst_lote', username='inst_lote', role='instrutor', is_active=True)
+        db.session.add(outro_user)
+        db.session.commit()
+        db.session.add(Instrutor(user_id=outro_user.id, telefone=None))
+        db.session.commit()
+        aula_alheia = db.session.scalar(db.select(Horario).filter_by(disciplina_id=d1.id))
+
+        operacoes = [{'op': 'remover', 'horario_id': aula_alheia.id}]
+        success, _, _, dados = HorarioService.aplicar_lote(TURMA_ID, semana.id, operacoes, outro_user)
+        assert not success and 'permissão' in dados['erros'][0]['mensagem']
+
+        operacoes = [{'op': 'criar', 'dia': 'sexta', 'periodo': 2, 'disciplina_id': d2.id, 'instrutor_id': instrutor.id}]
+        success, _, _, dados = HorarioService.aplicar_lote(TURMA_ID, semana.id, operacoes, outro_user)
+        assert success
+        nova = db.session.get(Horario, dados['criados'][0])
+        assert nova.status == 'pendente' and nova.instrutor_id == outro_user.instrutor_profile.id
+
+    def test_consultas_nao_crescem_com_o_lote(self, test_app, setup_grade, count_queries):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        disciplinas = criar_disciplinas(10)
+        ids = (semana.id, instrutor.id, [d.id for d in disciplinas])
+        admin.role
+
+        def selects_do_lote(dia, quantidade):
+            operacoes = [
+                {'op': 'criar', 'dia': dia, 'periodo': i + 1, 'disciplina_id': ids[2][i], 'instrutor_id': ids[1]}
+                for i in range(quantidade)
+            ]
+            with count_queries() as statements:
+                success, *_ = HorarioService.aplicar_lote(TURMA_ID, ids[0], operacoes, admin)
+            assert success
+            admin.role
+            return [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+
+        # O primeiro lote encontra a semana ainda na sessão; os seguintes partem do mesmo estado
+        selects_do_lote('terca', 1)
+        assert len(selects_do_lote('quarta', 1)) == len(selects_do_lote('quinta', 10))
+
+
+class TestOcupacaoSemana:
+    """Testes do índice de ocupação em bitsets."""
+
+    def _outro_instrutor(self):
+        user = User(matricula='inst_ocup', username='inst_ocup', role='instrutor', is_active=True)
+        db.session.add(user)
+        db.session.commit()
+        instrutor = Instrutor(user_id=user.id, telefone=None)
+        db.session.add(instrutor)
+        db.session.commit()
+        return instrutor
+
+    def test_mascara_e_sobreposicao_de_aulas_longas(self, test_app, setup_grade, count_queries):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        assert mascara_periodos(2, 3) == 0b1110
+        semana_id = semana.id
+
+        with count_queries() as statements:
+            ocupacao = OcupacaoSemana.carregar(semana_id)
+        assert len(statements) == 1
+
+        ocupacao.adicionar(1, TURMA_ID, 10, 'terca', 2, 3)
+        # Aula de 3 períodos a partir do 2º colide com a que começa no 3º
+        assert ocupacao.conflitos(TURMA_ID, 11, 'terca', 3, 1)['turma'] == [1]
+        assert ocupacao.conflitos(OUTRA_TURMA_ID, 10, 'terca', 4, 2)['instrutor'] == [1]
+        assert ocupacao.esta_livre(TURMA_ID, 10, 'terca', 5, 2)
+        assert ocupacao.esta_livre(TURMA_ID, 10, 'terca', 2, 3, ignorar=1)
+
+        ocupacao.adicionar(2, TURMA_ID, 11, 'terca', 3, 1)
+        ocupacao.remover(1)
+        assert ocupacao.esta_livre(TURMA_ID, 10, 'terca', 2, 1)
+        assert not ocupacao.esta_livre(TURMA_ID, 10, 'terca', 2, 2)
+
+    def test_save_aula_bloqueia_sobreposicao_e_instrutor_ocupado(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        disciplina, = criar_disciplinas(1)
+        outro = self._outro_instrutor()
+        base = {'semana_id': semana.id, 'dia': 'terca', 'disciplina_id': disciplina.id}
+
+        assert HorarioService.save_aula(dict(base, turma_id=TURMA_ID, periodo=2, duracao=3, instrutor_id=instrutor.id), admin)[0]
+        success, message, status = HorarioService.save_aula(
+            dict(base, turma_id=TURMA_ID, periodo=3, duracao=1, instrutor_id=outro.id), admin)
+        assert status == 409 and 'Já existe' in message
+
+        success, message, status = HorarioService.save_aula(
+            dict(base, turma_id=OUTRA_TURMA_ID, periodo=4, duracao=1, instrutor_id=instrutor.id), admin)
+        assert status == 409 and 'instrutor' in message
+
+        # Editar a própria aula não conflita com ela mesma
+        aula = db.session.scalar(db.select(Horario).filter_by(dia_semana='terca'))
+        success, message, status = HorarioService.save_aula(
+            dict(base, turma_id=TURMA_ID, periodo=3, duracao=3, instrutor_id=instrutor.id, horario_id=aula.id), admin)
+        assert success is True
+
+    def test_lote_respeita_agenda_do_instrutor_em_outra_turma(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        disciplina, = criar_disciplinas(1)
+        operacoes = [{'op': 'criar', 'dia': 'segunda', 'periodo': 1, 'disciplina_id': disciplina.id,
+                      'instrutor_id': instrutor.id}]
+        success, _, _, dados = HorarioService.aplicar_lote(OUTRA_TURMA_ID, semana.id, operacoes, admin)
+        assert not success and 'instrutor' in dados['erros'][0]['mensagem']
+
+    def test_relatorio_e_aprovacao(self, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        # O fixture agenda aulas de 2 períodos começando em períodos seguidos
+        d1, d2 = criar_disciplinas(2)
+        relatorio = HorarioService.get_conflitos_semana(semana.id)
+        assert {(r['tipo'], r['dia'], tuple(r['periodos'])) for r in relatorio} == {
+            ('turma', 'segunda', (2,)), ('instrutor', 'segunda', (2,))
+        }
+
+        outro = self._outro_instrutor()
+        pendente = Horario(turma_id=TURMA_ID, dia_semana='segunda', periodo=3, duracao=1, semana_id=semana.id,
+                           disciplina_id=d1.id, instrutor_id=outro.id, status='pendente')
+        db.session.add(pendente)
+        db.session.commit()
+
+        aulas_pendentes = HorarioService.get_aulas_pendentes()
+        assert list(HorarioService.get_conflitos_pendentes(aulas_pendentes)) == [pendente.id]
+        success, message = HorarioService.aprovar_horario(pendente.id, 'aprovar')
+        assert success is False and 'Já existe' in message
+        assert db.session.get(Horario, pendente.id).status == 'pendente'
+
+
+class TestAplicarLoteController:
+
+    def test_endpoint_devolve_celulas_renderizadas(self, test_client, test_app, setup_grade):
+        admin, instrutor, semana, ciclo, criar_disciplinas = setup_grade
+        d1, = criar_disciplinas(1)
+        admin.set_password('senha123')
+        db.session.commit()
+        payload = {'turma_id': TURMA_ID, 'semana_id': semana.id, 'operacoes': [
+            {'op': 'criar', 'dia': 'quinta', 'periodo': 2, 'disciplina_id': d1.id, 'instrutor_id': instrutor.id, 'duracao': 2},
+        ]}
+
+        test_client.post('/login', data={'username': 'adm_grade', 'password': 'senha123'})
+        editor = test_client.get(f'/horario/editar/{TURMA_ID}/{semana.id}/{ciclo.id}')
+        assert editor.status_code == 200 and b'Pel Grade' in editor.data
+        resposta = test_client.post('/horario/lote', json=payload)
+        assert resposta.status_code == 200
+        celulas = {c['periodo']: c for c in resposta.get_json()['celulas']}
+        assert 'Matéria 00' in celulas[2]['html'] and 'rowspan="2"' in celulas[2]['html']
+        assert celulas[3]['html'].strip() == '' and celulas[3]['aula'] == 'SKIP'
+        assert celulas[2]['aula']['materia'] == 'Matéria 00' and 'instrutor_id' not in celulas[2]['aula']
+
+        resposta = test_client.post('/horario/lote', json=dict(payload, operacoes=[]))
+        assert resposta.status_code == 400
@@ -0,0 +1,45 @@
+# tests/test_identity_service.py
+
+from flask_login import login_user, logout_user
+
+from backend.models.database import db
+from backend.services.identity_service import IdentityService, current_identity
+
+
+class TestIdentityService:
+
+    def test_load_user_carrega_perfis_em_uma_consulta(self, test_app, setup_school_with_users, count_queries):
+        _, _, alunos, _ = setup_school_with_users
+        user_id = alunos[0].user_id
+        db.session.expunge_all()
+
+        with count_queries() as statements:
+            user = IdentityService.load_user(str(user_id))
+            turma_nome = user.aluno_profile.turma.nome
+            school_ids = [us.school_id for us in user.user_schools]
+            assert user.instrutor_profile is None
+        assert len(statements) == 1
+        assert turma_nome == '1º Pelotão Base'
+        assert len(school_ids) == 1
+
+    def test_load_user_inexistente(self, test_app):
+        assert IdentityService.load_user(9999) is None
+
+    def test_current_identity_da_requisicao(self, test_app, setup_school_with_users, count_queries):
+        school, _, alunos, _ = setup_school_with_users
+        aluno_id, user_id, school_id = alunos[0].id, alunos[0].user_id, school.id
+        user = IdentityService.load_user(user_id)
+
+        with test_app.test_request_context():
+            assert not current_identity.is_authenticated
+            login_user(user)
+            with count_queries() as statements:
+                assert current_identity.user_id == user_id
+                assert current_identity.role == 'aluno'
+                assert current_identity.aluno_id == aluno_id
+                assert current_identity.turma_nome == '1º Pelotão Base'
+                assert current_identity.school_id == school_id
+                assert current_identity.instrutor_id is None
+            assert statements == []
+            logout_user()
+            assert current_identity.user_id is None
@@ -0,0 +1,78 @@
+# tests/test_indices.py
+
+from datetime import date
+
+import pytest
+from sqlalchemy import select, func, or_
+
+from backend.models.database import db
+from backend.models.horario import Horario
+from backend.models.horas_instrutor_semana import HorasInstrutorSemana
+from backend.models.historico_disciplina import HistoricoDisciplina
+from backend.models.resposta import Resposta
+from backend.models.disciplina_turma import DisciplinaTurma
+from backend.models.semana import Semana
+from backend.models.user_school import UserSchool
+
+HOJE = date(2025, 3, 10)
+
+# Consultas equivalentes às dos serviços nos caminhos mais acessados
+CONSULTAS_QUENTES = {
+    'matriz_horario': select(Horario).where(Horario.turma_id == 1, Horario.semana_id == 1),
+    'conflito_slot': select(Horario).where(
+        Horario.turma_id == 1, Horario.semana_id == 1, Horario.dia_semana == 'segunda', Horario.periodo == 1
+    ),
+    'horas_agendadas': select(Horario.disciplina_id, func.sum(Horario.duracao))
+        .where(Horario.turma_id == 1, Horario.disciplina_id.in_([1, 2, 3]))
+        .group_by(Horario.disciplina_id),
+    'aulas_pendentes': select(Horario).where(Horario.status == 'pendente').order_by(Horario.id.desc()),
+    'relatorio_instrutor': select(Horario.disciplina_id, func.sum(Horario.duracao))
+        .where(Horario.instrutor_id == 1, Horario.semana_id.in_([1, 2])),
+    'horas_periodo': select(HorasInstrutorSemana.instrutor_id, HorasInstrutorSemana.horas)
+        .join(Semana, Semana.id == HorasInstrutorSemana.semana_id)
+        .where(Semana.data_inicio <= HOJE, Semana.data_fim >= HOJE),
+    'horas_acumuladas_instrutor': select(HorasInstrutorSemana.semana_id, HorasInstrutorSemana.horas)
+        .where(HorasInstrutorSemana.instrutor_id == 1, HorasInstrutorSemana.disciplina_id == 1),
+    'historico_aluno': select(HistoricoDisciplina).where(HistoricoDisciplina.aluno_id == 1),
+    'historico_disciplina': select(HistoricoDisciplina).where(HistoricoDisciplina.disciplina_id == 1),
+    'respostas_participante': select(Resposta).where(Resposta.questionario_id == 1, Resposta.user_id == 1),
+    'resultado_questionario': select(Resposta.pergunta_id, Resposta.opcao_resposta_id, func.count(Resposta.id))
+        .where(Resposta.questionario_id == 1)
+        .group_by(Resposta.pergunta_id, Resposta.opcao_resposta_id),
+    'vinculos_turma': select(DisciplinaTurma).where(DisciplinaTurma.turma_id == 1),
+    'vinculos_instrutor': select(DisciplinaTurma).where(
+        or_(DisciplinaTurma.instrutor_id_1 == 1, DisciplinaTurma.instrutor_id_2 == 1)
+    ),
+    'semana_atual': select(Semana).where(Semana.ciclo_id == 1, Semana.data_inicio <= HOJE, Semana.data_fim >= HOJE),
+    'semanas_periodo': select(Semana.id).where(Semana.data_inicio <= HOJE, Semana.data_fim >= HOJE),
+    'escolas_usuario': select(UserSchool).where(UserSchool.user_id == 1),
+    'usuarios_escola': select(UserSchool).where(UserSchool.school_id == 1),
+}
+
+
+def _plano(stmt):
+    compiled = stmt.compile(db.engine, compile_kwargs={'render_postcompile': True})
+    params = tuple(compiled.params[nome] for nome in compiled.positiontup)
+    with db.engine.connect() as conn:
+        linhas = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + compiled.string, params).all()
+    return [linha[-1] for linha in linhas]
+
+
+@pytest.mark.parametrize('nome', sorted(CONSULTAS_QUENTES))
+def test_consulta_quente_usa_indice(test_app, nome):
+    """Falha se alguma consulta dos caminhos quentes fizer varredura completa da tabela."""
+    plano = _plano(CONSULTAS_QUENTES[nome])
+    varreduras = [
+        passo for passo in plano
+        if passo.startswith('SCAN') and 'INDEX' not in passo and 'SUBQUERY' not in passo
+    ]
+    assert not varreduras, f"{nome}: {plano}"
+
+
+def test_ocupacao_da_turma_coberta_pelo_indice(test_app):
+    """Dia, período e duração da turma na semana saem só do índice, sem ler a tabela."""
+    plano = _plano(
+        select(Horario.dia_semana, Horario.periodo, Horario.duracao)
+        .where(Horario.turma_id == 1, Horario.semana_id == 1)
+    )
+    assert any('COVERING INDEX ix_horarios_turma_semana' in passo for passo in plano), plano
@@ -0,0 +1,114 @@
+# tests/test_matricula_service.py
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from backend.models.database import db
+from backend.models.user import User
+from backend.models.aluno import Aluno
+from backend.models.disciplina import Disciplina
+from backend.models.historico_disciplina import HistoricoDisciplina
+from backend.models.school import School
+from backend.models.user_school import UserSchool
+from backend.services.aluno_service import AlunoService
+from backend.services.disciplina_service import DisciplinaService
+from backend.services.matricula_service import MatriculaService
+
+
+def _total_matriculas(**filtros):
+    stmt = select(func.count(HistoricoDisciplina.id)).filter_by(**filtros)
+    return db.session.scalar(stmt)
+
+
+def _criar_disciplinas(school, ciclo, nomes):
+    disciplinas = [
+        Disciplina(materia=nome, carga_horaria_prevista=20, ciclo_id=ciclo.id, school_id=school.id)
+        for nome in nomes
+    ]
+    db.session.add_all(disciplinas)
+    db.session.commit()
+    return disciplinas
+
+
+class TestMatriculaService:
+
+    def test_preenche_lacunas_e_e_idempotente(self, test_app, setup_school_with_users):
+        school, _, alunos, ciclo = setup_school_with_users
+        disciplinas = _criar_disciplinas(school, ciclo, ['Direito', 'Tiro'])
+        # Uma matrícula já existente não pode ser duplicada
+        db.session.add(HistoricoDisciplina(aluno_id=alunos[0].id, disciplina_id=disciplinas[0].id, nota=8.0))
+        db.session.commit()
+
+        assert MatriculaService.matricular_pendentes(school_id=school.id) == 3
+        db.session.commit()
+        assert _total_matriculas() == 4
+        assert MatriculaService.matricular_pendentes(school_id=school.id) == 0
+
+    def test_nao_matricula_em_disciplinas_de_outra_escola(self, test_app, setup_school_with_users):
+        school, _, alunos, ciclo = setup_school_with_users
+        outra = School(nome='Outra Escola Matrícula')
+        db.session.add(outra)
+        db.session.commit()
+        _criar_disciplinas(outra, ciclo, ['Disciplina Alheia'])
+
+        assert MatriculaService.matricular_pendentes() == 0
+        assert MatriculaService.matricular_pendentes(aluno_ids=[]) == 0
+
+    def test_aluno_sem_turma_matriculado_pelo_vinculo(self, test_app, setup_school_with_users):
+        school, _, _, ciclo = setup_school_with_users
+        _criar_disciplinas(school, ciclo, ['Direito'])
+        user = User(matricula='sem_turma', role='aluno', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(UserSchool(user_id=user.id, school_id=school.id, role='aluno'))
+        aluno = Aluno(user_id=user.id, opm='OPM')
+        db.session.add(aluno)
+        db.session.commit()
+
+        assert MatriculaService.matricular_pendentes(aluno_ids=[aluno.id]) == 1
+
+    def test_criar_disciplina_matricula_os_alunos(self, test_app, setup_school_with_users):
+        school, _, _, ciclo = setup_school_with_users
+        success, _ = DisciplinaService.create_disciplina(
+            {'materia': 'Ordem Unida', 'carga_horaria_prevista': 30, 'ciclo_id': ciclo.id}, school.id
+        )
+        assert success
+        disciplina_id = db.session.scalar(select(Disciplina.id).filter_by(materia='Ordem Unida'))
+        assert _total_matriculas(disciplina_id=disciplina_id) == 2
+
+    def test_cadastrar_aluno_matricula_nas_disciplinas(self, test_app, setup_school_with_users):
+        school, _, alunos, ciclo = setup_school_with_users
+        _criar_disciplinas(school, ciclo, ['Direito', 'Tiro'])
+        user = User(matricula='novo_aluno', role='aluno', is_active=True)
+        db.session.add(user)
+        db.session.commit()
+
+        success, _ = AlunoService.save_aluno(user.id, {'opm': 'OPM', 'turma_id': alunos[0].turma_id})
+        assert success
+        aluno = db.session.scalar(select(Aluno).filter_by(user_id=user.id))
+        assert _total_matriculas(aluno_id=aluno.id) == 2
+
+    def test_restricao_unica_por_aluno_e_disciplina(self, test_app, setup_school_with_users):
+        school, _, alunos, ciclo = setup_school_with_users
+        disciplina = _criar_disciplinas(school, ciclo, ['Direito'])[0]
+        db.session.add_all([
+            HistoricoDisciplina(aluno_id=alunos[0].id, disciplina_id=disciplina.id),
+            HistoricoDisciplina(aluno_id=alunos[0].id, disciplina_id=disciplina.id),
+        ])
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+    def test_minhas_notas_nao_grava_no_get(self, test_client, test_app, setup_school_with_users):
+        school, _, alunos, ciclo = setup_school_with_users
+        _criar_disciplinas(school, ciclo, ['Direito'])
+        user = db.session.get(User, alunos[0].user_id)
+        user.username = 'aluno_notas'
+        user.set_password('senha123')
+        db.session.commit()
+
+        test_client.post('/login', data={'username': 'aluno_notas', 'password': 'senha123'})
+        response = test_client.get('/historico/minhas-notas')
+        assert response.status_code == 200
+        assert _total_matriculas() == 0
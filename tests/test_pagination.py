@@ -0,0 +1,133 @@
+# tests/test_pagination.py
+
+from backend.models.database import db
+from backend.models.user import User
+from backend.models.aluno import Aluno
+from backend.models.instrutor import Instrutor
+from backend.models.school import School
+from backend.models.turma import Turma
+from backend.models.user_school import UserSchool
+from backend.services.aluno_service import AlunoService
+from backend.services.instrutor_service import InstrutorService
+from backend.services.turma_service import TurmaService
+from backend.services.user_service import UserService
+from backend.services.pagination import decodificar_cursor
+
+
+def _criar_alunos(school, turma, nomes):
+    for i, nome in enumerate(nomes):
+        user = User(matricula=f'pag{i}', nome_completo=nome, role='aluno', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Aluno(user_id=user.id, opm='OPM', turma_id=turma.id))
+        db.session.add(UserSchool(user_id=user.id, school_id=school.id, role='aluno'))
+    db.session.commit()
+
+
+class TestPaginacaoKeyset:
+
+    def test_percorre_todas_as_paginas_sem_repetir(self, test_app, setup_school_with_users):
+        school, admin, _, _ = setup_school_with_users
+        turma = db.session.scalar(db.select(Turma).filter_by(school_id=school.id))
+        # Nomes repetidos e nulos exercitam o desempate pelo id
+        _criar_alunos(school, turma, ['Carlos', 'Ana', 'Bruno', 'Ana', None])
+
+        vistos, cursor, paginas = [], None, 0
+        while True:
+            pagina = AlunoService.listar_alunos(admin, cursor=cursor, por_pagina=3)
+            vistos.extend(a.id for a in pagina)
+            paginas += 1
+            if not pagina.tem_proxima:
+                break
+            cursor = pagina.proximo_cursor
+
+        assert paginas == 3
+        assert len(vistos) == len(set(vistos)) == 7
+        nomes = [db.session.get(Aluno, i).user.nome_completo or '' for i in vistos]
+        assert nomes == sorted(nomes)
+
+    def test_busca_e_filtro_por_turma_no_banco(self, test_app, setup_school_with_users):
+        school, admin, _, _ = setup_school_with_users
+        turma = db.session.scalar(db.select(Turma).filter_by(school_id=school.id))
+        _criar_alunos(school, turma, ['Fulano de Tal', 'Beltrano'])
+
+        resultado = AlunoService.listar_alunos(admin, busca='fulano')
+        assert [a.user.nome_completo for a in resultado] == ['Fulano de Tal']
+        assert len(AlunoService.listar_alunos(admin, nome_turma=turma.nome)) == 4
+        assert len(AlunoService.listar_alunos(admin, nome_turma='Turma Inexistente')) == 0
+
+    def test_usuario_sem_escola_nao_ve_alunos(self, test_app, setup_school_with_users):
+        sem_escola = User(matricula='sem_escola', role='admin_escola', is_active=True)
+        db.session.add(sem_escola)
+        db.session.commit()
+        pagina = AlunoService.listar_alunos(sem_escola)
+        assert len(pagina) == 0 and not pagina.tem_proxima
+
+    def test_listagem_nao_faz_consultas_por_linha(self, test_app, setup_school_with_users, count_queries):
+        school, admin, _, _ = setup_school_with_users
+        turma = db.session.scalar(db.select(Turma).filter_by(school_id=school.id))
+        _criar_alunos(school, turma, [f'Aluno {i}' for i in range(10)])
+        admin = db.session.get(User, admin.id)
+        admin.user_schools
+
+        with count_queries() as statements:
+            pagina = AlunoService.listar_alunos(admin, por_pagina=50)
+            linhas = [(a.user.nome_completo, a.turma.nome) for a in pagina]
+        assert len(linhas) == 12
+        # página + selectinload de users + selectinload de turmas
+        assert len(statements) == 3
+
+    def test_cursor_invalido_volta_para_a_primeira_pagina(self, test_app, setup_school_with_users):
+        _, admin, _, _ = setup_school_with_users
+        assert decodificar_cursor('lixo!!', 2) is None
+        assert len(AlunoService.listar_alunos(admin, cursor='lixo!!')) == 2
+
+    def test_instrutores_e_atribuicoes(self, test_app, setup_school_with_users):
+        school, _, _, _ = setup_school_with_users
+        for i, nome in enumerate(['Zeca', 'Amaro', 'Mauro']):
+            user = User(matricula=f'inst{i}', nome_completo=nome, role='instrutor', is_active=True)
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Instrutor(user_id=user.id))
+        db.session.commit()
+
+        primeira = InstrutorService.listar_instrutores(por_pagina=2)
+        segunda = InstrutorService.listar_instrutores(cursor=primeira.proximo_cursor, por_pagina=2)
+        assert [i.user.nome_completo for i in primeira] + [i.user.nome_completo for i in segunda] == ['Amaro', 'Mauro', 'Zeca']
+        assert not segunda.tem_proxima
+
+        atribuicoes = UserService.listar_atribuicoes(school_id=school.id)
+        assert len(atribuicoes) == 3
+        sem_escola = {u.nome_completo for u in UserService.get_usuarios_sem_escola()}
+        assert sem_escola == {'Zeca', 'Amaro', 'Mauro'}
+
+    def test_contagem_de_alunos_por_turma(self, test_app, setup_school_with_users):
+        school, _, _, _ = setup_school_with_users
+        outra = School(nome='Outra Escola Turmas')
+        db.session.add(outra)
+        db.session.flush()
+        db.session.add(Turma(nome='Turma Vazia', ano=2025, school_id=school.id))
+        db.session.add(Turma(nome='Turma Outra Escola', ano=2025, school_id=outra.id))
+        db.session.commit()
+
+        contagem = {t.nome: total for t, total in TurmaService.listar_turmas_com_contagem(school.id)}
+        assert contagem == {'1º Pelotão Base': 2, 'Turma Vazia': 0}
+        assert len(TurmaService.listar_turmas_com_contagem()) == 3
+
+
+class TestListagensControllers:
+
+    def test_paginas_de_listagem_renderizam(self, test_client, test_app):
+        with test_app.app_context():
+            school = School(nome='Escola Listagens')
+            user = User(matricula='prog_list', username='prog_list', email='prog@list.com', role='programador', is_active=True)
+            user.set_password('progpass')
+            db.session.add_all([school, user])
+            db.session.flush()
+            db.session.add(UserSchool(user_id=user.id, school_id=school.id, role='programador'))
+            db.session.commit()
+
+        test_client.post('/login', data={'username': 'prog_list', 'password': 'progpass'})
+        for url in ['/aluno/listar?q=ninguem&ordem=turma', '/instrutor/?ordem=matricula', '/turma/']:
+            response = test_client.get(url)
+            assert response.status_code == 200, url
@@ -0,0 +1,158 @@
+# tests/test_questionario_service.py
+
+import pytest
+from sqlalchemy import select
+from werkzeug.datastructures import MultiDict
+
+from backend.services.questionario_service import QuestionarioService
+from backend.models.database import db
+from backend.models.user import User
+from backend.models.questionario import Questionario
+from backend.models.pergunta import Pergunta
+from backend.models.opcao_resposta import OpcaoResposta
+from backend.models.resposta import Resposta
+
+
+@pytest.fixture
+def questionario_respondido(db_session):
+    """Cria um questionário com várias perguntas e respostas de três usuários."""
+    questionario = Questionario(titulo='Avaliação do Curso')
+    db_session.add(questionario)
+    db_session.flush()
+
+    perguntas = []
+    for i in range(5):
+        pergunta = Pergunta(texto=f'Pergunta {i}', questionario_id=questionario.id)
+        db_session.add(pergunta)
+        db_session.flush()
+        for texto in ['Sim', 'Não', 'Outro']:
+            db_session.add(OpcaoResposta(texto=texto, pergunta_id=pergunta.id, aceita_texto_livre=texto == 'Outro'))
+        perguntas.append(pergunta)
+    users = [User(matricula=f'q{i}', username=f'q{i}', role='aluno') for i in range(3)]
+    db_session.add_all(users)
+    db_session.commit()
+
+    for pergunta in perguntas:
+        sim, nao, outro = pergunta.opcoes
+        db_session.add_all([
+            Resposta(questionario_id=questionario.id, pergunta_id=pergunta.id, user_id=users[0].id, opcao_resposta_id=sim.id),
+            Resposta(questionario_id=questionario.id, pergunta_id=pergunta.id, user_id=users[1].id, opcao_resposta_id=sim.id),
+            Resposta(questionario_id=questionario.id, pergunta_id=pergunta.id, user_id=users[2].id, opcao_resposta_id=outro.id,
+                     texto_livre=f'Comentário {pergunta.texto}'),
+        ])
+    db_session.commit()
+    return questionario.id
+
+
+class TestQuestionarioService:
+    """Testes da agregação de resultados de questionários."""
+
+    def test_dados_graficos_em_consultas_agrupadas(self, test_app, questionario_respondido, count_queries):
+        with count_queries() as statements:
+            questionario = QuestionarioService.get_questionario_completo(questionario_respondido)
+            dados = QuestionarioService.get_dados_graficos(questionario)
+
+        # questionário, perguntas, opções, contagens agrupadas e textos livres
+        assert len(statements) == 5
+        assert len(dados) == 5
+        primeira = dados[questionario.perguntas[0].id]
+        assert primeira['labels'] == ['Sim', 'Não', 'Outro']
+        assert primeira['dados'] == [2, 0, 1]
+        assert primeira['outros'] == ['Comentário Pergunta 0']
+
+    def test_resultado_renderiza_textos_outro(self, test_app, test_client, questionario_respondido):
+        user = User(matricula='q_admin', username='q_admin', email='q@test.com', role='programador', is_active=True)
+        user.set_password('qpass')
+        db.session.add(user)
+        db.session.commit()
+        test_client.post('/login', data={'username': 'q_admin', 'password': 'qpass'})
+
+        response = test_client.get(f'/questionario/resultado/{questionario_respondido}')
+        assert response.status_code == 200
+        assert 'Comentário Pergunta 4' in response.get_data(as_text=True)
+
+
+class TestIngestaoRespostas:
+    """Testes da gravação em lote e da edição por diferença das respostas."""
+
+    @pytest.fixture
+    def questionario_multiplo(self, db_session):
+        questionario = Questionario(titulo='Perfil')
+        db_session.add(questionario)
+        db_session.flush()
+        unica = Pergunta(texto='Estado civil', questionario_id=questionario.id)
+        multipla = Pergunta(texto='Desafios', questionario_id=questionario.id, tipo='multipla')
+        db_session.add_all([unica, multipla])
+        db_session.flush()
+        db_session.add_all([
+            OpcaoResposta(texto='Solteiro', pergunta_id=unica.id),
+            OpcaoResposta(texto='Casado', pergunta_id=unica.id),
+            OpcaoResposta(texto='Tempo', pergunta_id=multipla.id),
+            OpcaoResposta(texto='Dinheiro', pergunta_id=multipla.id),
+            OpcaoResposta(texto='Outra área', pergunta_id=multipla.id, aceita_texto_livre=True),
+        ])
+        user = User(matricula='resp1', username='resp1', role='aluno')
+        db_session.add(user)
+        db_session.commit()
+        return QuestionarioService.get_questionario_completo(questionario.id), user.id
+
+    def _respostas(self, questionario_id, user_id):
+        return db.session.execute(
+            select(Resposta.id, Resposta.opcao_resposta_id, Resposta.texto_livre)
+            .where(Resposta.questionario_id == questionario_id, Resposta.user_id == user_id)
+            .order_by(Resposta.opcao_resposta_id)
+        ).all()
+
+    def test_registrar_em_um_insert(self, test_app, questionario_multiplo, count_queries):
+        questionario, user_id = questionario_multiplo
+        unica, multipla = questionario.perguntas
+        solteiro, casado = unica.opcoes
+        tempo, dinheiro, outra = multipla.opcoes
+        form = MultiDict([
+            (f'pergunta_{unica.id}', str(solteiro.id)),
+            (f'outro_{unica.id}', 'ignorado'),
+            (f'pergunta_{multipla.id}', str(tempo.id)),
+            (f'pergunta_{multipla.id}', str(outra.id)),
+            (f'pergunta_{multipla.id}', '99999'),  # opção de outra pergunta é ignorada
+            (f'outro_{multipla.id}', ' Escala '),
+        ])
+
+        with count_queries() as statements:
+            total = QuestionarioService.registrar_respostas(questionario, user_id, form)
+        db.session.commit()
+
+        assert total == 3
+        assert len(statements) == 1 and statements[0].startswith('INSERT')
+        respostas = self._respostas(questionario.id, user_id)
+        assert [(r.opcao_resposta_id, r.texto_livre) for r in respostas] == [
+            (solteiro.id, None), (tempo.id, None), (outra.id, 'Escala')
+        ]
+
+    def test_atualizar_aplica_apenas_diferencas(self, test_app, questionario_multiplo):
+        questionario, user_id = questionario_multiplo
+        unica, multipla = questionario.perguntas
+        solteiro, casado = unica.opcoes
+        tempo, dinheiro, outra = multipla.opcoes
+        QuestionarioService.registrar_respostas(questionario, user_id, MultiDict([
+            (f'pergunta_{unica.id}', str(solteiro.id)),
+            (f'pergunta_{multipla.id}', str(tempo.id)),
+            (f'pergunta_{multipla.id}', str(outra.id)),
+            (f'outro_{multipla.id}', 'Escala'),
+        ]))
+        db.session.commit()
+        ids_antes = {r.opcao_resposta_id: r.id for r in self._respostas(questionario.id, user_id)}
+
+        resultado = QuestionarioService.atualizar_respostas(questionario, user_id, MultiDict([
+            (f'pergunta_{unica.id}', str(casado.id)),
+            (f'pergunta_{multipla.id}', str(tempo.id)),
+            (f'pergunta_{multipla.id}', str(outra.id)),
+            (f'outro_{multipla.id}', 'Família'),
+        ]))
+        db.session.commit()
+
+        assert resultado == (1, 1, 1)
+        depois = {r.opcao_resposta_id: r for r in self._respostas(questionario.id, user_id)}
+        assert set(depois) == {casado.id, tempo.id, outra.id}
+        assert depois[tempo.id].id == ids_antes[tempo.id]
+        assert depois[outra.id].id == ids_antes[outra.id]
+        assert depois[outra.id].texto_livre == 'Família'
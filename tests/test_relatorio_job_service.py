@@ -0,0 +1,247 @@
+# tests/test_relatorio_job_service.py
+
+import time
+import pytest
+import requests
+
+from backend.services import relatorio_job_service
+from backend.services.relatorio_job_service import RelatorioJobService
+from backend.models.database import db
+from backend.models.user import User
+
+
+class _FakeResponse:
+    def __init__(self, status_code, content=b''):
+        self.status_code = status_code
+        self.content = content
+
+
+@pytest.fixture
+def pdf_api(test_app, monkeypatch):
+    """Substitui a chamada HTTP ao WeasyPrint por respostas programadas."""
+    test_app.config['REPORT_JOB_RETRY_BACKOFF'] = 0
+    respostas = []
+    chamadas = []
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        chamadas.append(json['html'])
+        resposta = respostas.pop(0) if respostas else _FakeResponse(200, b'%PDF-ok')
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+
+    monkeypatch.setattr(relatorio_job_service.requests, 'post', fake_post)
+    return respostas, chamadas
+
+
+def _aguardar(job_id, user_id, timeout=5):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        job = RelatorioJobService.get_job(job_id, user_id)
+        if job['status'] in ('concluido', 'erro'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('Job não terminou a tempo')
+
+
+class TestRelatorioJobService:
+    """Testes da fila de geração de relatórios (backend em memória)."""
+
+    def test_job_concluido_e_download(self, test_app, pdf_api):
+        respostas, chamadas = pdf_api
+        job_id = RelatorioJobService.submit('<h1>Relatório</h1>', user_id=1)
+
+        job = _aguardar(job_id, 1)
+        assert job['status'] == 'concluido'
+        assert chamadas == ['<h1>Relatório</h1>']
+        _, pdf = RelatorioJobService.get_result(job_id, 1)
+        assert pdf == b'%PDF-ok'
+
+        # Outro usuário não enxerga o job
+        assert RelatorioJobService.get_job(job_id, 2) is None
+
+    def test_falha_transitoria_e_repetida(self, test_app, pdf_api):
+        respostas, chamadas = pdf_api
+        respostas.extend([requests.exceptions.ConnectionError('offline'), _FakeResponse(503)])
+
+        job_id = RelatorioJobService.submit('<p>x</p>', user_id=1)
+        job = _aguardar(job_id, 1)
+
+        assert job['status'] == 'concluido'
+        assert job['attempts'] == 3
+
+    def test_erro_definitivo_nao_repete(self, test_app, pdf_api):
+        respostas, chamadas = pdf_api
+        respostas.append(_FakeResponse(400))
+
+        job_id = RelatorioJobService.submit('<p>x</p>', user_id=1)
+        job = _aguardar(job_id, 1)
+
+        assert job['status'] == 'erro'
+        assert len(chamadas) == 1
+        assert RelatorioJobService.get_result(job_id, 1)[1] is None
+
+    def test_resultado_expira(self, test_app, pdf_api):
+        test_app.config['REPORT_JOB_RETENTION'] = 0
+        job_id = RelatorioJobService.submit('<p>x</p>', user_id=1)
+        time.sleep(0.05)
+        assert RelatorioJobService.get_job(job_id, 1) is None
+
+    def test_download_pelo_controller(self, test_app, test_client, pdf_api):
+        user = User(matricula='rel_admin', username='rel_admin', email='rel@test.com', role='programador', is_active=True)
+        user.set_password('relpass')
+        db.session.add(user)
+        db.session.commit()
+        test_client.post('/login', data={'username': 'rel_admin', 'password': 'relpass'})
+
+        response = test_client.post('/relatorios/gerar?tipo=mensal', data={
+            'data_inicio': '2025-03-01', 'data_fim': '2025-03-31', 'action': 'download'
+        })
+        assert response.status_code == 302
+        job_url = response.headers['Location']
+        job_id = job_url.rstrip('/').split('/')[-1]
+
+        _aguardar(job_id, user.id)
+        status = test_client.get(f'/relatorios/jobs/{job_id}/status').get_json()
+        assert status['status'] == 'concluido'
+
+        download = test_client.get(status['download_url'])
+        assert download.mimetype == 'application/pdf'
+        assert download.data == b'%PDF-ok'
+
+    def test_html_expirado_marca_erro(self, test_app, pdf_api):
+        respostas, chamadas = pdf_api
+        store = RelatorioJobService._store()
+        job = {'id': 'sem-html', 'user_id': 1, 'status': 'pendente', 'attempts': 0, 'filename': 'r.pdf'}
+        store.create(job, '<p>x</p>', 3600)
+        store._html.pop('sem-html')
+
+        assert RelatorioJobService.process('sem-html') is False
+        job = RelatorioJobService.get_job('sem-html', 1)
+        assert job['status'] == 'erro' and 'expirou' in job['error']
+        assert chamadas == []
+
+    def test_sem_redis_em_producao_recusa_memoria(self, test_app, pdf_api, monkeypatch):
+        monkeypatch.setattr(test_app, 'testing', False)
+        test_app.config['REDIS_URL'] = None
+        test_app.config['REPORT_JOB_MEMORY_STORE'] = False
+        with pytest.raises(RuntimeError, match='REDIS_URL'):
+            RelatorioJobService.submit('<p>x</p>', user_id=1)
+
+        # Liberado explicitamente (implantação com um único processo web)
+        test_app.config['REPORT_JOB_MEMORY_STORE'] = True
+        job = _aguardar(RelatorioJobService.submit('<p>x</p>', user_id=1), 1)
+        assert job['status'] == 'concluido'
+
+
+class _RedisFalso:
+    """O mínimo do cliente Redis usado por _RedisJobStore (listas, hashes e strings em memória)."""
+
+    def __init__(self):
+        self.dados = {}
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+    @staticmethod
+    def _bytes(valor):
+        return valor if isinstance(valor, bytes) else str(valor).encode()
+
+    def hset(self, chave, campo=None, valor=None, mapping=None):
+        hash_ = self.dados.setdefault(chave, {})
+        for k, v in (mapping or {campo: valor}).items():
+            hash_[self._bytes(k)] = self._bytes(v)
+
+    def hsetnx(self, chave, campo, valor):
+        if self._bytes(campo) not in self.dados.get(chave, {}):
+            self.hset(chave, campo, valor)
+
+    def hgetall(self, chave):
+        return dict(self.dados.get(chave, {}))
+
+    def expire(self, chave, ttl):
+        pass
+
+    def set(self, chave, valor, ex=None):
+        self.dados[chave] = self._bytes(valor)
+
+    def get(self, chave):
+        return self.dados.get(chave)
+
+    def delete(self, chave):
+        self.dados.pop(chave, None)
+
+    def rpush(self, chave, valor):
+        self.dados.setdefault(chave, []).append(self._bytes(valor))
+
+    def lpush(self, chave, valor):
+        self.dados.setdefault(chave, []).insert(0, self._bytes(valor))
+
+    def lrange(self, chave, inicio, fim):
+        return list(self.dados.get(chave, []))
+
+    def lrem(self, chave, quantidade, valor):
+        lista = self.dados.get(chave, [])
+        antes = len(lista)
+        lista[:] = [item for item in lista if item != self._bytes(valor)]
+        return antes - len(lista)
+
+    def blmove(self, origem, destino, timeout, lado_origem, lado_destino):
+        lista = self.dados.get(origem)
+        if not lista:
+            return None
+        item = lista.pop(0)
+        self.dados.setdefault(destino, []).append(item)
+        return item
+
+
+@pytest.fixture
+def store_redis(test_app, pdf_api):
+    store = relatorio_job_service._RedisJobStore(_RedisFalso())
+    RelatorioJobService._state()['store'] = store
+    return store
+
+
+class TestFilaRedis:
+    """Fila confiável do Redis: o job só sai da lista de processamento quando termina."""
+
+    def test_worker_processa_e_confirma(self, test_app, store_redis):
+        job_id = RelatorioJobService.submit('<p>x</p>', user_id=1)
+        RelatorioJobService.run_worker(poll_timeout=0, max_jobs=1)
+
+        assert RelatorioJobService.get_job(job_id, 1)['status'] == 'concluido'
+        assert store_redis.client.lrange(store_redis.PROCESSING_KEY, 0, -1) == []
+
+    def test_job_de_worker_interrompido_volta_para_a_fila(self, test_app, store_redis):
+        test_app.config['REPORT_JOB_STALE_AFTER'] = 60
+        abandonado = RelatorioJobService.submit('<p>abandonado</p>', user_id=1)
+        recente = RelatorioJobService.submit('<p>recente</p>', user_id=1)
+        # Dois workers pegam os jobs e caem antes de terminar
+        assert store_redis.pop(0) == abandonado
+        store_redis.update(abandonado, status='processando', claimed_at=time.time() - 120)
+        assert store_redis.pop(0) == recente
+
+        assert RelatorioJobService.recover_stale_jobs() == [abandonado]
+        assert RelatorioJobService.get_job(abandonado, 1)['status'] == 'pendente'
+        assert store_redis.client.lrange(store_redis.PROCESSING_KEY, 0, -1) == [recente.encode()]
+
+        # O worker recupera os abandonados ao iniciar e os processa primeiro
+        RelatorioJobService.run_worker(poll_timeout=0, max_jobs=1)
+        assert RelatorioJobService.get_job(abandonado, 1)['status'] == 'concluido'
+        assert RelatorioJobService.get_job(recente, 1)['status'] == 'pendente'
+
+    def test_recuperacao_descarta_jobs_terminados_ou_expirados(self, test_app, store_redis):
+        test_app.config['REPORT_JOB_STALE_AFTER'] = 0
+        concluido = RelatorioJobService.submit('<p>a</p>', user_id=1)
+        expirado = RelatorioJobService.submit('<p>b</p>', user_id=1)
+        store_redis.pop(0)
+        store_redis.pop(0)
+        store_redis.update(concluido, status='concluido')
+        store_redis.client.delete(store_redis._key(expirado))
+
+        assert RelatorioJobService.recover_stale_jobs() == []
+        assert store_redis.client.lrange(store_redis.PROCESSING_KEY, 0, -1) == []
+        assert store_redis.client.lrange(store_redis.QUEUE_KEY, 0, -1) == []
@@ -0,0 +1,113 @@
+# tests/test_relatorio_service.py
+
+import pytest
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from backend.services.relatorio_service import RelatorioService
+from backend.services.horario_service import HorarioService
+from backend.services.turma_service import TurmaService
+from backend.models.database import db
+from backend.models.user import User
+from backend.models.instrutor import Instrutor
+from backend.models.disciplina import Disciplina
+from backend.models.school import School
+from backend.models.semana import Semana
+from backend.models.ciclo import Ciclo
+from backend.models.turma import Turma
+from backend.models.horario import Horario
+from backend.models.horas_instrutor_semana import HorasInstrutorSemana
+
+INICIO = date(2025, 3, 3)
+
+
+@pytest.fixture
+def setup_livro(db_session):
+    """Escola com três semanas seguidas, um admin, um instrutor, uma turma e uma disciplina."""
+    school = School(nome="Escola Livro")
+    ciclo = Ciclo(nome='Ciclo Livro')
+    db_session.add_all([school, ciclo])
+    db_session.commit()
+
+    semanas = [
+        Semana(nome=f'Semana {i + 1}', data_inicio=INICIO + timedelta(weeks=i),
+               data_fim=INICIO + timedelta(weeks=i, days=6), ciclo_id=ciclo.id)
+        for i in range(3)
+    ]
+    admin = User(matricula='adm_livro', username='adm_livro', role='admin_escola', is_active=True)
+    user_instrutor = User(matricula='inst_livro', username='inst_livro', nome_completo='Instrutor Livro',
+                          role='instrutor', is_active=True)
+    turma = Turma(nome='Pel Livro', ano=2025, school_id=school.id)
+    disciplina = Disciplina(materia='Tiro', carga_horaria_prevista=40, school_id=school.id, ciclo_id=ciclo.id)
+    db_session.add_all(semanas + [admin, user_instrutor, turma, disciplina])
+    db_session.commit()
+
+    instrutor = Instrutor(user_id=user_instrutor.id, telefone=None)
+    db_session.add(instrutor)
+    db_session.commit()
+
+    def agendar(semana, dia, periodo, duracao, user=admin):
+        success, message, status = HorarioService.save_aula({
+            'turma_id': turma.id, 'semana_id': semana.id, 'dia': dia, 'periodo': periodo,
+            'disciplina_id': disciplina.id, 'instrutor_id': instrutor.id, 'duracao': duracao,
+        }, user)
+        assert success, message
+        return db.session.scalars(select(Horario).order_by(Horario.id.desc())).first()
+
+    return admin, instrutor, turma, disciplina, semanas, agendar
+
+
+def _livro():
+    return {
+        (linha.semana_id, linha.disciplina_id): linha.horas
+        for linha in db.session.scalars(select(HorasInstrutorSemana))
+    }
+
+
+class TestLivroDeHoras:
+
+    def test_livro_acompanha_as_aulas_confirmadas(self, test_app, setup_livro):
+        admin, instrutor, turma, disciplina, semanas, agendar = setup_livro
+        aula = agendar(semanas[0], 'segunda', 1, 2)
+        agendar(semanas[0], 'terca', 1, 3)
+        assert _livro() == {(semanas[0].id, disciplina.id): 5}
+
+        # Aula pendente só entra no livro quando aprovada
+        pendente = agendar(semanas[1], 'segunda', 1, 2, user=instrutor.user)
+        assert (semanas[1].id, disciplina.id) not in _livro()
+        assert HorarioService.aprovar_horario(pendente.id, 'aprovar')[0]
+        assert _livro()[(semanas[1].id, disciplina.id)] == 2
+
+        # Remoções pelo lote, uma a uma e pela exclusão da turma
+        success, *_ = HorarioService.aplicar_lote(turma.id, semanas[0].id, [
+            {'op': 'remover', 'horario_id': aula.id},
+        ], admin)
+        assert success
+        assert _livro()[(semanas[0].id, disciplina.id)] == 3
+
+        ultima = db.session.scalars(select(Horario).where(Horario.semana_id == semanas[0].id)).one()
+        assert HorarioService.remove_aula(ultima.id, admin)[0]
+        assert (semanas[0].id, disciplina.id) not in _livro()
+
+        assert TurmaService.delete_turma(turma.id)[0]
+        assert _livro() == {}
+
+    def test_relatorio_com_horas_pagas_anteriormente(self, test_app, setup_livro):
+        admin, instrutor, turma, disciplina, semanas, agendar = setup_livro
+        agendar(semanas[0], 'segunda', 1, 2)
+        agendar(semanas[1], 'segunda', 1, 3)
+        agendar(semanas[2], 'segunda', 1, 1)
+        agendar(semanas[2], 'terca', 1, 2)
+
+        def relatorio(inicio, fim, **filtros):
+            dados = RelatorioService.get_horas_aula_por_instrutor(inicio, fim, **filtros)
+            return [(d['ch_paga_anteriormente'], d['ch_a_pagar']) for item in dados for d in item['disciplinas']]
+
+        assert relatorio(semanas[2].data_inicio, semanas[2].data_fim) == [(5, 3)]
+        assert relatorio(semanas[1].data_inicio, semanas[2].data_fim) == [(2, 6)]
+        assert relatorio(semanas[0].data_inicio, semanas[0].data_fim) == [(0, 2)]
+        assert relatorio(semanas[2].data_fim + timedelta(days=1), semanas[2].data_fim + timedelta(days=30)) == []
+        assert relatorio(semanas[0].data_inicio, semanas[2].data_fim, is_rr_filter=True) == []
+        assert relatorio(semanas[0].data_inicio, semanas[2].data_fim,
+                         instrutor_ids_filter=[instrutor.id]) == [(0, 8)]
@@ -2,7 +2,7 @@
 
 import pytest
 from datetime import date, timedelta
-from sqlalchemy import select
+from sqlalchemy import select, func
 from backend.models.user import User
 from backend.models.aluno import Aluno
 from backend.models.instrutor import Instrutor
@@ -14,6 +14,8 @@ from backend.models.school import School
 from backend.models.user_school import UserSchool
 from backend.services.aluno_service import AlunoService
 from backend.services.dashboard_service import DashboardService
+from backend.services.disciplina_service import DisciplinaService
+from backend.services.user_service import UserService
 from backend.services.turma_service import TurmaService
 from backend.models.database import db
 
@@ -160,3 +162,125 @@ class TestSchoolAndUserServices:
             remove_prog, remove_msg = UserService.remove_school_role(programmer_user.id, school.id)
             assert not remove_prog
             assert 'Não é permitido' in remove_msg
+
+
+class TestDashboardService:
+    """Contadores do dashboard: consulta única, cache e invalidação."""
+
+    def test_estatisticas_em_uma_consulta(self, test_app, setup_school_with_users, count_queries):
+        school, _, _, _ = setup_school_with_users
+        school_id = school.id
+        with count_queries() as statements:
+            stats = DashboardService.get_estatisticas(school_id)
+        # Além da leitura do carimbo do cache (cache_stamps), uma só consulta
+        assert len([s for s in statements if 'cache_stamps' not in s]) == 1
+        assert stats == {
+            'total_users': 3,
+            'total_alunos': 2,
+            'total_instrutores': 0,
+            'total_disciplinas': 0,
+            'aulas_pendentes': 0,
+        }
+
+    def test_estatisticas_em_cache_ate_invalidacao(self, test_app, setup_school_with_users, count_queries):
+        school, _, _, ciclo = setup_school_with_users
+        DashboardService.get_estatisticas(school.id)
+        with count_queries() as statements:
+            assert DashboardService.get_estatisticas(school.id)['total_disciplinas'] == 0
+        assert statements == []
+
+        ok, _ = DisciplinaService.create_disciplina(
+            {'materia': 'Disciplina Dashboard', 'carga_horaria_prevista': 10, 'ciclo_id': ciclo.id}, school.id
+        )
+        assert ok
+        assert DashboardService.get_estatisticas(school.id)['total_disciplinas'] == 1
+
+        ok, _ = UserService.pre_register_user({'matricula': 'dash_novo', 'role': 'instrutor'}, school.id)
+        assert ok
+        assert DashboardService.get_estatisticas(school.id)['total_users'] == 4
+
+    def test_dashboard_data_filtra_por_escola(self, test_app, setup_school_with_users):
+        school, _, _, _ = setup_school_with_users
+        outra = School(nome='Outra Escola Dashboard')
+        db.session.add(outra)
+        db.session.commit()
+        dados = DashboardService.get_dashboard_data(outra.id)
+        assert dados['total_users'] == 0
+        assert dados['proximas_aulas'] == []
+        assert dados['usuarios_recentes'] == []
+        assert len(DashboardService.get_dashboard_data(school.id)['usuarios_recentes']) == 3
+
+
+class TestPreCadastroEmLote:
+    """Pré-cadastro em lote: consultas por bloco e relatório por linha."""
+
+    def test_relatorio_por_linha(self, test_app):
+        school = School(nome='Escola Lote')
+        outra = School(nome='Outra Escola Lote')
+        ja_na_escola = User(matricula='1001', role='aluno')
+        em_outra_escola = User(matricula='1002', role='aluno')
+        db.session.add_all([school, outra, ja_na_escola, em_outra_escola])
+        db.session.flush()
+        db.session.add_all([
+            UserSchool(user_id=ja_na_escola.id, school_id=school.id, role='aluno'),
+            UserSchool(user_id=em_outra_escola.id, school_id=outra.id, role='aluno'),
+        ])
+        db.session.commit()
+
+        ok, relatorio = UserService.batch_pre_register_users(
+            ['1001', '1002', ' 2001 ', '20-02', '2001', 'abc'], 'aluno', school.id
+        )
+        assert ok
+        assert [(i['matricula'], i['status']) for i in relatorio] == [
+            ('1001', 'existente'),
+            ('1002', 'vinculado'),
+            ('2001', 'criado'),
+            ('2002', 'criado'),
+            ('2001', 'duplicado'),
+            ('abc', 'invalido'),
+        ]
+        resumo = UserService.resumir_relatorio(relatorio)
+        assert resumo['criado'] == 2 and resumo['vinculado'] == 1
+
+        novo = db.session.scalar(select(User).filter_by(matricula='2002'))
+        assert novo.is_active is False and novo.role == 'aluno'
+        vinculos = db.session.scalars(select(UserSchool.user_id).where(UserSchool.school_id == school.id)).all()
+        assert len(vinculos) == 4
+
+    def test_letras_na_matricula_invalidam_a_linha(self, test_app):
+        school = School(nome='Escola Lote Letras')
+        outro = User(matricula='123', role='aluno')
+        db.session.add_all([school, outro])
+        db.session.commit()
+
+        ok, relatorio = UserService.batch_pre_register_users(['PM12A3', '12.3/4'], 'aluno', school.id)
+        assert ok
+        assert [(i['matricula'], i['status']) for i in relatorio] == [
+            ('PM12A3', 'invalido'),
+            ('1234', 'criado'),
+        ]
+        # A conta com matrícula 123 não foi vinculada à escola
+        assert db.session.scalar(select(UserSchool).filter_by(user_id=outro.id)) is None
+
+    def test_numero_de_consultas_nao_depende_do_tamanho(self, test_app, count_queries):
+        school = School(nome='Escola Lote Grande')
+        db.session.add(school)
+        db.session.commit()
+        school_id = school.id
+
+        matriculas = [str(300000 + i) for i in range(400)]
+        with count_queries() as statements:
+            ok, relatorio = UserService.batch_pre_register_users(matriculas, 'aluno', school_id)
+        assert ok
+        assert all(i['status'] == 'criado' for i in relatorio)
+        # IN dos existentes, INSERT de usuários, IN dos ids criados, IN dos vínculos, INSERT de vínculos
+        # e, depois do commit, o carimbo do cache do dashboard
+        assert len(statements) <= 7
+        assert db.session.scalar(select(func.count(UserSchool.id)).where(UserSchool.school_id == school_id)) == 400
+
+    def test_leitura_de_csv_em_streaming(self, test_app):
+        import io
+        conteudo = 'nome;matricula\nFulano;3001\n\nBeltrano;3002\n'.encode('utf-8-sig')
+        assert list(UserService.ler_matriculas_csv(io.BytesIO(conteudo))) == ['3001', '3002']
+        sem_cabecalho = io.BytesIO(b'4001\n4002,extra\n')
+        assert list(UserService.ler_matriculas_csv(sem_cabecalho)) == ['4001', '4002']
@@ -0,0 +1,83 @@
+# tests/test_site_config_service.py
+
+from backend.models.database import db, engine_leitura
+from backend.services.cache_service import CacheService
+from backend.services.site_config_service import SiteConfigService, SITE_CONFIG_STAMP
+
+
+class TestSiteConfigCache:
+    """Testes do cache versionado das configurações do site."""
+
+    def test_config_map_servido_do_cache(self, test_app, count_queries):
+        with test_app.test_request_context():
+            SiteConfigService.init_default_configs()
+            db.session.commit()
+            primeiro = SiteConfigService.get_config_map()
+
+            with count_queries() as statements:
+                segundo = SiteConfigService.get_config_map()
+                SiteConfigService.get_config('site_logo')
+
+            assert statements == []
+            assert segundo == primeiro
+            assert 'site_logo' in segundo
+
+    def test_set_config_invalida_apos_commit(self, test_app):
+        with test_app.app_context():
+            SiteConfigService.init_default_configs()
+            db.session.commit()
+            versao_inicial = CacheService.get_version(SITE_CONFIG_STAMP)
+            SiteConfigService.get_config_map()
+
+            SiteConfigService.set_config('site_logo', '/static/uploads/novo_logo.png', 'image', 'Logo')
+            # Antes do commit o carimbo não muda
+            assert CacheService.get_version(SITE_CONFIG_STAMP) == versao_inicial
+
+            db.session.commit()
+            assert CacheService.get_version(SITE_CONFIG_STAMP) == versao_inicial + 1
+            assert SiteConfigService.get_config('site_logo') == '/static/uploads/novo_logo.png'
+
+    def test_rollback_descarta_invalidacao(self, test_app):
+        with test_app.app_context():
+            SiteConfigService.init_default_configs()
+            db.session.commit()
+            versao_inicial = CacheService.get_version(SITE_CONFIG_STAMP)
+
+            SiteConfigService.set_config('site_logo', '/static/uploads/descartado.png', 'image', 'Logo')
+            db.session.rollback()
+
+            assert CacheService.get_version(SITE_CONFIG_STAMP) == versao_inicial
+            assert SiteConfigService.get_config('site_logo') != '/static/uploads/descartado.png'
+
+    def test_carimbo_compartilhado_entre_workers_sem_redis(self, tmp_path):
+        """Dois workers no mesmo banco: a alteração feita em um invalida o cache do outro."""
+        from backend.app import create_app
+        from backend.config import Config
+
+        class ConfigArquivo(Config):
+            TESTING = True
+            SECRET_KEY = 'chave-de-teste'
+            WTF_CSRF_ENABLED = False
+            REDIS_URL = None
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'escola.db'}"
+
+        worker_a, worker_b = create_app(config_class=ConfigArquivo), create_app(config_class=ConfigArquivo)
+        with worker_a.app_context():
+            db.create_all()
+            SiteConfigService.init_default_configs()
+            db.session.commit()
+        with worker_b.app_context():
+            logo_antigo = SiteConfigService.get_config('site_logo')
+
+        with worker_a.app_context():
+            SiteConfigService.set_config('site_logo', '/static/uploads/novo_logo.png', 'image', 'Logo')
+            db.session.commit()
+
+        with worker_b.app_context():
+            assert logo_antigo != '/static/uploads/novo_logo.png'
+            assert SiteConfigService.get_config('site_logo') == '/static/uploads/novo_logo.png'
+
+        for app in (worker_a, worker_b):
+            with app.app_context():
+                db.engine.dispose()
+                engine_leitura().dispose()
@@ -60,13 +60,13 @@ class TestVinculoService:
         assert success is True
         assert message == 'Vínculo criado com sucesso!'
         vinculo = db.session.query(DisciplinaTurma).filter_by(instrutor_id_1=instrutor.id).one()
-        assert vinculo.pelotao == turma.nome
+        assert vinculo.turma_id == turma.id
         assert vinculo.disciplina_id == disciplina.id
 
     def test_add_vinculo_updates_existing(self, db_session, setup_data):
         instrutor, turma, disciplina = setup_data
 
-        vinculo_inicial = DisciplinaTurma(pelotao=turma.nome, disciplina_id=disciplina.id)
+        vinculo_inicial = DisciplinaTurma(turma_id=turma.id, disciplina_id=disciplina.id)
         db_session.add(vinculo_inicial)
         db_session.commit()
 
@@ -78,7 +78,7 @@ class TestVinculoService:
 
     def test_edit_vinculo_success(self, db_session, setup_data):
         instrutor, turma, disciplina = setup_data
-        vinculo = DisciplinaTurma(instrutor_id_1=instrutor.id, pelotao=turma.nome, disciplina_id=disciplina.id)
+        vinculo = DisciplinaTurma(instrutor_id_1=instrutor.id, turma_id=turma.id, disciplina_id=disciplina.id)
         db_session.add(vinculo)
         db_session.commit()
 
@@ -97,7 +97,7 @@ class TestVinculoService:
 
     def test_delete_vinculo_success(self, db_session, setup_data):
         instrutor, turma, disciplina = setup_data
-        vinculo = DisciplinaTurma(instrutor_id_1=instrutor.id, pelotao=turma.nome, disciplina_id=disciplina.id)
+        vinculo = DisciplinaTurma(instrutor_id_1=instrutor.id, turma_id=turma.id, disciplina_id=disciplina.id)
         db_session.add(vinculo)
         db_session.commit()
         vinculo_id = vinculo.id
@@ -110,7 +110,7 @@ class TestVinculoService:
 
     def test_get_all_vinculos(self, db_session, setup_data):
         instrutor, turma, disciplina = setup_data
-        vinculo = DisciplinaTurma(instrutor_id_1=instrutor.id, pelotao=turma.nome, disciplina_id=disciplina.id)
+        vinculo = DisciplinaTurma(instrutor_id_1=instrutor.id, turma_id=turma.id, disciplina_id=disciplina.id)
         db_session.add(vinculo)
         db_session.commit()
 
@@ -120,18 +120,18 @@ class TestVinculoService:
 
     def test_get_vinculos_with_filters(self, db_session, setup_data):
         instrutor, turma, disciplina = setup_data
-        vinculo = DisciplinaTurma(instrutor_id_1=instrutor.id, pelotao=turma.nome, disciplina_id=disciplina.id)
+        vinculo = DisciplinaTurma(instrutor_id_1=instrutor.id, turma_id=turma.id, disciplina_id=disciplina.id)
         db_session.add(vinculo)
         db_session.commit()
 
-        vinculos_turma = VinculoService.get_all_vinculos(turma_filtrada=turma.nome)
+        vinculos_turma = VinculoService.get_all_vinculos(turma_filtrada_id=turma.id)
         assert len(vinculos_turma) == 1
 
         vinculos_disciplina = VinculoService.get_all_vinculos(disciplina_filtrada_id=disciplina.id)
         assert len(vinculos_disciplina) == 1
 
-        vinculos_combinado = VinculoService.get_all_vinculos(turma_filtrada=turma.nome, disciplina_filtrada_id=disciplina.id)
+        vinculos_combinado = VinculoService.get_all_vinculos(turma_filtrada_id=turma.id, disciplina_filtrada_id=disciplina.id)
         assert len(vinculos_combinado) == 1
 
-        vinculos_vazio = VinculoService.get_all_vinculos(turma_filtrada="Turma Inexistente")
+        vinculos_vazio = VinculoService.get_all_vinculos(turma_filtrada_id=9999)
         assert len(vinculos_vazio) == 0
@@ -0,0 +1,93 @@
+# tests/test_weasyprint_api.py
+
+import threading
+import time
+
+import pytest
+
+import weasyprint_api
+
+
+def _sem_fontes():
+    pass
+
+
+def _render_falso(html, base_url=None):
+    """Substitui o WeasyPrint nos workers: 'lento' e 'travado' simulam renderizações demoradas."""
+    if html == 'lento':
+        time.sleep(1)
+    elif html == 'travado':
+        time.sleep(120)
+    return b'%PDF-' + html.encode()
+
+
+@pytest.fixture
+def pool_falso(monkeypatch):
+    """Pool de 1 worker sem fila, com o render substituído e timeout curto."""
+    monkeypatch.setattr(weasyprint_api, '_init_worker', _sem_fontes)
+    monkeypatch.setattr(weasyprint_api, '_render_pdf', _render_falso)
+    monkeypatch.setattr(weasyprint_api, 'PDF_RENDER_TIMEOUT', 0.5)
+    pool = weasyprint_api.RenderPool(workers=1, queue_size=0)
+    monkeypatch.setattr(weasyprint_api, '_pool', pool)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def cliente_pdf(pool_falso):
+    return weasyprint_api.app.test_client()
+
+
+def _esperar(condicao, limite=10):
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, 'condição não atingida a tempo'
+        time.sleep(0.05)
+
+
+class TestRenderPool:
+
+    def test_renderiza_o_pdf(self, cliente_pdf, pool_falso):
+        resposta = cliente_pdf.post('/pdf', json={'html': '<p>ok</p>'})
+        assert resposta.status_code == 200
+        assert resposta.mimetype == 'application/pdf'
+        assert resposta.data == b'%PDF-<p>ok</p>'
+        assert cliente_pdf.post('/pdf', json={}).status_code == 400
+        _esperar(lambda: pool_falso.stats()['in_flight'] == 0)
+
+    def test_pool_cheio_responde_503_com_retry_after(self, cliente_pdf, pool_falso, monkeypatch):
+        monkeypatch.setattr(weasyprint_api, 'PDF_RENDER_TIMEOUT', 10)
+        ocupante = threading.Thread(target=pool_falso.render, args=('lento',))
+        ocupante.start()
+        _esperar(lambda: pool_falso.stats()['in_flight'] == 1)
+
+        resposta = cliente_pdf.post('/pdf', json={'html': '<p>ok</p>'})
+        ocupante.join()
+        assert resposta.status_code == 503
+        assert resposta.headers['Retry-After'] == '5'
+        assert pool_falso.stats()['rejected_total'] == 1
+
+    def test_timeout_recicla_o_pool_e_libera_a_vaga(self, cliente_pdf, pool_falso):
+        executor_antigo = pool_falso._executor
+        resposta = cliente_pdf.post('/pdf', json={'html': 'travado'})
+        assert resposta.status_code == 504
+
+        # O worker travado é encerrado e a vaga volta, sem esperar o fim do render
+        assert pool_falso._executor is not executor_antigo
+        _esperar(lambda: pool_falso.stats()['in_flight'] == 0)
+        assert cliente_pdf.post('/pdf', json={'html': '<p>depois</p>'}).status_code == 200
+
+    def test_health_mostra_a_ocupacao(self, cliente_pdf, pool_falso, monkeypatch):
+        monkeypatch.setattr(weasyprint_api, 'PDF_RENDER_TIMEOUT', 10)
+        assert cliente_pdf.get('/health').get_json() == {
+            'workers': 1, 'capacity': 1, 'in_flight': 0, 'busy_workers': 0, 'queued': 0,
+            'saturation': 0.0, 'rejected_total': 0, 'status': 'ok',
+        }
+
+        ocupante = threading.Thread(target=pool_falso.render, args=('lento',))
+        ocupante.start()
+        _esperar(lambda: pool_falso.stats()['in_flight'] == 1)
+        saude = cliente_pdf.get('/health').get_json()
+        ocupante.join()
+        assert saude['status'] == 'saturated'
+        assert (saude['busy_workers'], saude['saturation']) == (1, 1.0)
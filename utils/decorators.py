@@ -3,6 +3,7 @@
 from functools import wraps
 from flask import flash, redirect, url_for
 from flask_login import current_user
+from backend.services.identity_service import current_identity
 
 def programmer_required(f):
     @wraps(f)
@@ -97,7 +98,7 @@ def aluno_profile_required(f):
         if not current_user.is_authenticated:
             return redirect(url_for('auth.login'))
         if current_user.role == 'aluno':
-            if not (hasattr(current_user, 'aluno_profile') and current_user.aluno_profile):
+            if not current_identity.aluno_id:
                 flash('Para continuar, por favor, complete seu perfil de aluno.', 'info')
                 return redirect(url_for('aluno.completar_cadastro'))
         return f(*args, **kwargs)
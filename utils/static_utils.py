@@ -0,0 +1,37 @@
+import hashlib
+import os
+import threading
+
+_fingerprints = {}
+_lock = threading.Lock()
+
+
+def static_fingerprint(static_folder, filename):
+    """
+    Retorna um hash curto do conteúdo de um arquivo estático, usado como
+    parâmetro de versão na URL. O hash é recalculado apenas quando o
+    arquivo muda (mtime/tamanho). Retorna None se o arquivo não existir.
+    """
+    if not filename:
+        return None
+    path = os.path.abspath(os.path.join(static_folder, filename))
+    if not path.startswith(os.path.abspath(static_folder) + os.sep):
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    cached = _fingerprints.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    hash_sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            hash_sha256.update(chunk)
+    digest = hash_sha256.hexdigest()[:12]
+
+    with _lock:
+        _fingerprints[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
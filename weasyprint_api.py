@@ -1,21 +1,170 @@
-from flask import Flask, request, send_file
-import subprocess
-import tempfile
+from flask import Flask, request, jsonify, Response
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 import os
+import threading
 
 app = Flask(__name__)
 
+# Processos que ficam "quentes" com o WeasyPrint e as fontes já carregados
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', os.cpu_count() or 2))
+# Requisições que podem aguardar na fila além das que estão renderizando
+PDF_QUEUE_SIZE = int(os.environ.get('PDF_QUEUE_SIZE', PDF_WORKERS * 2))
+# Menor que o timeout do cliente (relatorios_controller usa 30s)
+PDF_RENDER_TIMEOUT = int(os.environ.get('PDF_RENDER_TIMEOUT', 25))
+
+_font_config = None
+
+
+def _init_worker():
+    """Executado uma vez por processo: importa o WeasyPrint e carrega as fontes."""
+    global _font_config
+    from weasyprint.text.fonts import FontConfiguration
+    _font_config = FontConfiguration()
+
+
+def _render_pdf(html, base_url=None):
+    from weasyprint import HTML
+    return HTML(string=html, base_url=base_url).write_pdf(font_config=_font_config)
+
+
+class RenderPool:
+    """Pool de processos com capacidade limitada (workers + fila)."""
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._executor = self._create_executor()
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    @staticmethod
+    def _terminate(executor):
+        """
+        Encerra os workers do pool à força. As renderizações ainda em andamento
+        nele terminam com BrokenProcessPool, e os callbacks liberam as vagas.
+        """
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+
+    def _restart(self, broken):
+        """Troca o pool por um novo e encerra os workers do antigo."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._create_executor()
+        self._terminate(broken)
+
+    def shutdown(self):
+        self._terminate(self._executor)
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def render(self, html, base_url=None):
+        """Renderiza o PDF ou retorna None se a capacidade estiver esgotada."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            return None
+
+        with self._lock:
+            self._in_flight += 1
+        executor = self._executor
+        try:
+            future = executor.submit(_render_pdf, html, base_url)
+        except BrokenProcessPool:
+            self._release()
+            self._restart(executor)
+            raise
+        # A vaga só é liberada quando o worker termina (ou é encerrado)
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=PDF_RENDER_TIMEOUT)
+        except FutureTimeoutError:
+            # A tarefa já está rodando e não pode ser cancelada: um render travado
+            # ocuparia a vaga para sempre. Recicla o pool, encerrando os workers;
+            # outras renderizações em andamento nele recebem 503 e devem repetir.
+            app.logger.warning("Renderização excedeu o tempo limite; reiniciando o pool de PDF.")
+            self._restart(executor)
+            raise
+        except BrokenProcessPool:
+            # Um worker morreu (ex: falta de memória): recria o pool para as próximas requisições
+            self._restart(executor)
+            raise
+
+    def stats(self):
+        with self._lock:
+            in_flight = self._in_flight
+            rejected = self._rejected
+        return {
+            'workers': self.workers,
+            'capacity': self.capacity,
+            'in_flight': in_flight,
+            'busy_workers': min(in_flight, self.workers),
+            'queued': max(in_flight - self.workers, 0),
+            'saturation': round(in_flight / self.capacity, 2),
+            'rejected_total': rejected,
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = RenderPool(PDF_WORKERS, PDF_QUEUE_SIZE)
+    return _pool
+
+
 @app.route('/health')
 def health():
-    return 'OK'
+    stats = get_pool().stats()
+    stats['status'] = 'saturated' if stats['in_flight'] >= stats['capacity'] else 'ok'
+    return jsonify(stats)
+
 
 @app.route('/pdf', methods=['POST'])
 def pdf():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     html = data.get('html')
-    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
-        subprocess.run(['weasyprint', '-', tmp.name], input=html.encode())
-        return send_file(tmp.name, mimetype='application/pdf')
+    if not html:
+        return jsonify({'error': "Campo 'html' é obrigatório."}), 400
+
+    try:
+        pdf_bytes = get_pool().render(html, data.get('base_url'))
+    except FutureTimeoutError:
+        return jsonify({'error': 'Tempo limite de renderização excedido.'}), 504
+    except BrokenProcessPool:
+        return jsonify({'error': 'Worker de renderização reiniciado, tente novamente.'}), 503
+    except Exception as e:
+        app.logger.error(f"Erro ao renderizar PDF: {e}")
+        return jsonify({'error': 'Erro ao renderizar o PDF.'}), 500
+
+    if pdf_bytes is None:
+        # Fila cheia: o cliente deve tentar novamente em instantes
+        response = jsonify({'error': 'Serviço de PDF sobrecarregado.'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+
+    return Response(pdf_bytes, mimetype='application/pdf')
+
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001)
+    get_pool()
+    app.run(host='0.0.0.0', port=5001, threaded=True)